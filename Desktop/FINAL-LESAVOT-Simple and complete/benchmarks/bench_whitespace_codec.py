@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the whitespace text codec.
+
+Compares the desktop apps' original per-character hide/extract (strings
+grown with +=) and the web app's original word embedding and index-loop
+extraction with whitespace_codec, on covers of growing word counts with a
+message that fills every cover. Extraction is timed twice for the codec:
+on the stego text alone and with a long cover after the terminator, which
+the early exit never reads.
+
+Usage:
+    python benchmarks/bench_whitespace_codec.py [--words 10000 100000 1000000 10000000] [--legacy-max 1000000]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to the path so we can import the shared codec
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from whitespace_codec import hide_message_in_text, extract_message_from_text, extract_message_from_stream
+
+
+def legacy_desktop_hide(text_content, message):
+    """The desktop apps' original per-character hide (reference only)."""
+    binary_message = ''.join(format(ord(char), '08b') for char in message)
+    stego_text = ""
+    for i, char in enumerate(text_content):
+        stego_text += char
+        if i < len(binary_message):
+            stego_text += ' ' if binary_message[i] == '0' else '\t'
+    return stego_text
+
+
+def legacy_desktop_extract(stego_text):
+    """The desktop apps' original per-character extraction (reference only)."""
+    binary_message = ""
+    for i in range(len(stego_text) - 1):
+        if stego_text[i+1] == ' ':
+            binary_message += '0'
+        elif stego_text[i+1] == '\t':
+            binary_message += '1'
+    message = ""
+    for i in range(0, len(binary_message), 8):
+        if i + 8 <= len(binary_message):
+            message += chr(int(binary_message[i:i+8], 2))
+    return message
+
+
+def legacy_web_embed(text, message):
+    """The web app's original word embedding (reference only)."""
+    binary_message = ''.join(format(ord(char), '08b') for char in message) + '00000000'
+    words = text.split()
+    stego_text = words[0]
+    for i in range(len(binary_message)):
+        stego_text += ("  " if binary_message[i] == '1' else " ") + words[i + 1]
+    for i in range(len(binary_message) + 1, len(words)):
+        stego_text += " " + words[i]
+    return stego_text
+
+
+def legacy_web_extract(text):
+    """The web app's original index-loop extraction (reference only)."""
+    binary_message = ""
+    i = 0
+    while i < len(text):
+        if text[i] == ' ':
+            space_count = 0
+            while i < len(text) and text[i] == ' ':
+                space_count += 1
+                i += 1
+            binary_message += '1' if space_count == 2 else '0'
+        else:
+            i += 1
+    message = ""
+    for i in range(0, len(binary_message), 8):
+        if i + 8 <= len(binary_message):
+            byte = binary_message[i:i+8]
+            if byte == "00000000":
+                break
+            message += chr(int(byte, 2))
+    return message
+
+
+def timed(func, *args):
+    """Run func once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--words', type=int, nargs='+', default=[10000, 100000, 1000000, 10000000],
+                        help='cover sizes in words')
+    parser.add_argument('--legacy-max', type=int, default=1000000,
+                        help='largest cover to run the original loops on')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+
+    print(f"{'words':>10} {'MB':>6} | {'desktop hide':>12} {'desktop ext':>12} {'web embed':>10} {'web ext':>10} |"
+          f" {'hide':>7} {'extract':>8} {'ext, 10x tail':>14}")
+    for count in args.words:
+        cover = ' '.join(rng.choices(vocabulary, k=count))
+        message = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz ', k=(count - 1) // 8 - 1))
+
+        stego, hide_time = timed(hide_message_in_text, cover, message)
+        extracted, extract_time = timed(extract_message_from_text, stego)
+        assert extracted == message
+
+        # The terminator ends the read long before a tenfold longer tail
+        tail = io.StringIO(stego + (' ' + cover) * 10)
+        extracted, tail_time = timed(extract_message_from_stream, tail)
+        assert extracted == message
+
+        legacy = ['-'] * 4
+        if count <= args.legacy_max:
+            desktop_stego, desktop_hide_time = timed(legacy_desktop_hide, cover, message)
+            _, desktop_extract_time = timed(legacy_desktop_extract, desktop_stego)
+            web_stego, web_embed_time = timed(legacy_web_embed, cover, message)
+            web_extracted, web_extract_time = timed(legacy_web_extract, web_stego)
+            assert web_stego == stego and web_extracted == message
+            legacy = [f"{seconds:.3f}" for seconds in
+                      (desktop_hide_time, desktop_extract_time, web_embed_time, web_extract_time)]
+
+        print(f"{count:>10} {len(cover) / 1e6:>6.1f} | {legacy[0]:>12} {legacy[1]:>12} {legacy[2]:>10} {legacy[3]:>10} |"
+              f" {hide_time:>7.3f} {extract_time:>8.3f} {tail_time:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 from flask import Flask, render_template, request, send_file, redirect, url_for, session, flash
 import os
+import sys
 import io
 import base64
 from PIL import Image
@@ -11,6 +12,11 @@ import json
 from functools import wraps
 from datetime import datetime
 
+# Shared with the desktop apps in the parent folder
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import image_lsb
+import whitespace_codec
+
 app = Flask(__name__, static_folder='static')
 app.config['UPLOAD_FOLDER'] = 'examples/data/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
@@ -52,40 +58,47 @@ def login_required(f):
 class ImageSteganography:
     """
     Implements LSB (Least Significant Bit) steganography for images.
+
+    Messages are stored in the RGB channels in row-major order, one bit per
+    channel by default or up to four with bits_per_channel, after a header
+    recording the setting and the message length (see image_lsb).
     """
 
+    MAX_BITS_PER_CHANNEL = image_lsb.MAX_BITS_PER_CHANNEL
+
     def __init__(self):
         pass
 
-    def embed(self, image_path, message, output_path):
+    def plan_bits_per_channel(self, image_path, message):
+        """
+        Returns the smallest bits per channel (1-4) that fits the message, or None.
+        """
+        width, height = Image.open(image_path).size
+        return image_lsb.smallest_bits_per_channel(width * height * 3, message)
+
+    def embed(self, image_path, message, output_path, bits_per_channel=1):
         """
         Embeds a message in an image using LSB steganography.
+
+        bits_per_channel may be 1-4, or 'auto' for the smallest setting that fits.
         """
         try:
+            if bits_per_channel == 'auto':
+                bits_per_channel = self.plan_bits_per_channel(image_path, message)
+                if bits_per_channel is None:
+                    print("Error: Message too large for the image")
+                    return False
+
             img = Image.open(image_path)
-            width, height = img.size
             img_array = np.array(img)
+            channels = img_array[:, :, :3].reshape(-1)  # Copy of the RGB channels in row-major order
 
-            binary_message = ''.join(format(ord(char), '08b') for char in message)
-            binary_message += '00000000'
-
-            if len(binary_message) > width * height * 3:
-                print("Error: Message too large for the image")
+            try:
+                image_lsb.hide_message_in_values(channels, message, bits_per_channel)
+            except ValueError as e:
+                print(f"Error: {e}")
                 return False
-
-            idx = 0
-            for i in range(height):
-                for j in range(width):
-                    for k in range(3):  # RGB channels
-                        if idx < len(binary_message):
-                            img_array[i, j, k] = (img_array[i, j, k] & ~1) | int(binary_message[idx])
-                            idx += 1
-                        else:
-                            break
-                    if idx >= len(binary_message):
-                        break
-                if idx >= len(binary_message):
-                    break
+            img_array[:, :, :3] = channels.reshape(img_array[:, :, :3].shape)
 
             output_img = Image.fromarray(img_array)
             output_img.save(output_path)
@@ -101,24 +114,12 @@ class ImageSteganography:
         """
         try:
             img = Image.open(image_path)
-            width, height = img.size
-            img_array = np.array(img)
-
-            binary_message = ""
-            for i in range(height):
-                for j in range(width):
-                    for k in range(3):  # RGB channels
-                        binary_message += str(img_array[i, j, k] & 1)
+            channels = np.array(img)[:, :, :3].reshape(-1)
 
-                        if len(binary_message) % 8 == 0:
-                            if binary_message[-8:] == "00000000":
-                                message = ""
-                                for idx in range(0, len(binary_message) - 8, 8):
-                                    byte = binary_message[idx:idx+8]
-                                    message += chr(int(byte, 2))
-                                return message
-
-            return "No hidden message found"
+            try:
+                return image_lsb.extract_message_from_values(channels)
+            except ValueError:
+                return "No hidden message found"
 
         except Exception as e:
             print(f"Error extracting message: {e}")
@@ -127,83 +128,59 @@ class ImageSteganography:
 class TextSteganography:
     """
     Implements whitespace steganography for text files.
+
+    Each gap between words starts with one space for a 0 bit or two spaces
+    for a 1, followed by a null byte, and keeps its line breaks (see
+    whitespace_codec). Covers are read and written in chunks, so memory
+    stays flat however large the document is.
     """
 
     def __init__(self):
         pass
 
+    def embed_stream(self, cover, message, output, chunk_size=whitespace_codec.CHUNK_SIZE):
+        """
+        Embeds a message while copying text from one file object to another.
+
+        Only the words that carry bits are held at once; nothing is written
+        if the cover has too few of them.
+        """
+        try:
+            whitespace_codec.hide_message_in_stream(cover, message, output, chunk_size)
+            return True
+        except ValueError as e:
+            print(f"Error embedding message in text: {e}")
+            return False
+
     def embed(self, text_path, message, output_path):
         """
         Embeds a message in a text file using whitespace steganography.
         """
         try:
-            with open(text_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-
-            binary_message = ''.join(format(ord(char), '08b') for char in message)
-            binary_message += '00000000'  # Add terminator
+            with open(text_path, 'r', encoding='utf-8') as cover, open(output_path, 'w', encoding='utf-8') as output:
+                success = self.embed_stream(cover, message, output)
 
-            words = text.split()
-
-            if len(binary_message) > len(words) - 1:
-                print("Error: Message too large for the text file")
-                return False
-
-            stego_text = words[0]
-            for i in range(len(binary_message)):
-                if i < len(words) - 1:
-                    if binary_message[i] == '1':
-                        stego_text += "  " + words[i + 1]
-                    else:
-                        stego_text += " " + words[i + 1]
-
-            if len(binary_message) < len(words) - 1:
-                for i in range(len(binary_message) + 1, len(words)):
-                    stego_text += " " + words[i]
-
-            with open(output_path, 'w', encoding='utf-8') as file:
-                file.write(stego_text)
-
-            return True
+            if not success:
+                os.remove(output_path)
+            return success
 
         except Exception as e:
             print(f"Error embedding message in text: {e}")
             return False
 
+    def extract_stream(self, stego, chunk_size=whitespace_codec.CHUNK_SIZE):
+        """
+        Extracts a hidden message from a text file object, reading only up to the terminator.
+        """
+        return whitespace_codec.extract_message_from_stream(stego, chunk_size)
+
     def extract(self, text_path):
         """
         Extracts a hidden message from a text file.
         """
         try:
-            with open(text_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-
-            binary_message = ""
-
-            i = 0
-            while i < len(text):
-                if text[i] == ' ':
-                    space_count = 0
-                    while i < len(text) and text[i] == ' ':
-                        space_count += 1
-                        i += 1
-
-                    if space_count == 2:
-                        binary_message += '1'
-                    else:
-                        binary_message += '0'
-                else:
-                    i += 1
-
-            message = ""
-            for i in range(0, len(binary_message), 8):
-                if i + 8 <= len(binary_message):
-                    byte = binary_message[i:i+8]
-                    if byte == "00000000":
-                        break
-                    message += chr(int(byte, 2))
-
-            return message
+            with open(text_path, 'r', encoding='utf-8') as stego:
+                return self.extract_stream(stego)
 
         except Exception as e:
             print(f"Error extracting message from text: {e}")
@@ -212,8 +189,17 @@ class TextSteganography:
 class AudioSteganography:
     """
     Implements phase encoding steganography for audio files.
+
+    The signal is cut into 1024-sample segments, one bit per segment. Every
+    positive frequency bin of a segment (except DC and Nyquist) keeps its
+    magnitude and gets the phase +pi/2 for a 1 or -pi/2 for a 0, so
+    extract() reads the bit as the sign of the mean phase. All segments are
+    transformed at once with a batched real FFT. Multichannel files carry
+    the message in their first channel, as UTF-8 ending at a null byte.
     """
 
+    SEGMENT_LENGTH = 1024
+
     def __init__(self):
         pass
 
@@ -224,32 +210,22 @@ class AudioSteganography:
         try:
             sample_rate, audio_data = wavfile.read(audio_path)
             audio_data = audio_data.astype(np.float64)
+            signal = audio_data if audio_data.ndim == 1 else audio_data[:, 0]
 
-            binary_message = ''.join(format(ord(char), '08b') for char in message)
-            binary_message += '00000000'  # Add terminator
+            message_bits = np.unpackbits(np.frombuffer(message.encode('utf-8') + b'\0', dtype=np.uint8))
 
-            segment_length = 1024
-            if len(binary_message) > (len(audio_data) // segment_length):
+            segment_length = self.SEGMENT_LENGTH
+            if len(message_bits) > (len(signal) // segment_length):
                 print("Error: Message too large for the audio file")
                 return False
 
-            for i in range(len(binary_message)):
-                if i >= len(audio_data) // segment_length:
-                    break
-
-                segment = audio_data[i * segment_length:(i + 1) * segment_length]
-
-                spectrum = np.fft.fft(segment)
-                magnitude = np.abs(spectrum)
-                phase = np.angle(spectrum)
-
-                if binary_message[i] == '1':
-                    phase[1:segment_length//2] += np.pi/2
-
-                modified_spectrum = magnitude * np.exp(1j * phase)
-                modified_segment = np.real(np.fft.ifft(modified_spectrum))
-
-                audio_data[i * segment_length:(i + 1) * segment_length] = modified_segment
+            # One row per message segment, shifted in one broadcast operation
+            used = len(message_bits) * segment_length
+            segments = signal[:used].reshape(-1, segment_length)
+            spectrum = np.fft.rfft(segments, axis=1)
+            bins = spectrum[:, 1:segment_length // 2]
+            bins[:] = np.abs(bins) * np.where(message_bits == 1, 1j, -1j)[:, np.newaxis]
+            signal[:used] = np.fft.irfft(spectrum, n=segment_length, axis=1).reshape(-1)
 
             audio_data = np.int16(audio_data / np.max(np.abs(audio_data)) * 32767)
 
@@ -266,30 +242,20 @@ class AudioSteganography:
         """
         try:
             sample_rate, audio_data = wavfile.read(audio_path)
-            audio_data = audio_data.astype(np.float64)
-
-            binary_message = ""
-            segment_length = 1024
+            signal = audio_data.astype(np.float64)
+            if signal.ndim > 1:
+                signal = signal[:, 0]
 
-            for i in range(len(audio_data) // segment_length):
-                segment = audio_data[i * segment_length:(i + 1) * segment_length]
+            # Mean phase of every segment at once
+            segment_length = self.SEGMENT_LENGTH
+            segments = signal[:len(signal) // segment_length * segment_length].reshape(-1, segment_length)
+            phase = np.angle(np.fft.rfft(segments, axis=1)[:, 1:segment_length // 2])
+            bits = (phase.mean(axis=1) > 0).astype(np.uint8)
 
-                spectrum = np.fft.fft(segment)
-                phase = np.angle(spectrum)
-
-                phase_diff = np.mean(phase[1:segment_length//2])
-                if phase_diff > 0:
-                    binary_message += '1'
-                else:
-                    binary_message += '0'
-
-                if len(binary_message) % 8 == 0 and len(binary_message) >= 8:
-                    if binary_message[-8:] == "00000000":
-                        message = ""
-                        for idx in range(0, len(binary_message) - 8, 8):
-                            byte = binary_message[idx:idx+8]
-                            message += chr(int(byte, 2))
-                        return message
+            data = np.packbits(bits[:len(bits) - len(bits) % 8])
+            nulls = np.flatnonzero(data == 0)
+            if nulls.size:
+                return data[:nulls[0]].tobytes().decode('utf-8', errors='replace')
 
             return "No hidden message found"
 
@@ -376,11 +342,19 @@ def image_embed():
 
     file = request.files['file']
     message = request.form['message']
+    bits_per_channel = request.form.get('bits_per_channel', '1')
 
     if file.filename == '':
         flash('No file selected', 'error')
         return redirect(url_for('image'))
 
+    if bits_per_channel not in ('auto', '1', '2', '3', '4'):
+        flash('Bits per channel must be 1 to 4, or auto', 'error')
+        return redirect(url_for('image'))
+
+    if bits_per_channel != 'auto':
+        bits_per_channel = int(bits_per_channel)
+
     if file:
         # Generate unique filenames
         original_filename = str(uuid.uuid4()) + '.png'
@@ -394,7 +368,7 @@ def image_embed():
 
         # Embed the message
         steg = ImageSteganography()
-        success = steg.embed(original_path, message, stego_path)
+        success = steg.embed(original_path, message, stego_path, bits_per_channel)
 
         if success:
             # Read the stego image and convert to base64 for display
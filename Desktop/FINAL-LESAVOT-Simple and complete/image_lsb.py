@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+LSB image codec shared by the LESAVOT applications.
+
+A message is stored in the low bits of an image's channel values in
+row-major order. A nine-byte header goes first, one bit per value: the
+magic b'LSVT', the bits per channel (1-4) and the length of the UTF-8
+message in bytes. The message then fills that many low bits of each
+following value. With an explicit length no byte of the message can be
+mistaken for a marker or a terminator, whatever the setting.
+
+Images from the apps' earlier format (one bit per value, ending at a null
+byte) have no header and are still read that way. Writing and reading are
+vectorized, and the earlier format is read in chunks up to its terminator.
+"""
+
+import struct
+
+import numpy as np
+from PIL import Image
+
+# Most least significant bits per channel value the codec will use
+MAX_BITS_PER_CHANNEL = 4
+
+# Magic, bits per channel and message length in bytes, one bit per value
+MAGIC = b'LSVT'
+HEADER = struct.Struct('>4sBI')
+HEADER_VALUES = HEADER.size * 8
+
+def _bits_to_values(bits, bits_per_channel):
+    """Group a 0/1 array into bits_per_channel-bit values, most significant bit first."""
+    padded = np.zeros(-(-len(bits) // bits_per_channel) * bits_per_channel, dtype=np.uint8)
+    padded[:len(bits)] = bits
+    weights = (1 << np.arange(bits_per_channel - 1, -1, -1)).astype(np.uint8)
+    return (padded.reshape(-1, bits_per_channel) * weights).sum(axis=1, dtype=np.uint8)
+
+def _values_to_bytes(values, bits_per_channel):
+    """Pack the low bits of values into bytes, dropping bits short of a whole byte."""
+    low = (values & ((1 << bits_per_channel) - 1)).astype(np.uint8)
+    bits = np.unpackbits(low[:, np.newaxis], axis=1)[:, 8 - bits_per_channel:].reshape(-1)
+    return np.packbits(bits[:len(bits) - len(bits) % 8])
+
+def _read_terminated_message(values, chunk_size=1 << 16):
+    """Read the earlier format's bytes, one bit per value, up to the null terminator (None without one)."""
+    message = bytearray()
+
+    # Walk the values in chunks that hold whole bytes, stopping at the first null byte
+    for start in range(0, len(values), chunk_size):
+        chunk_bytes = _values_to_bytes(values[start:start + chunk_size], 1)
+        nulls = np.flatnonzero(chunk_bytes == 0)
+        if nulls.size:
+            message += chunk_bytes[:nulls[0]].tobytes()
+            return bytes(message)
+        message += chunk_bytes.tobytes()
+
+    return None
+
+def smallest_bits_per_channel(capacity, message):
+    """Return the smallest bits per channel (1-4) that fits the message in capacity values, or None."""
+    message_bits = len(message.encode('utf-8')) * 8
+
+    for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1):
+        if HEADER_VALUES + -(-message_bits // bits_per_channel) <= capacity:
+            return bits_per_channel
+    return None
+
+def plan_bits_per_channel(image, message):
+    """Return the smallest bits per channel (1-4) that fits the message in the image, or None."""
+    return smallest_bits_per_channel(np.asarray(image).size, message)
+
+def hide_message_in_values(values, message, bits_per_channel=1):
+    """
+    Hide a message in a flat uint8 array of channel values, in place.
+
+    Raises ValueError if the setting is out of range or the values are too
+    few to hold the header and the message.
+    """
+    if not 1 <= bits_per_channel <= MAX_BITS_PER_CHANNEL:
+        raise ValueError(f"Bits per channel must be between 1 and {MAX_BITS_PER_CHANNEL}")
+
+    data = message.encode('utf-8')
+    header_bits = np.unpackbits(np.frombuffer(HEADER.pack(MAGIC, bits_per_channel, len(data)), dtype=np.uint8))
+    message_values = _bits_to_values(np.unpackbits(np.frombuffer(data, dtype=np.uint8)), bits_per_channel)
+    stop = HEADER_VALUES + len(message_values)
+
+    if len(values) < stop:
+        raise ValueError("Image is too small to hide this message")
+
+    # Replace the low bits of the leading values in two vectorized writes
+    values[:HEADER_VALUES] = (values[:HEADER_VALUES] >> 1 << 1) | header_bits
+    values[HEADER_VALUES:stop] = (values[HEADER_VALUES:stop] >> bits_per_channel << bits_per_channel) | message_values
+
+def extract_message_from_values(values):
+    """
+    Extract a hidden message from a flat array of channel values.
+
+    Raises ValueError if the values hold neither a header nor a message in
+    the earlier terminated format.
+    """
+    if len(values) >= HEADER_VALUES:
+        magic, bits_per_channel, length = HEADER.unpack(_values_to_bytes(values[:HEADER_VALUES], 1).tobytes())
+        stop = HEADER_VALUES + -(-length * 8 // max(bits_per_channel, 1))
+        if magic == MAGIC and 1 <= bits_per_channel <= MAX_BITS_PER_CHANNEL and stop <= len(values):
+            data = _values_to_bytes(values[HEADER_VALUES:stop], bits_per_channel)[:length]
+            return data.tobytes().decode('utf-8', errors='replace')
+
+    data = _read_terminated_message(values)
+    if data is None:
+        raise ValueError("No hidden message found in this image")
+    # The earlier format stored one character per byte
+    return data.decode('latin-1')
+
+def hide_message_in_image(image, message, bits_per_channel=1):
+    """Hide a message in every channel value of an image, returning the stego image."""
+    img_array = np.array(image)
+    hide_message_in_values(img_array.reshape(-1), message, bits_per_channel)  # A view, so writes land in img_array
+    return Image.fromarray(img_array)
+
+def extract_message_from_image(image):
+    """Extract a hidden message from an image."""
+    return extract_message_from_values(np.array(image).reshape(-1))
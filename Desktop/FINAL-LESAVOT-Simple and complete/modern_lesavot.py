@@ -21,116 +21,37 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QStackedWidget,
 from PyQt5.QtGui import QPixmap, QFont, QIcon, QColor, QPalette, QImage, QFontDatabase
 from PyQt5.QtCore import Qt, QSize, QTimer, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve
 
-# Steganography functions
-def hide_message_in_image(image, message):
-    """Hide a message in an image using LSB steganography."""
-    # Convert image to numpy array
-    img_array = np.array(image)
-
-    # Convert message to binary
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
-    binary_message += '00000000'  # Add null terminator
-
-    # Check if the image is large enough to hold the message
-    if img_array.size < len(binary_message):
-        raise ValueError("Image is too small to hide this message")
-
-    # Flatten the array to make it easier to iterate
-    flat_array = img_array.flatten()
-
-    # Modify the LSB of each pixel to hide the message
-    for i in range(len(binary_message)):
-        flat_array[i] = (flat_array[i] & ~1) | int(binary_message[i])
-
-    # Reshape back to original image dimensions
-    stego_array = flat_array.reshape(img_array.shape)
-
-    # Convert back to PIL Image
-    stego_image = Image.fromarray(stego_array)
-
-    return stego_image
-
-def extract_message_from_image(image):
-    """Extract a hidden message from an image."""
-    # Convert image to numpy array
-    img_array = np.array(image)
-
-    # Flatten the array
-    flat_array = img_array.flatten()
-
-    # Extract LSB from each pixel
-    binary_message = ''.join(str(pixel & 1) for pixel in flat_array)
-
-    # Convert binary to ASCII
-    message = ""
-    for i in range(0, len(binary_message), 8):
-        if i + 8 <= len(binary_message):
-            byte = binary_message[i:i+8]
-            if byte == '00000000':  # Null terminator
-                break
-            message += chr(int(byte, 2))
-
-    return message
+# Whitespace text and LSB image steganography shared with the web app
+from whitespace_codec import hide_message_in_text, extract_message_from_text
+from image_lsb import plan_bits_per_channel, hide_message_in_image, extract_message_from_image
 
-def hide_message_in_text(text_content, message):
-    """Hide a message in a text file using whitespace steganography."""
-    # Convert message to binary
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
-
-    # Use spaces and tabs to encode binary (space = 0, tab = 1)
-    stego_text = ""
-    for i, char in enumerate(text_content):
-        stego_text += char
-        if i < len(binary_message):
-            if binary_message[i] == '0':
-                stego_text += ' '  # Add space for 0
-            else:
-                stego_text += '\t'  # Add tab for 1
-
-    return stego_text
-
-def extract_message_from_text(stego_text):
-    """Extract a hidden message from a text file."""
-    # Extract binary message from whitespace
-    binary_message = ""
-    for i in range(len(stego_text) - 1):
-        if stego_text[i+1] == ' ':
-            binary_message += '0'
-        elif stego_text[i+1] == '\t':
-            binary_message += '1'
-
-    # Convert binary to ASCII
-    message = ""
-    for i in range(0, len(binary_message), 8):
-        if i + 8 <= len(binary_message):
-            byte = binary_message[i:i+8]
-            message += chr(int(byte, 2))
-
-    return message
+# Steganography functions
+# Samples per bit of the audio functions' amplitude coding
+AUDIO_SEGMENT_LENGTH = 100
 
 def hide_message_in_audio(audio_data, sample_rate, message):
-    """Hide a message in an audio file using phase encoding."""
+    """
+    Hide a message in an audio file using amplitude coding.
+
+    Each bit of the UTF-8 message and its null terminator scales one
+    AUDIO_SEGMENT_LENGTH-sample segment slightly up (1) or down (0); all
+    segments are scaled in one broadcast multiply.
+    """
     # Convert message to binary
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
+    message_bits = np.unpackbits(np.frombuffer(message.encode('utf-8') + b'\0', dtype=np.uint8))
 
     # Ensure audio data is in the right format
     if len(audio_data.shape) > 1:
         audio_data = audio_data[:, 0]  # Use first channel if stereo
 
     # Check if audio is long enough
-    if len(audio_data) < len(binary_message) * 100:
+    used = len(message_bits) * AUDIO_SEGMENT_LENGTH
+    if len(audio_data) < used:
         raise ValueError("Audio file is too short to hide this message")
 
-    # Embed each bit in the phase of the audio
-    for i in range(len(binary_message)):
-        bit = int(binary_message[i])
-        position = i * 100
-
-        # Modify a small segment of audio
-        if bit == 1:
-            audio_data[position:position+100] = audio_data[position:position+100] * 1.001
-        else:
-            audio_data[position:position+100] = audio_data[position:position+100] * 0.999
+    # Scale every message segment at once
+    factors = np.where(message_bits == 1, 1.001, 0.999)
+    audio_data[:used] = (audio_data[:used].reshape(-1, AUDIO_SEGMENT_LENGTH) * factors[:, np.newaxis]).reshape(-1)
 
     return audio_data
 
@@ -140,34 +61,20 @@ def extract_message_from_audio(audio_data):
     if len(audio_data.shape) > 1:
         audio_data = audio_data[:, 0]  # Use first channel if stereo
 
-    # Extract binary message
-    binary_message = ""
-    for i in range(0, len(audio_data) // 100):
-        position = i * 100
-        segment = audio_data[position:position+100]
-
-        # Check amplitude to determine bit
-        if np.mean(np.abs(segment)) > np.mean(np.abs(audio_data)):
-            binary_message += '1'
-        else:
-            binary_message += '0'
-
-        # Stop at null terminator
-        if len(binary_message) % 8 == 0:
-            byte = binary_message[-8:]
-            if byte == '00000000':
-                break
+    # Compare every segment's mean amplitude with the whole signal's, computed once
+    segment_count = len(audio_data) // AUDIO_SEGMENT_LENGTH
+    amplitude = np.abs(audio_data.astype(np.float64))
+    reference = np.mean(amplitude)
+    segment_means = amplitude[:segment_count * AUDIO_SEGMENT_LENGTH].reshape(-1, AUDIO_SEGMENT_LENGTH).mean(axis=1)
+    bits = (segment_means > reference).astype(np.uint8)
 
-    # Convert binary to ASCII
-    message = ""
-    for i in range(0, len(binary_message), 8):
-        if i + 8 <= len(binary_message):
-            byte = binary_message[i:i+8]
-            if byte == '00000000':  # Null terminator
-                break
-            message += chr(int(byte, 2))
+    # Convert binary to text, stopping at the null terminator
+    message_bytes = np.packbits(bits[:len(bits) - len(bits) % 8])
+    nulls = np.flatnonzero(message_bytes == 0)
+    if nulls.size:
+        message_bytes = message_bytes[:nulls[0]]
 
-    return message
+    return message_bytes.tobytes().decode('utf-8', errors='replace')
 
 # Custom widgets
 class SidebarButton(QPushButton):
@@ -806,8 +713,9 @@ class LesavotApp(QMainWindow):
             return
 
         try:
-            # Hide the message
-            stego_image = hide_message_in_image(self.current_image, message)
+            # Hide the message, using more bits per channel only if it does not fit in one
+            bits_per_channel = plan_bits_per_channel(self.current_image, message) or 1
+            stego_image = hide_message_in_image(self.current_image, message, bits_per_channel)
 
             # Save the stego image
             save_path, _ = QFileDialog.getSaveFileName(self, "Save Stego Image", "", "PNG Files (*.png)")
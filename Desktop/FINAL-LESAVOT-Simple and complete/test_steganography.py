@@ -4,6 +4,7 @@ Test script for LESAVOT steganography functions
 """
 
 import os
+import tempfile
 from PIL import Image
 import numpy as np
 import scipy.io.wavfile as wavfile
@@ -12,6 +13,7 @@ import scipy.io.wavfile as wavfile
 from lesavot_app import (
     hide_message_in_image,
     extract_message_from_image,
+    plan_bits_per_channel,
     hide_message_in_text,
     extract_message_from_text,
     hide_message_in_audio,
@@ -40,15 +42,57 @@ def test_image_steganography():
     print(f"Success: {message == extracted_message}")
     print()
 
+def test_multi_bit_image_steganography():
+    """Test image steganography with more than one bit per channel."""
+    print("Testing multi-bit image steganography...")
+    
+    # Create a small test image that cannot hold the message at one bit per channel
+    img = Image.new('RGB', (20, 20), color='white')
+    message = "This message needs more than one bit per channel! " * 3
+    
+    # Plan the bits per channel and hide the message
+    bits_per_channel = plan_bits_per_channel(img, message)
+    stego_img = hide_message_in_image(img, message, bits_per_channel)
+    
+    # Extract the message
+    extracted_message = extract_message_from_image(stego_img)
+    
+    # Verify
+    print(f"Bits per channel: {bits_per_channel}")
+    print(f"Success: {bits_per_channel > 1 and message == extracted_message}")
+    print()
+
+def test_image_message_edge_cases():
+    """Test image messages that an end marker could confuse: empty, non-ASCII and with null bytes."""
+    print("Testing image steganography edge cases...")
+    
+    img = Image.new('RGB', (40, 40), color='white')
+    results = []
+    for message in ["", "Caf\u00e9 \u79d8\u5bc6 \u2713", "before\0after"]:
+        for bits_per_channel in range(1, 5):
+            stego_img = hide_message_in_image(img, message, bits_per_channel)
+            results.append(extract_message_from_image(stego_img) == message)
+    
+    # Images in the earlier format (one bit per value up to a null byte) still read
+    legacy = np.array(img)
+    flat = legacy.reshape(-1)
+    bits = np.unpackbits(np.frombuffer(b"Old message\0", dtype=np.uint8))
+    flat[:len(bits)] = (flat[:len(bits)] & ~1) | bits
+    results.append(extract_message_from_image(Image.fromarray(legacy)) == "Old message")
+    
+    # Verify
+    print(f"Success: {all(results)}")
+    print()
+
 def test_text_steganography():
     """Test text steganography functions."""
     print("Testing text steganography...")
     
-    # Create a test text
-    text = "This is a sample text file.\nIt contains multiple lines.\nWe will hide a message in it."
+    # Create a test text (the message needs one word per bit, plus one)
+    text = "This is a sample text file.\nIt contains multiple lines.\nWe will hide a message in it.\n" * 30
     
     # Test message
-    message = "This is a secret message for testing text steganography!"
+    message = "This is a secret message for testing text steganography! \u2713"
     
     # Hide the message
     stego_text = hide_message_in_text(text, message)
@@ -56,10 +100,11 @@ def test_text_steganography():
     # Extract the message
     extracted_message = extract_message_from_text(stego_text)
     
-    # Verify
+    # Verify, including that every line keeps its words
+    same_lines = [line.split() for line in stego_text.splitlines()] == [line.split() for line in text.splitlines()]
     print(f"Original message: {message}")
     print(f"Extracted message: {extracted_message}")
-    print(f"Success: {message == extracted_message}")
+    print(f"Success: {message == extracted_message and same_lines}")
     print()
 
 def test_audio_steganography():
@@ -87,14 +132,74 @@ def test_audio_steganography():
     print(f"Success: {message in extracted_message}")  # Audio steganography might be less precise
     print()
 
+def test_non_ascii_audio_steganography():
+    """Test audio steganography with a message outside ASCII."""
+    print("Testing non-ASCII audio steganography...")
+    
+    # Create a test audio of constant amplitude, so every segment reads back as written
+    sample_rate = 44100
+    duration = 5  # seconds
+    t = np.linspace(0, duration, sample_rate * duration)
+    audio_data = np.where(np.sin(2 * np.pi * 440 * t) >= 0, 0.5, -0.5)
+    
+    # Test message
+    message = "Secret message: café, naïve, 秘密 ✓"
+    
+    # Hide the message
+    stego_audio = hide_message_in_audio(audio_data, sample_rate, message)
+    
+    # Extract the message
+    extracted_message = extract_message_from_audio(stego_audio)
+    
+    # Verify
+    print(f"Original message: {message}")
+    print(f"Extracted message: {extracted_message}")
+    print(f"Success: {message == extracted_message}")
+    print()
+
+def test_web_app_non_ascii_audio_steganography():
+    """Test the web app's audio steganography with a message outside ASCII."""
+    print("Testing web app non-ASCII audio steganography...")
+
+    from examples.web_app import AudioSteganography
+
+    # Create a test audio file of constant amplitude, so every segment reads back as written
+    sample_rate = 44100
+    duration = 10  # seconds, one 1024-sample segment per bit
+    t = np.linspace(0, duration, sample_rate * duration)
+    audio_data = np.int16(np.where(np.sin(2 * np.pi * 440 * t) >= 0, 16000, -16000))
+
+    # Test message
+    message = "Secret message: café, naïve, 秘密 ✓"
+
+    with tempfile.TemporaryDirectory() as folder:
+        cover_path = os.path.join(folder, "cover.wav")
+        stego_path = os.path.join(folder, "stego.wav")
+        wavfile.write(cover_path, sample_rate, audio_data)
+
+        # Hide and extract the message
+        audio_stego = AudioSteganography()
+        embedded = audio_stego.embed(cover_path, message, stego_path)
+        extracted_message = audio_stego.extract(stego_path) if embedded else None
+
+    # Verify
+    print(f"Original message: {message}")
+    print(f"Extracted message: {extracted_message}")
+    print(f"Success: {message == extracted_message}")
+    print()
+
 def main():
     """Run all tests."""
     print("=== LESAVOT Steganography Tests ===")
     print()
     
     test_image_steganography()
+    test_multi_bit_image_steganography()
+    test_image_message_edge_cases()
     test_text_steganography()
     test_audio_steganography()
+    test_non_ascii_audio_steganography()
+    test_web_app_non_ascii_audio_steganography()
     
     print("All tests completed!")
 
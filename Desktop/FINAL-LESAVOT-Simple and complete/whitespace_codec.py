@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Whitespace codec shared by the LESAVOT applications.
+
+A message is hidden in the spacing between the words of a cover text: each
+gap after the first word starts with one space for a 0 bit or two spaces
+for a 1, most significant bit first, and a null byte ends the UTF-8
+message. A gap that carries a bit is replaced by its spaces, except that a
+gap holding a line break keeps everything after its leading spaces and
+tabs, so lines and paragraphs survive; the text after the message is
+copied unchanged.
+
+Hiding splits the words out with one str.split() and visits only the line
+breaks, and the output is built with list joins; decoding reads the gaps
+with one compiled regular expression, packs the bits with numpy and stops
+at the terminator, so both directions are linear in the size of the text. Covers
+are read CHUNK_SIZE characters at a time, so file-to-file hiding and
+extraction hold one chunk (plus the words that carry bits) however large
+the document is.
+
+Text from the web app's earlier word spacing (words joined with one or two
+spaces, then a null byte) reads the same way for ASCII messages. The
+desktop apps' earlier format, a space or tab after every character, has no
+terminator and cannot be told apart from the cover's own spaces, so it is
+not supported.
+"""
+
+import io
+import re
+from itertools import chain
+
+import numpy as np
+
+# Characters to hold at once when reading a cover
+CHUNK_SIZE = 1 << 20
+
+# The rest of a gap from a line break in it
+GAP_END = re.compile(r'\s*')
+
+# A gap's second character, a space only in a gap carrying a 1
+GAP_BITS = re.compile(r'\s(\s?)\s*')
+
+# Gap prefixes of a 0 and a 1 bit
+BIT_SPACES = (' ', '  ')
+
+def message_bits(message):
+    """Get the bits of a UTF-8 message and its null terminator as a 0/1 array."""
+    return np.unpackbits(np.frombuffer(message.encode('utf-8') + b'\0', dtype=np.uint8))
+
+def hide_message_in_stream(cover, message, output, chunk_size=CHUNK_SIZE):
+    """
+    Hide a message while copying text from one file object to another.
+
+    Raises ValueError, before anything is written, if the cover has fewer
+    words than the message has bits plus one.
+    """
+    bits = message_bits(message)
+
+    # Read until the text holds the first word and the start of one word per bit
+    head = []
+    words = 0
+    last_character = ' '
+    for chunk in iter(lambda: cover.read(chunk_size), ''):
+        head.append(chunk)
+        # A word running on from the previous chunk was counted there
+        words += len(chunk.split()) - (not last_character.isspace() and not chunk[0].isspace())
+        last_character = chunk[-1]
+        if words > len(bits):
+            break
+    head = ''.join(head)
+
+    # One word per bit after the first; the last part is the rest of the text from the final carrying word on
+    body = head.lstrip()
+    parts = body.split(None, len(bits))
+    if len(parts) <= len(bits):
+        raise ValueError("Text is too short to hide this message")
+
+    # One gap per bit, and a gap holding a line break keeps what follows its spaces and tabs
+    separators = list(map(BIT_SPACES.__getitem__, bits.tolist()))
+    words = end = 0
+    line_break = body.find('\n')
+    while line_break >= 0:
+        start = line_break
+        while body[start - 1].isspace():
+            start -= 1
+        words += len(body[end:start].split())
+        if words > len(bits):
+            break
+        end = GAP_END.match(body, line_break).end()
+        separators[words - 1] += body[start:end].lstrip(' \t')
+        line_break = body.find('\n', end)
+
+    pieces = [None] * (2 * len(bits))
+    pieces[0::2] = separators
+    pieces[1::2] = parts[1:]
+    output.write(head[:len(head) - len(body)])
+    output.write(parts[0])
+    output.write(''.join(pieces))
+
+    # The text after the message is copied as it is
+    for chunk in iter(lambda: cover.read(chunk_size), ''):
+        output.write(chunk)
+
+def hide_message_in_text(text, message):
+    """Hide a message in a text, returning the stego text."""
+    output = io.StringIO()
+    hide_message_in_stream(io.StringIO(text), message, output)
+    return output.getvalue()
+
+def extract_message_from_stream(stego, chunk_size=CHUNK_SIZE):
+    """
+    Extract a hidden message from a text file object, reading only up to the terminator.
+
+    Without a terminator every whole byte of the text's gaps is returned.
+    """
+    message = []
+    pending = np.zeros(0, dtype=np.uint8)  # Bits short of a whole byte
+    carry = ''                             # Whitespace at the end of a chunk, which may continue in the next
+    started = False                        # Whitespace before the first word carries no bit
+
+    for chunk in chain(iter(lambda: stego.read(chunk_size), ''), [None]):
+        if chunk is None:
+            text, carry = carry, ''  # End of the text
+        else:
+            text = carry + chunk
+            if not started:
+                text = text.lstrip()
+                started = bool(text)
+            stripped = text.rstrip()
+            text, carry = stripped, text[len(stripped):]
+
+        seconds = GAP_BITS.findall(text)
+        bits = np.fromiter(map(' '.__eq__, seconds), dtype=np.uint8, count=len(seconds))
+        bits = np.concatenate((pending, bits))
+
+        whole = len(bits) - len(bits) % 8
+        data = np.packbits(bits[:whole])
+        pending = bits[whole:]
+
+        nulls = np.flatnonzero(data == 0)
+        if nulls.size:
+            message.append(data[:nulls[0]].tobytes())
+            break
+        message.append(data.tobytes())
+
+    return b''.join(message).decode('utf-8', errors='replace')
+
+def extract_message_from_text(stego_text):
+    """Extract a hidden message from a text."""
+    return extract_message_from_stream(io.StringIO(stego_text))
@@ -0,0 +1,168 @@
+# app/audio_cache.py
+"""
+Decoded audio cache module for the multimodal steganography application.
+
+Decoding a compressed carrier (MP3, OGG) takes far longer than hiding a
+message in it, and popular cover tracks are uploaded again and again. This
+module keeps decoded PCM on disk as .npy files named by the SHA-256 of the
+encoded file, memory-maps them on a hit, and evicts the least recently used
+entries once the cache grows past its size cap. Recency is the entry's
+modification time, touched on every hit, so worker processes share one cache.
+"""
+
+import os
+import glob
+import hashlib
+import tempfile
+import threading
+from typing import BinaryIO, Optional, Tuple, Union
+
+import numpy as np
+
+# Cache settings
+AUDIO_CACHE_FOLDER = os.path.join(tempfile.gettempdir(), 'steganography_audio_cache')
+AUDIO_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # Decoded PCM kept on disk before LRU eviction
+HASH_BLOCK_SIZE = 1 << 20  # Bytes read at a time while hashing a carrier
+
+
+class DecodedAudioCache:
+    """
+    On-disk LRU cache of decoded audio, keyed by the content hash of the encoded file.
+
+    Entries are written atomically, so concurrent workers may share a
+    directory; an entry evicted by another process is simply a miss. Within
+    a process a lock guards the hit/miss counters and eviction, so request
+    threads may share one instance.
+    """
+
+    def __init__(self, directory: str = AUDIO_CACHE_FOLDER, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        """
+        Create a cache over a directory (created on the first store).
+
+        Args:
+            directory: Directory holding the cached .npy files
+            max_bytes: Maximum total size of the cached files (0 disables caching)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(file: Union[str, os.PathLike, BinaryIO]) -> str:
+        """
+        Hash the content of an encoded carrier.
+
+        Args:
+            file: Path or seekable binary file object (read from its current
+                  position, which is restored afterwards)
+
+        Returns:
+            str: Hex SHA-256 of the content
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                return DecodedAudioCache.digest(f)
+
+        start = file.tell()
+        sha = hashlib.sha256()
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            sha.update(block)
+        file.seek(start)
+        return sha.hexdigest()
+
+    def _entries(self, digest: str = '*'):
+        """List cached files, optionally only those of one digest."""
+        return glob.glob(os.path.join(self.directory, f"{digest}_*.npy"))
+
+    def get(self, digest: str) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Look up decoded audio.
+
+        Args:
+            digest: Content hash from digest()
+
+        Returns:
+            tuple: (copy-on-write memory map of the samples, sample rate), or None on a miss
+        """
+        for path in self._entries(digest):
+            try:
+                samples = np.load(path, mmap_mode='c')
+                os.utime(path)  # Mark as recently used
+            except (OSError, ValueError):
+                continue  # Evicted or being replaced by another process
+            with self._lock:
+                self.hits += 1
+            return samples, int(os.path.basename(path)[len(digest) + 1:-len('.npy')])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, digest: str, samples: np.ndarray, samplerate: int) -> np.ndarray:
+        """
+        Store decoded audio and evict least recently used entries over the size cap.
+
+        Args:
+            digest: Content hash from digest()
+            samples: Decoded samples
+            samplerate: Sample rate of the samples
+
+        Returns:
+            ndarray: A copy-on-write memory map of the stored samples, or
+            samples itself if they are not cached (caching disabled or too large)
+        """
+        if samples.nbytes > self.max_bytes:
+            return samples
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{digest}_{samplerate}.npy")
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, samples)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return samples
+
+        with self._lock:
+            self._trim()
+        try:
+            return np.load(path, mmap_mode='c')
+        except (OSError, ValueError):
+            return samples  # Evicted by another process in the meantime
+
+    def _trim(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes (call with the lock held)."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Already gone, or still mapped on a platform that forbids removal
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Process-wide cache
+audio_cache = DecodedAudioCache()
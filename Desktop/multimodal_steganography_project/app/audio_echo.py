@@ -0,0 +1,140 @@
+# app/audio_echo.py
+"""
+Echo hiding module for the multimodal steganography application.
+
+Bits are hidden as faint echoes. The carrier is cut into frames of
+ECHO_FRAME_LENGTH samples, and each frame is mixed from one of two copies
+of the signal: one with an echo at the bit-0 delay, one with an echo at the
+bit-1 delay. Both copies are made with one FFT convolution of the whole
+signal, and the mix between them is a single smoothed weight signal, so
+embedding costs two convolutions however many bits are hidden.
+
+Every bit is written ECHO_REPEATS times, the copies a whole run of bits
+apart, so a silent or unsuitable stretch of the carrier costs each bit at
+most one copy rather than a run of bits all their copies.
+
+Decoding takes the real cepstrum of every frame at once; the echo shows up
+as a peak at its delay, so each copy votes by how much larger the cepstral
+value is at the bit-1 delay than at the bit-0 delay, and each bit is the
+sign of its copies' summed votes. Frames quieter than ECHO_MIN_LEVEL, where
+rounding noise drowns the echo, do not vote. The delays are derived from
+the password, so the echo kernel is keyed like the LSB sample order.
+
+scipy is imported on first use, so importing this module stays cheap.
+"""
+
+import hashlib
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Echo settings
+ECHO_FRAME_LENGTH = 1024   # Samples per copy of a hidden bit
+ECHO_REPEATS = 3           # Copies of every bit
+ECHO_MIN_LEVEL = 1e-4      # RMS (full scale 1.0) below which a frame does not vote
+ECHO_AMPLITUDE = 0.3       # Echo gain relative to the signal
+ECHO_MIN_DELAY = 40        # Shortest echo delay in samples (about 1 ms at 44.1 kHz)
+ECHO_DELAY_SPAN = 64       # Delays are keyed within ECHO_MIN_DELAY .. ECHO_MIN_DELAY + ECHO_DELAY_SPAN
+ECHO_MIN_DELAY_GAP = 8     # Fewest samples between the bit-0 and bit-1 delays
+ECHO_RAMP_LENGTH = 256     # Samples over which the mix moves between the two echoes
+
+
+def echo_delays(password: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Get the keyed echo delays for bit 0 and bit 1.
+
+    Args:
+        password: Optional password; carriers without one use a default key
+
+    Returns:
+        tuple: (bit-0 delay, bit-1 delay) in samples
+    """
+    digest = hashlib.sha256(b'steganography-echo:' + (password or "default").encode()).digest()
+    span = ECHO_DELAY_SPAN - 2 * ECHO_MIN_DELAY_GAP + 1  # Keeps the delays at least the gap apart both ways
+    delay_0 = ECHO_MIN_DELAY + int.from_bytes(digest[:4], 'big') % ECHO_DELAY_SPAN
+    offset = ECHO_MIN_DELAY_GAP + int.from_bytes(digest[4:8], 'big') % span
+    delay_1 = ECHO_MIN_DELAY + (delay_0 - ECHO_MIN_DELAY + offset) % ECHO_DELAY_SPAN
+    return delay_0, delay_1
+
+
+def echo_capacity(frames: int, frame_length: int = ECHO_FRAME_LENGTH) -> int:
+    """Get the number of bits a carrier of a given length can hold."""
+    return frames // (frame_length * ECHO_REPEATS)
+
+
+def echo_frames_needed(count: int, frame_length: int = ECHO_FRAME_LENGTH) -> int:
+    """Get the number of leading carrier frames that hold count bits."""
+    return count * ECHO_REPEATS * frame_length
+
+
+def embed_echo_bits(signal: np.ndarray, bits: np.ndarray, delays: Tuple[int, int],
+                    frame_length: int = ECHO_FRAME_LENGTH, amplitude: float = ECHO_AMPLITUDE) -> np.ndarray:
+    """
+    Hide bits as echoes in the leading frames of a signal, ECHO_REPEATS copies each.
+
+    Args:
+        signal: Frames x channels float array
+        bits: Array of 0/1 values
+        delays: (bit-0 delay, bit-1 delay) in samples
+        frame_length: Samples per bit
+        amplitude: Echo gain
+
+    Returns:
+        ndarray: The signal with echoes, same shape as the input; samples
+        after the last copy's frame are unchanged
+    """
+    from scipy.signal import oaconvolve
+
+    used = echo_frames_needed(len(bits), frame_length)
+    if used > len(signal):
+        raise ValueError("Signal is too short for this many bits")
+
+    # Copy r of bit i goes in frame r * len(bits) + i
+    bits = np.tile(bits, ECHO_REPEATS)
+
+    # One echoed copy per bit value, each from a single convolution over all channels
+    # (float32 holds 24-bit PCM exactly and halves the FFT work)
+    segment = signal[:used].astype(np.float32)
+    echoed = []
+    for delay in delays:
+        kernel = np.zeros((delay + 1, 1), dtype=np.float32)
+        kernel[0], kernel[delay] = 1.0, amplitude
+        echoed.append(oaconvolve(segment, kernel, axes=0)[:used])
+
+    # Weight of the bit-1 copy (the bit-0 copy gets the rest), smoothed by a moving average
+    weight = np.pad(np.repeat(bits.astype(np.float64), frame_length), ECHO_RAMP_LENGTH // 2, mode='edge')
+    totals = np.concatenate(([0.0], np.cumsum(weight)))
+    weight = ((totals[ECHO_RAMP_LENGTH:] - totals[:-ECHO_RAMP_LENGTH]) / ECHO_RAMP_LENGTH)[:used]
+
+    result = signal.copy()
+    result[:used] = echoed[0] + (echoed[1] - echoed[0]) * weight[:, np.newaxis].astype(np.float32)
+    return result
+
+
+def detect_echo_bits(signal: np.ndarray, count: int, delays: Tuple[int, int],
+                     frame_length: int = ECHO_FRAME_LENGTH) -> np.ndarray:
+    """
+    Read bits hidden by embed_echo_bits from the cepstrum of every frame at once.
+
+    Each bit is the sign of its copies' summed cepstral votes; frames quieter
+    than ECHO_MIN_LEVEL do not vote.
+
+    Args:
+        signal: Frames x channels (or mono) float array
+        count: Number of bits to read
+        delays: (bit-0 delay, bit-1 delay) in samples
+        frame_length: Samples per bit
+
+    Returns:
+        ndarray: uint8 array of count 0/1 values
+    """
+    if signal.ndim > 1:
+        signal = signal.mean(axis=1)  # Every channel carries the same echoes
+
+    frames = signal[:echo_frames_needed(count, frame_length)].reshape(ECHO_REPEATS * count, frame_length)
+    spectrum = np.fft.rfft(frames * np.hanning(frame_length), axis=1)
+    cepstrum = np.fft.irfft(np.log(np.abs(spectrum) + 1e-12), n=frame_length, axis=1)
+
+    votes = cepstrum[:, delays[1]] - cepstrum[:, delays[0]]
+    votes[np.sqrt(np.mean(np.square(frames), axis=1)) < ECHO_MIN_LEVEL] = 0
+    return (votes.reshape(ECHO_REPEATS, count).sum(axis=0) > 0).astype(np.uint8)
@@ -0,0 +1,127 @@
+# app/audio_phase.py
+"""
+Phase coding module for the multimodal steganography application.
+
+Bits are hidden in the phase of a band of STFT bins. The carrier is split
+into non-overlapping frames of PHASE_FRAME_LENGTH samples, and in every
+frame PHASE_BITS_PER_FRAME consecutive bins are set to a phase of +pi/2
+(bit 1) or -pi/2 (bit 0) while keeping their magnitude. All frames are
+transformed as one matrix with scipy.signal.stft and resynthesized with one
+istft, so embedding costs one forward and one inverse transform however many
+bits are hidden. Rectangular, non-overlapping frames make the transform
+exactly invertible, so decoding is a single stft and the sign of the
+imaginary part of each bin.
+
+The band position is derived from the password, like the LSB sample order.
+Bins too quiet to survive rounding back to integer PCM are raised to a
+minimum magnitude given by the caller.
+
+scipy is imported on first use, so importing this module stays cheap.
+"""
+
+import hashlib
+from typing import Optional
+
+import numpy as np
+
+# Phase coding settings
+PHASE_FRAME_LENGTH = 1024    # Samples per frame
+PHASE_BITS_PER_FRAME = 64    # Bins, and so bits, per frame
+PHASE_MIN_BIN = 16           # Lowest bin the band may start at (about 690 Hz at 44.1 kHz)
+PHASE_BIN_SPAN = 64          # The band starts within PHASE_MIN_BIN .. PHASE_MIN_BIN + PHASE_BIN_SPAN
+
+
+def phase_bins(password: Optional[str] = None) -> np.ndarray:
+    """
+    Get the keyed band of STFT bins that holds the bits.
+
+    Args:
+        password: Optional password; carriers without one use a default key
+
+    Returns:
+        ndarray: PHASE_BITS_PER_FRAME consecutive bin indices
+    """
+    digest = hashlib.sha256(b'steganography-phase:' + (password or "default").encode()).digest()
+    first = PHASE_MIN_BIN + int.from_bytes(digest[:4], 'big') % PHASE_BIN_SPAN
+    return np.arange(first, first + PHASE_BITS_PER_FRAME)
+
+
+def phase_capacity(frames: int, frame_length: int = PHASE_FRAME_LENGTH) -> int:
+    """Get the number of bits a carrier of a given length can hold."""
+    return frames // frame_length * PHASE_BITS_PER_FRAME
+
+
+def phase_frames_needed(count: int, frame_length: int = PHASE_FRAME_LENGTH) -> int:
+    """Get the number of leading carrier frames that hold count bits."""
+    return -(-count // PHASE_BITS_PER_FRAME) * frame_length
+
+
+def _stft(signal: np.ndarray, frame_length: int) -> np.ndarray:
+    """Transform a frames x channels signal to a channels x bins x frames matrix."""
+    from scipy.signal import stft
+
+    return stft(signal.T, nperseg=frame_length, noverlap=0, window='boxcar',
+                boundary=None, padded=False)[2]
+
+
+def embed_phase_bits(signal: np.ndarray, bits: np.ndarray, bins: np.ndarray,
+                     min_magnitude: float = 0.0, frame_length: int = PHASE_FRAME_LENGTH) -> np.ndarray:
+    """
+    Hide bits in the phase of the leading frames of a signal.
+
+    Args:
+        signal: Frames x channels float array
+        bits: Array of 0/1 values, PHASE_BITS_PER_FRAME per frame
+        bins: Bin indices from phase_bins()
+        min_magnitude: Smallest magnitude a coded bin is given, in STFT units
+        frame_length: Samples per frame
+
+    Returns:
+        ndarray: The signal with coded phases, same shape as the input;
+        samples after the last coded frame are unchanged
+    """
+    from scipy.signal import istft
+
+    used = phase_frames_needed(len(bits), frame_length)
+    if used > len(signal):
+        raise ValueError("Signal is too short for this many bits")
+
+    spectrum = _stft(signal[:used], frame_length)
+    coded = spectrum[:, bins, :]
+
+    # Bits run bin by bin within a frame, frame by frame; the last frame may be partly used
+    count = coded.shape[2] * len(bins)
+    wanted = np.zeros(count, dtype=np.complex128)
+    wanted[:len(bits)] = np.where(bits.astype(bool), 1j, -1j)
+    wanted = wanted.reshape(-1, len(bins)).T
+
+    # Every channel gets the same phase, keeping its own magnitude
+    magnitude = np.maximum(np.abs(coded), min_magnitude)
+    spectrum[:, bins, :] = np.where(wanted != 0, magnitude * wanted, coded)
+
+    samples = istft(spectrum, nperseg=frame_length, noverlap=0, window='boxcar', boundary=False)[1]
+
+    result = signal.copy()
+    result[:used] = samples.T[:used]
+    return result
+
+
+def detect_phase_bits(signal: np.ndarray, count: int, bins: np.ndarray,
+                      frame_length: int = PHASE_FRAME_LENGTH) -> np.ndarray:
+    """
+    Read bits hidden by embed_phase_bits with one transform over every frame.
+
+    Args:
+        signal: Frames x channels float array
+        count: Number of bits to read
+        bins: Bin indices from phase_bins()
+        frame_length: Samples per frame
+
+    Returns:
+        ndarray: uint8 array of count 0/1 values
+    """
+    spectrum = _stft(signal[:phase_frames_needed(count, frame_length)], frame_length)
+
+    # Summing the channels keeps the sign, since they were all given the same phase
+    imaginary = spectrum[:, bins, :].imag.sum(axis=0)
+    return (imaginary.T.reshape(-1)[:count] > 0).astype(np.uint8)
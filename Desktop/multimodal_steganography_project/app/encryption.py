@@ -7,16 +7,29 @@ It supports multiple encryption modes and includes key management functionality.
 """
 
 import os
+import hmac
+import time
 import base64
 import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Optional
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 from Crypto.Random import get_random_bytes
 
+logger = logging.getLogger(__name__)
+
 # Default encryption settings
 DEFAULT_KEY_FILE = 'encryption_key.json'
 DEFAULT_MODE = AES.MODE_CBC
+PBKDF2_ITERATIONS = 1000000
+
+# Derived-key cache settings
+KEY_CACHE_MAX_SIZE = 64
+KEY_CACHE_TTL = 600  # seconds
 
 # Generate a secure random key if none exists
 def generate_key(key_size: int = 32) -> bytes:
@@ -107,14 +120,147 @@ def get_encryption_key(key_file: str = DEFAULT_KEY_FILE) -> bytes:
 # Current encryption key
 key = get_encryption_key()
 
+class DerivedKeyCache:
+    """
+    Process-local LRU cache of password-derived keys.
+
+    Entries are keyed by an HMAC fingerprint of (password, salt, iterations)
+    under a per-process secret, so the cache never holds passwords. Keys are
+    stored in bytearrays that are zeroed when an entry is evicted, expires
+    or the cache is cleared.
+    """
+
+    def __init__(self, max_size: int = KEY_CACHE_MAX_SIZE, ttl: float = KEY_CACHE_TTL):
+        """
+        Create an empty cache.
+
+        Args:
+            max_size: Maximum number of keys kept (0 disables caching)
+            ttl: Seconds a key stays valid after it was stored
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._secret = get_random_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, password: str, salt: bytes, iterations: int) -> bytes:
+        """Compute the cache key for a derivation."""
+        password_bytes = password.encode('utf-8') if isinstance(password, str) else bytes(password)
+        data = len(password_bytes).to_bytes(4, 'big') + password_bytes + salt + iterations.to_bytes(8, 'big')
+        return hmac.new(self._secret, data, hashlib.sha256).digest()
+
+    @staticmethod
+    def _zeroize(derived_key: bytearray) -> None:
+        """Overwrite a cached key in place."""
+        derived_key[:] = bytes(len(derived_key))
+
+    def _evict(self, fingerprint: bytes) -> None:
+        """Remove an entry and zero its key. Must be called with the lock held."""
+        derived_key, _ = self._entries.pop(fingerprint)
+        self._zeroize(derived_key)
+
+    def _trim(self) -> None:
+        """Drop expired entries and shrink to max_size. Must be called with the lock held."""
+        now = time.monotonic()
+        for fingerprint in [fp for fp, (_, expires) in self._entries.items() if expires <= now]:
+            self._evict(fingerprint)
+        while len(self._entries) > max(self.max_size, 0):
+            self._evict(next(iter(self._entries)))
+
+    def get(self, password: str, salt: bytes, iterations: int) -> Optional[bytes]:
+        """
+        Look up a derived key.
+
+        Args:
+            password: The password the key was derived from
+            salt: The salt used for derivation
+            iterations: The PBKDF2 iteration count
+
+        Returns:
+            bytes: The cached key, or None on a miss
+        """
+        fingerprint = self._fingerprint(password, salt, iterations)
+        with self._lock:
+            self._trim()
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return bytes(entry[0])
+
+    def put(self, password: str, salt: bytes, iterations: int, derived_key: bytes) -> None:
+        """
+        Store a derived key.
+
+        Args:
+            password: The password the key was derived from
+            salt: The salt used for derivation
+            iterations: The PBKDF2 iteration count
+            derived_key: The derived key
+        """
+        if self.max_size <= 0:
+            return
+
+        fingerprint = self._fingerprint(password, salt, iterations)
+        with self._lock:
+            if fingerprint in self._entries:
+                self._evict(fingerprint)
+            self._entries[fingerprint] = (bytearray(derived_key), time.monotonic() + self.ttl)
+            self._trim()
+
+    def configure(self, max_size: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """
+        Change the cache limits, evicting entries that no longer fit.
+
+        Args:
+            max_size: New maximum number of keys
+            ttl: New time-to-live in seconds (applies to keys stored from now on)
+        """
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            self._trim()
+
+    def clear(self) -> None:
+        """Zero and drop every cached key and reset the counters."""
+        with self._lock:
+            for fingerprint in list(self._entries):
+                self._evict(fingerprint)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, int]: hits, misses and current size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+# Shared cache for derive_key_from_password
+key_cache = DerivedKeyCache()
+
 # Derive a key from a password
-def derive_key_from_password(password: str, salt: bytes = None) -> tuple:
+def derive_key_from_password(password: str, salt: bytes = None, iterations: int = PBKDF2_ITERATIONS) -> tuple:
     """
     Derive an encryption key from a password using PBKDF2.
 
+    Keys are served from key_cache when the same password, salt and
+    iteration count were derived recently.
+
     Args:
         password: The password to derive the key from
         salt: Optional salt for key derivation (generated if None)
+        iterations: Number of PBKDF2 iterations
 
     Returns:
         tuple: (key, salt)
@@ -125,14 +271,23 @@ def derive_key_from_password(password: str, salt: bytes = None) -> tuple:
     # Generate a random salt if none is provided
     if salt is None:
         salt = get_random_bytes(16)
+    else:
+        # Reuse a key derived earlier for the same password and salt
+        derived_key = key_cache.get(password, salt, iterations)
+        if derived_key is not None:
+            return derived_key, salt
 
     # Derive a 32-byte key (256 bits) from the password
-    derived_key = PBKDF2(password, salt, dkLen=32, count=1000000, hmac_hash_module=SHA256)
+    derived_key = PBKDF2(password, salt, dkLen=32, count=iterations, hmac_hash_module=SHA256)
+
+    # Keep it so extracting this carrier again does not pay the KDF
+    key_cache.put(password, salt, iterations, derived_key)
 
     return derived_key, salt
 
 # Encryption function
-def encrypt_message(message: str, password: str = None, mode: int = DEFAULT_MODE) -> bytes:
+def encrypt_message(message: str, password: str = None, mode: int = DEFAULT_MODE,
+                    iterations: int = PBKDF2_ITERATIONS) -> bytes:
     """
     Encrypt a message using AES encryption.
 
@@ -140,6 +295,7 @@ def encrypt_message(message: str, password: str = None, mode: int = DEFAULT_MODE
         message: The message to encrypt
         password: Optional password for encryption (uses global key if None)
         mode: The AES mode to use (default: MODE_CBC)
+        iterations: PBKDF2 iterations used to derive the key from the password
 
     Returns:
         bytes: The encrypted message (salt + IV + ciphertext)
@@ -148,7 +304,7 @@ def encrypt_message(message: str, password: str = None, mode: int = DEFAULT_MODE
         # Use password-based encryption if password is provided
         if password:
             # Derive a key from the password
-            derived_key, salt = derive_key_from_password(password)
+            derived_key, salt = derive_key_from_password(password, iterations=iterations)
 
             if mode == AES.MODE_CBC or mode == AES.MODE_CFB:
                 cipher = AES.new(derived_key, mode)
@@ -174,7 +330,8 @@ def encrypt_message(message: str, password: str = None, mode: int = DEFAULT_MODE
         raise RuntimeError(f"Encryption error: {str(e)}")
 
 # Decryption function
-def decrypt_message(encrypted_message: bytes, mode: int = DEFAULT_MODE, password: str = None) -> str:
+def decrypt_message(encrypted_message: bytes, mode: int = DEFAULT_MODE, password: str = None,
+                    iterations: int = PBKDF2_ITERATIONS) -> str:
     """
     Decrypt a message using AES encryption.
 
@@ -182,17 +339,15 @@ def decrypt_message(encrypted_message: bytes, mode: int = DEFAULT_MODE, password
         encrypted_message: The encrypted message (salt + IV/nonce + ciphertext)
         mode: The AES mode to use (default: MODE_CBC)
         password: Optional password for decryption (uses global key if None)
+        iterations: PBKDF2 iterations used to derive the key from the password
 
     Returns:
         str: The decrypted message
     """
-    # Add debug logging
-    print(f"DEBUG: Attempting to decrypt message with password: {password is not None}")
-    print(f"DEBUG: Encrypted message length: {len(encrypted_message)} bytes")
+    logger.debug("Decrypting %d bytes (password: %s)", len(encrypted_message), password is not None)
 
     # Validate input
     if len(encrypted_message) < 48:  # Need at least salt (16) + IV (16) + some ciphertext
-        print(f"DEBUG: Encrypted message too short: {len(encrypted_message)} bytes")
         raise ValueError("Invalid encrypted message: too short")
 
     try:
@@ -204,21 +359,18 @@ def decrypt_message(encrypted_message: bytes, mode: int = DEFAULT_MODE, password
 
         # If password is required but not provided
         if is_password_encrypted and not password:
-            print("DEBUG: Message is password-protected but no password provided")
+            logger.debug("Message is password-protected but no password was provided")
             raise ValueError("This message is password-protected. Please provide a password.")
 
         # If password is provided but message is not password-encrypted
         if password and not is_password_encrypted:
-            print("DEBUG: Password provided but message is not password-encrypted")
-            # Continue with global key
-
-        print(f"DEBUG: Processing encrypted message with salt: {salt.hex()[:16]}...")
+            logger.debug("Password provided but message is not password-encrypted, using the global key")
 
         # Use the appropriate key
         encryption_key = key  # Default to global key
         if password and is_password_encrypted:
             # Derive the key from the password and salt
-            encryption_key, _ = derive_key_from_password(password, salt)
+            encryption_key, _ = derive_key_from_password(password, salt, iterations)
 
         if mode == AES.MODE_CBC or mode == AES.MODE_CFB:
             iv = encrypted_message[16:32]
@@ -226,7 +378,7 @@ def decrypt_message(encrypted_message: bytes, mode: int = DEFAULT_MODE, password
             cipher = AES.new(encryption_key, mode, iv)
             pt = unpad(cipher.decrypt(ct), AES.block_size)
             result = pt.decode('utf-8')
-            print(f"DEBUG: Successfully decrypted message: {result[:50] if len(result) > 50 else result}")
+            logger.debug("Decrypted %d bytes", len(pt))
             return result
         elif mode == AES.MODE_EAX or mode == AES.MODE_GCM:
             nonce = encrypted_message[16:32]
@@ -235,12 +387,12 @@ def decrypt_message(encrypted_message: bytes, mode: int = DEFAULT_MODE, password
             cipher = AES.new(encryption_key, mode, nonce)
             pt = cipher.decrypt_and_verify(ct, tag)
             result = pt.decode('utf-8')
-            print(f"DEBUG: Successfully decrypted message: {result[:50] if len(result) > 50 else result}")
+            logger.debug("Decrypted %d bytes", len(pt))
             return result
         else:
             raise ValueError(f"Unsupported mode: {mode}")
     except Exception as e:
-        print(f"DEBUG: Decryption failed: {str(e)}")
+        logger.debug("Decryption failed: %s", type(e).__name__)
         # If a password was provided, always treat decryption errors as password errors
         if password is not None:
             if "padding" in str(e).lower() or "tag" in str(e).lower() or "mac" in str(e).lower():
@@ -265,3 +417,59 @@ def get_available_modes() -> Dict[str, int]:
         'EAX': AES.MODE_EAX,
         'GCM': AES.MODE_GCM
     }
+
+# Helper function to size messages for a carrier
+def max_plaintext_length(capacity: int, mode: int = DEFAULT_MODE) -> int:
+    """
+    Get the longest message (in UTF-8 bytes) whose encrypt_message output fits in a capacity.
+
+    Args:
+        capacity: Number of bytes available for the encrypted message
+        mode: The AES mode to use (default: MODE_CBC)
+
+    Returns:
+        int: The maximum plaintext length in bytes (0 if nothing fits)
+    """
+    if mode == AES.MODE_CBC or mode == AES.MODE_CFB:
+        # Salt + IV, then whole padded blocks (padding always adds at least one byte)
+        return max(0, (capacity - 32) // AES.block_size * AES.block_size - 1)
+    if mode == AES.MODE_EAX or mode == AES.MODE_GCM:
+        # Salt + nonce + tag, then an unpadded ciphertext
+        return max(0, capacity - 48)
+    raise ValueError(f"Unsupported mode: {mode}")
+
+# Helper function to read messages whose length was never stored
+def decrypt_terminated_message(data: bytes, password: str, iterations: int = PBKDF2_ITERATIONS) -> str:
+    """
+    Decrypt a null-terminated CBC message from the start of a longer byte stream.
+
+    Carriers written before the payload header hold salt + IV + the
+    ciphertext of message + '\\0', followed by unrelated carrier bits. CBC
+    decrypts each block from the ciphertext block before it, so the whole
+    stream is decrypted with one key derivation and one pass; the message
+    ends at the first null byte, and the padding that follows it must be
+    valid for the password to be right.
+
+    Args:
+        data: The carrier bytes, starting with the salt
+        password: The password used to encrypt the message
+        iterations: PBKDF2 iterations used to derive the key
+
+    Returns:
+        str: The decrypted message, without its terminator
+    """
+    blocks = (len(data) - 32) // AES.block_size
+    if blocks < 1:
+        raise ValueError("Invalid encrypted message: too short")
+
+    encryption_key, _ = derive_key_from_password(password, data[:16], iterations)
+    cipher = AES.new(encryption_key, AES.MODE_CBC, data[16:32])
+    plaintext = cipher.decrypt(data[32:32 + blocks * AES.block_size])
+
+    # message + '\0' was padded to whole blocks with PKCS#7
+    end = plaintext.find(b'\0')
+    padding = AES.block_size - (end + 1) % AES.block_size
+    if end < 0 or plaintext[end + 1:end + 1 + padding] != bytes([padding]) * padding:
+        raise ValueError("Incorrect password. Please try again with the correct password.")
+
+    return plaintext[:end].decode('utf-8', errors='replace')
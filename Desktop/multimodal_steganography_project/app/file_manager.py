@@ -8,6 +8,8 @@ and managing the static directory.
 
 import os
 import uuid
+import shutil
+import zipfile
 from datetime import datetime
 from werkzeug.utils import secure_filename
 
@@ -16,6 +18,7 @@ UPLOAD_FOLDER = 'static/uploads'
 OUTPUT_FOLDER = 'static/output'
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 ALLOWED_AUDIO_EXTENSIONS = {'wav', 'mp3', 'ogg'}
+MAX_BATCH_EXTRACTED_SIZE = 256 * 1024 * 1024  # Most bytes the images in a batch zip may expand to
 
 def init_app():
     """
@@ -116,6 +119,74 @@ def get_output_path(file_type, extension):
     # Return the full path
     return os.path.join(directory, unique_filename)
 
+def save_output_file(buffer, file_type, extension):
+    """
+    Persist a generated file under a unique output path.
+    
+    Args:
+        buffer: A binary file object positioned at the start of the data
+        file_type: The type of file ('image', 'audio', or 'text')
+        extension: The file extension (without the dot)
+        
+    Returns:
+        str: The path to the saved file
+    """
+    output_path = get_output_path(file_type, extension)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    with open(output_path, 'wb') as f:
+        shutil.copyfileobj(buffer, f)
+    
+    return output_path
+
+def save_batch_uploads(files, directory):
+    """
+    Save a batch of uploaded images into a directory, unpacking zip archives.
+    
+    Args:
+        files: Uploaded file objects (images or .zip archives of images)
+        directory: Directory to save the images in
+        
+    Returns:
+        list: (original name, saved path) for each image, in upload order
+        
+    Raises:
+        ValueError: If an archive is invalid or its images expand beyond MAX_BATCH_EXTRACTED_SIZE
+    """
+    os.makedirs(directory, exist_ok=True)
+    saved = []
+    
+    def target_path(name):
+        # Number the files so images with the same name do not collide
+        return os.path.join(directory, f"{len(saved):05d}_{secure_filename(os.path.basename(name))}")
+    
+    for file in files:
+        if not file or not file.filename:
+            continue
+        
+        if file.filename.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(file.stream)
+            except zipfile.BadZipFile:
+                raise ValueError(f"Invalid zip archive: {file.filename}")
+            
+            with archive:
+                members = [m for m in archive.infolist() if not m.is_dir() and allowed_image_file(m.filename)]
+                if sum(m.file_size for m in members) > MAX_BATCH_EXTRACTED_SIZE:
+                    raise ValueError(f"Zip archive expands beyond {MAX_BATCH_EXTRACTED_SIZE // (1024 * 1024)} MB")
+                
+                for member in members:
+                    path = target_path(member.filename)
+                    with archive.open(member) as src, open(path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    saved.append((member.filename, path))
+        elif allowed_image_file(file.filename):
+            path = target_path(file.filename)
+            file.save(path)
+            saved.append((file.filename, path))
+    
+    return saved
+
 def cleanup_old_files(max_age_days=7):
     """
     Clean up files older than the specified age.
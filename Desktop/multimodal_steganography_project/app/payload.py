@@ -0,0 +1,149 @@
+# app/payload.py
+"""
+Payload header module for the multimodal steganography application.
+
+Every hide_message_in_* function prefixes the hidden data with a small
+versioned header. The header tells the extractor exactly how many bytes to
+read and how they were protected, so extraction reads header + length bits
+and decrypts once instead of rescanning the carrier byte by byte.
+
+Header layout (big-endian):
+    magic          4 bytes  b'STEG'
+    version        1 byte
+    flags          1 byte   (FLAG_* bits)
+    payload length 4 bytes  (bytes following the header)
+    kdf iterations 4 bytes  (PBKDF2 iterations, 0 if not encrypted)
+    bits/channel   1 byte   (LSBs used per carrier sample)
+    layout         1 byte   (index into IMAGE_LAYOUTS)
+    method         1 byte   (index into AUDIO_METHODS)
+    alphabet       1 byte   (index into TEXT_ALPHABETS)
+
+The header itself is always embedded one bit per carrier sample, so it can
+be read before the bits-per-channel setting of the payload is known.
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+# Header constants
+MAGIC = b'STEG'
+HEADER_VERSION = 1
+
+# Flag bits
+FLAG_ENCRYPTED = 0x01
+FLAG_BINARY_TEXT = 0x02  # Text payload body holds raw bytes; older text payloads hold encrypted bodies as hex
+
+# Band layouts an image payload can be embedded in (the image mode of the carrier)
+IMAGE_LAYOUTS = ('RGB', 'L', 'LA', 'RGBA', 'I;16')
+
+# Engines an audio payload body can be hidden with
+AUDIO_METHODS = ('lsb', 'echo', 'phase')
+
+# Invisible-character alphabet sizes a text payload body can be written in
+TEXT_ALPHABETS = (4, 8, 16, 256)
+
+# Layout of the header, and of the magic/version prefix that identifies it
+_HEADER_FORMAT = struct.Struct('>4sBBIIBBBB')
+_PREFIX_FORMAT = struct.Struct('>4sB')
+HEADER_PREFIX_SIZE = _PREFIX_FORMAT.size
+HEADER_SIZE = _HEADER_FORMAT.size
+
+
+class PayloadHeader(NamedTuple):
+    """Decoded payload header."""
+    version: int
+    flags: int
+    payload_length: int
+    kdf_iterations: int
+    bits_per_channel: int
+    layout: int
+    method: int
+    alphabet: int
+
+    @property
+    def encrypted(self) -> bool:
+        """Whether the payload is encrypted with a password-derived key."""
+        return bool(self.flags & FLAG_ENCRYPTED)
+
+    @property
+    def binary_text(self) -> bool:
+        """Whether an encrypted text payload holds the ciphertext itself rather than its hex."""
+        return bool(self.flags & FLAG_BINARY_TEXT)
+
+    @property
+    def image_layout(self) -> Optional[str]:
+        """The image mode the payload was embedded in, or None if the layout is unknown."""
+        return IMAGE_LAYOUTS[self.layout] if self.layout < len(IMAGE_LAYOUTS) else None
+
+    @property
+    def audio_method(self) -> Optional[str]:
+        """The engine the audio payload body was hidden with, or None if the method is unknown."""
+        return AUDIO_METHODS[self.method] if self.method < len(AUDIO_METHODS) else None
+
+    @property
+    def text_alphabet(self) -> Optional[int]:
+        """The alphabet size the text payload body was written in, or None if the alphabet is unknown."""
+        return TEXT_ALPHABETS[self.alphabet] if self.alphabet < len(TEXT_ALPHABETS) else None
+
+
+def build_header(payload_length: int, encrypted: bool = False, kdf_iterations: int = 0,
+                 bits_per_channel: int = 1, image_layout: str = 'RGB', audio_method: str = 'lsb',
+                 binary_text: bool = False, text_alphabet: int = 4) -> bytes:
+    """
+    Build a header for a payload.
+
+    Args:
+        payload_length: Number of payload bytes that follow the header
+        encrypted: Whether the payload is encrypted
+        kdf_iterations: PBKDF2 iterations used to derive the key
+        bits_per_channel: Number of LSBs per carrier sample holding the payload
+        image_layout: Image mode the payload is embedded in (one of IMAGE_LAYOUTS)
+        audio_method: Engine the audio payload body is hidden with (one of AUDIO_METHODS)
+        binary_text: Whether a text payload body holds raw bytes (set by every text payload now written)
+        text_alphabet: Alphabet size a text payload body is written in (one of TEXT_ALPHABETS)
+
+    Returns:
+        bytes: The packed header
+    """
+    flags = (FLAG_ENCRYPTED if encrypted else 0) | (FLAG_BINARY_TEXT if binary_text else 0)
+    return _HEADER_FORMAT.pack(
+        MAGIC, HEADER_VERSION, flags, payload_length, kdf_iterations, bits_per_channel,
+        IMAGE_LAYOUTS.index(image_layout), AUDIO_METHODS.index(audio_method), TEXT_ALPHABETS.index(text_alphabet)
+    )
+
+
+def header_size_from_prefix(prefix: bytes) -> Optional[int]:
+    """
+    Get the full header size from the magic/version prefix.
+
+    Args:
+        prefix: At least HEADER_PREFIX_SIZE bytes read from the start of the payload
+
+    Returns:
+        int: The header size in bytes, or None if the data has no header
+    """
+    if len(prefix) < HEADER_PREFIX_SIZE:
+        return None
+
+    magic, version = _PREFIX_FORMAT.unpack_from(prefix)
+    if magic != MAGIC or version != HEADER_VERSION:
+        return None
+
+    return HEADER_SIZE
+
+
+def parse_header(data: bytes) -> Optional[PayloadHeader]:
+    """
+    Parse a header from the start of a byte string.
+
+    Args:
+        data: Bytes starting with the header
+
+    Returns:
+        PayloadHeader: The decoded header, or None if the data has no header
+    """
+    size = header_size_from_prefix(data)
+    if size is None or len(data) < size:
+        return None
+
+    return PayloadHeader(*_HEADER_FORMAT.unpack_from(data)[1:])
@@ -0,0 +1,242 @@
+# app/png_stream.py
+"""
+Streaming PNG module for the multimodal steganography application.
+
+This module reads and writes PNG rasters one horizontal strip at a time, so
+carriers of hundreds of megapixels can be processed with memory bounded by
+the strip size instead of the image size. Only non-interlaced 8-bit PNGs
+are streamed; anything else is left to PIL.
+
+Reading inflates the IDAT stream incrementally and lets PIL undo the row
+filters: each strip is handed to PIL as a small PNG whose first row is the
+previous strip's last row stored unfiltered, so Up/Average/Paeth filters
+see the right predecessor. Writing emits rows with the Sub filter and
+flushes IDAT chunks as they are compressed.
+"""
+
+import io
+import struct
+import zlib
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# PNG constants
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_IHDR_FORMAT = struct.Struct('>IIBBBBB')
+
+# Samples per pixel for each streamable color type (gray, RGB, palette, gray+alpha, RGBA)
+_COLOR_TYPE_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# PIL mode of each color type, and the color type the writer uses for each mode
+_COLOR_TYPE_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+_MODE_COLOR_TYPES = {'L': 0, 'LA': 4, 'RGB': 2, 'RGBA': 6}
+
+# I/O sizes
+READ_BLOCK_SIZE = 1 << 20   # Bytes of IDAT data read from the file at a time
+IDAT_CHUNK_SIZE = 1 << 16   # Bytes of compressed data per IDAT chunk written
+COMPRESS_LEVEL = 6          # zlib level, the same as PIL's PNG default
+
+
+def _chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Pack a PNG chunk with its length and CRC."""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+class PngStripReader:
+    """
+    Read a PNG file as a sequence of strips.
+
+    The file must stay open and seekable while strips are read; every call
+    to strips() starts a new pass from the first IDAT chunk.
+    """
+
+    def __init__(self, file: BinaryIO):
+        """
+        Parse the PNG header chunks.
+
+        Args:
+            file: Seekable binary file object positioned at the PNG signature
+
+        Raises:
+            ValueError: If the file is not a non-interlaced 8-bit PNG
+        """
+        self._file = file
+        self._palette = None
+
+        if file.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+            raise ValueError("Not a PNG file")
+
+        # Read the chunks before the image data
+        while True:
+            length, chunk_type = self._read_chunk_header()
+            if chunk_type == b'IDAT':
+                self._idat_offset = file.tell() - 8
+                break
+            if chunk_type == b'IEND':
+                raise ValueError("PNG file has no image data")
+
+            data = file.read(length)
+            file.read(4)  # CRC
+            if chunk_type == b'IHDR':
+                (self.width, self.height, bit_depth, self._color_type,
+                 _, _, interlace) = _IHDR_FORMAT.unpack(data[:_IHDR_FORMAT.size])
+                if bit_depth != 8 or interlace or self._color_type not in _COLOR_TYPE_CHANNELS:
+                    raise ValueError("Only non-interlaced 8-bit PNGs can be streamed")
+            elif chunk_type == b'PLTE':
+                self._palette = data
+
+        self._stride = self.width * _COLOR_TYPE_CHANNELS[self._color_type]
+        self.mode = _COLOR_TYPE_MODES[self._color_type]
+
+    def _read_chunk_header(self) -> Tuple[int, bytes]:
+        """Read the length and type of the next chunk."""
+        header = self._file.read(8)
+        if len(header) < 8:
+            raise ValueError("Truncated PNG file")
+        length, chunk_type = struct.unpack('>I4s', header)
+        return length, chunk_type
+
+    def _idat_blocks(self) -> Iterator[bytes]:
+        """Yield the compressed image data in blocks of at most READ_BLOCK_SIZE bytes."""
+        self._file.seek(self._idat_offset)
+        while True:
+            length, chunk_type = self._read_chunk_header()
+            if chunk_type == b'IEND':
+                return
+            if chunk_type != b'IDAT':
+                self._file.seek(length + 4, io.SEEK_CUR)
+                continue
+
+            while length:
+                block = self._file.read(min(length, READ_BLOCK_SIZE))
+                if not block:
+                    raise ValueError("Truncated PNG file")
+                length -= len(block)
+                yield block
+            self._file.read(4)  # CRC
+
+    def _decode(self, filtered: bytes, rows: int, previous: Optional[bytes]) -> Image.Image:
+        """Undo the row filters of a strip with PIL, seeded with the previous unfiltered row."""
+        if previous is not None:
+            filtered = b'\x00' + previous + filtered
+            rows += 1
+
+        png = PNG_SIGNATURE + _chunk(b'IHDR', _IHDR_FORMAT.pack(self.width, rows, 8, self._color_type, 0, 0, 0))
+        if self._palette is not None:
+            png += _chunk(b'PLTE', self._palette)
+        png += _chunk(b'IDAT', zlib.compress(filtered, 0)) + _chunk(b'IEND', b'')
+
+        strip = Image.open(io.BytesIO(png))
+        strip.load()
+        return strip
+
+    def strips(self, rows: int, mode: str = 'RGB') -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Decode the image a strip at a time.
+
+        Args:
+            rows: Maximum number of rows per strip
+            mode: PIL mode to convert the strips to (self.mode leaves them as stored)
+
+        Yields:
+            tuple: (index of the strip's first row, writable uint8 array of n rows in that mode)
+        """
+        rows = max(1, rows)
+        row_bytes = self._stride + 1  # Each row starts with its filter type
+        inflater = zlib.decompressobj()
+        pending = bytearray()
+        previous = None
+        row = 0
+
+        def ready():
+            return row < self.height and len(pending) >= min(rows, self.height - row) * row_bytes
+
+        def take_strip():
+            nonlocal pending, previous, row
+            count = min(rows, self.height - row)
+            filtered = bytes(pending[:count * row_bytes])
+            del pending[:count * row_bytes]
+
+            strip = self._decode(filtered, count, previous)
+            skip = 0 if previous is None else 1
+            previous = np.asarray(strip)[-1].tobytes()
+
+            first_row = row
+            row += count
+            if strip.mode != mode:
+                strip = strip.convert(mode)
+            return first_row, np.array(strip)[skip:]
+
+        for block in self._idat_blocks():
+            # Inflate at most one strip at a time so a highly compressed block stays bounded
+            while block:
+                pending += inflater.decompress(block, rows * row_bytes)
+                block = inflater.unconsumed_tail
+                while ready():
+                    yield take_strip()
+
+        pending += inflater.flush()
+        while ready():
+            yield take_strip()
+
+        if row < self.height:
+            raise ValueError("Truncated PNG image data")
+
+
+class PngStripWriter:
+    """
+    Write an 8-bit L, LA, RGB or RGBA PNG one strip of rows at a time.
+
+    The caller must write exactly height rows in total and then call close().
+    """
+
+    def __init__(self, file: BinaryIO, width: int, height: int, mode: str = 'RGB'):
+        """
+        Write the PNG signature and header.
+
+        Args:
+            file: Writable binary file object
+            width: Image width in pixels
+            height: Image height in pixels
+            mode: PIL mode of the rows that will be written
+        """
+        color_type = _MODE_COLOR_TYPES[mode]
+        self._bands = _COLOR_TYPE_CHANNELS[color_type]
+        self._file = file
+        self._compressor = zlib.compressobj(COMPRESS_LEVEL)
+        self._pending = bytearray()
+
+        file.write(PNG_SIGNATURE + _chunk(b'IHDR', _IHDR_FORMAT.pack(width, height, 8, color_type, 0, 0, 0)))
+
+    def _emit(self, final: bool = False):
+        """Write the compressed data collected so far as IDAT chunks."""
+        while len(self._pending) >= IDAT_CHUNK_SIZE or (final and self._pending):
+            self._file.write(_chunk(b'IDAT', bytes(self._pending[:IDAT_CHUNK_SIZE])))
+            del self._pending[:IDAT_CHUNK_SIZE]
+
+    def write(self, pixels: np.ndarray):
+        """
+        Append rows to the image.
+
+        Args:
+            pixels: uint8 array of rows in the writer's mode
+        """
+        rows = pixels.reshape(pixels.shape[0], -1)
+        bands = self._bands
+
+        # Sub filter: each byte minus the same band of the pixel to its left
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1:bands + 1] = rows[:, :bands]
+        np.subtract(rows[:, bands:], rows[:, :-bands], out=filtered[:, bands + 1:])
+
+        self._pending += self._compressor.compress(filtered.tobytes())
+        self._emit()
+
+    def close(self):
+        """Finish the compressed stream and write the trailing chunks."""
+        self._pending += self._compressor.flush()
+        self._emit(final=True)
+        self._file.write(_chunk(b'IEND', b''))
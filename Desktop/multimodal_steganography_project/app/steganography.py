@@ -4,437 +4,1365 @@ Steganography module for hiding messages in different media types.
 
 This module provides functions for hiding and extracting messages in/from:
 - Images (using LSB technique with encryption and randomization)
-- Audio (using phase encoding with encryption and randomization)
+- Audio (using integer PCM LSB, echo hiding or phase coding, with encryption and randomization)
 - Text (using invisible Unicode characters with encryption)
 """
 
 # Standard library imports
+import io
+import os
+import re
+import logging
 import random
 import hashlib
-import os
+from concurrent.futures import ProcessPoolExecutor
 
 # Third-party imports
 from PIL import Image  # For image processing
 import numpy as np     # For numerical operations
-import librosa        # For audio processing
-import soundfile as sf # For audio file operations
+import soundfile as sf # For audio file operations (librosa is imported only when needed)
 
 # Local imports
-from app.encryption import encrypt_message, decrypt_message
+from app.encryption import (
+    encrypt_message, decrypt_message, decrypt_terminated_message, max_plaintext_length, PBKDF2_ITERATIONS
+)
+from app.payload import (
+    build_header, header_size_from_prefix, parse_header, HEADER_PREFIX_SIZE, HEADER_SIZE, AUDIO_METHODS, TEXT_ALPHABETS
+)
+from app.permutation import KeyedPermutation
+from app.png_stream import PngStripReader, PngStripWriter
+from app.audio_cache import audio_cache
+from app.audio_echo import (
+    echo_delays, echo_capacity, echo_frames_needed, embed_echo_bits, detect_echo_bits, ECHO_FRAME_LENGTH
+)
+from app.text_codec import (
+    encode_zero_width, decode_zero_width, zero_width_symbols, zero_width_offset, zero_width_runs, ZERO_WIDTH_CODECS,
+    DEFAULT_ALPHABET_SIZE
+)
+from app.audio_phase import (
+    phase_bins, phase_capacity, phase_frames_needed, embed_phase_bits, detect_phase_bits, PHASE_FRAME_LENGTH
+)
+
+logger = logging.getLogger(__name__)
+
+# Payload helpers shared by all media types
+def _encode_message(message, password=None):
+    """
+    Encrypt a message if a password is given, otherwise encode it as UTF-8.
 
-def hide_message_in_image(image, message, password=None):
+    Args:
+        message: The message to hide
+        password: Optional password for encryption
+
+    Returns:
+        tuple: (payload body bytes, PBKDF2 iterations or 0 if not encrypted)
     """
-    Enhanced image steganography with encryption and pseudo-random pixel selection.
+    if password:
+        return encrypt_message(message, password=password, iterations=PBKDF2_ITERATIONS), PBKDF2_ITERATIONS
+
+    return message.encode('utf-8'), 0
+
+def _build_payload(message, password=None, bits_per_channel=1, audio_method='lsb'):
+    """
+    Encrypt a message if a password is given and prefix it with a payload header.
 
     Args:
-        image: The input image file
         message: The message to hide
-        password: Optional password for additional security
+        password: Optional password for encryption
+        bits_per_channel: Number of LSBs per carrier sample holding the body
+        audio_method: Engine holding the body of an audio payload
 
     Returns:
-        str: Path to the image with hidden message
+        bytes: Header followed by the (possibly encrypted) message bytes
+    """
+    body, kdf_iterations = _encode_message(message, password)
+    header = build_header(len(body), encrypted=bool(kdf_iterations), kdf_iterations=kdf_iterations,
+                          bits_per_channel=bits_per_channel, audio_method=audio_method)
+    return header + body
+
+def _read_payload(read_bits, capacity_slots, max_bits_per_slot=1, read_body=None):
+    """
+    Read a headed payload from a carrier.
+
+    The header is stored one bit per carrier slot; the body is stored
+    header.bits_per_channel bits per slot in the slots that follow it,
+    unless read_body reads it some other way.
+
+    Args:
+        read_bits: Callable (start, stop, bits_per_slot) returning the bits held in
+                   slots start..stop as a uint8 array, most significant bit of each slot first
+        capacity_slots: Total number of slots in the carrier
+        max_bits_per_slot: Largest bits-per-channel setting the carrier supports
+        read_body: Optional callable (header) returning the body bytes, or None
+                   if the body is held in the slots after the header
+
+    Returns:
+        tuple: (PayloadHeader, body bytes), or None if the carrier has no payload header
+    """
+    def read_bytes(start, count):
+        return np.packbits(read_bits(start * 8, (start + count) * 8, 1)).tobytes()
+
+    if capacity_slots < HEADER_PREFIX_SIZE * 8:
+        return None
+
+    header_size = header_size_from_prefix(read_bytes(0, HEADER_PREFIX_SIZE))
+    if header_size is None or header_size * 8 > capacity_slots:
+        return None
+
+    header = parse_header(read_bytes(0, header_size))
+    if read_body is not None:
+        body = read_body(header)
+        if body is not None:
+            return header, body
+
+    bits_per_slot = header.bits_per_channel
+    if not 1 <= bits_per_slot <= max_bits_per_slot:
+        return None
+
+    body_bits = header.payload_length * 8
+    body_slots = -(-body_bits // bits_per_slot)
+    if header_size * 8 + body_slots > capacity_slots:
+        return None
+
+    bits = read_bits(header_size * 8, header_size * 8 + body_slots, bits_per_slot)[:body_bits]
+    return header, np.packbits(bits).tobytes()
+
+def _open_payload(header, body, password=None):
+    """
+    Turn a payload body back into the hidden message, decrypting it once if needed.
+
+    Args:
+        header: The PayloadHeader read from the carrier
+        body: The payload bytes that followed the header
+        password: Optional password used during hiding
+
+    Returns:
+        str: The hidden message
+    """
+    if header.encrypted:
+        if not password:
+            raise ValueError("This message is password-protected. Please provide a password.")
+        return decrypt_message(body, password=password, iterations=header.kdf_iterations)
+
+    return body.decode('utf-8', errors='replace')
+
+def _write_output(output, write):
+    """
+    Write a stego carrier to a caller-supplied file object or a new in-memory buffer.
+
+    Args:
+        output: Writable binary file object, or None for a new BytesIO
+        write: Callable that writes the carrier to a file object
+
+    Returns:
+        file: The file object written to (rewound if it is a new buffer)
+    """
+    if output is not None:
+        write(output)
+        return output
+
+    buffer = io.BytesIO()
+    write(buffer)
+    buffer.seek(0)
+    return buffer
+
+# Image Steganography (using LSB with a keyed pseudo-random channel order)
+MAX_BITS_PER_CHANNEL = 4  # Most LSBs per color channel the embedder will use
+STRIP_BUDGET = 16 * 1024 * 1024  # Default bytes of decoded raster per strip when streaming
+STREAMING_THRESHOLD = 256 * 1024 * 1024  # PNG carriers with a larger RGB raster are always streamed
+_NO_IMAGE_PAYLOAD = "No hidden message was found in this image, or the password is incorrect."
+LEGACY_IMAGE_MAX_PIXELS = 2048 * 2048  # Largest image searched for a message written before the payload header
+
+# Image modes embedded in natively: mode -> (color bands carrying the payload, total bands).
+# Alpha is left alone; any other mode is converted to RGB first.
+_LAYOUT_BANDS = {'RGB': (3, 3), 'L': (1, 1), 'LA': (1, 2), 'RGBA': (3, 4), 'I;16': (1, 1)}
+
+def _image_layout(mode):
+    """Get the band layout an image of the given mode is embedded in."""
+    return mode if mode in _LAYOUT_BANDS else 'RGB'
+
+def _layout_offsets(offsets, layout):
+    """Map offsets into the color bands of a layout to offsets into its full row-major array."""
+    color_bands, total_bands = _LAYOUT_BANDS[layout]
+    if color_bands == total_bands:
+        return offsets
+    return offsets // color_bands * total_bands + offsets % color_bands
+
+def _check_layout(header, layout):
+    """Make sure a payload is read from the band layout it was embedded in."""
+    if header.image_layout != layout:
+        raise ValueError(f"The message was hidden in {header.image_layout} bands but this image is {layout}. "
+                         f"It may have been converted after the message was hidden.")
+
+def _image_slots_needed(payload_length, bits_per_channel):
+    """
+    Get the number of color channels a headed payload occupies.
+
+    Args:
+        payload_length: Number of payload bytes after the header
+        bits_per_channel: Number of LSBs per channel holding the payload
+
+    Returns:
+        int: Channels needed (the header always takes one bit per channel)
+    """
+    return HEADER_SIZE * 8 + -(-payload_length * 8 // bits_per_channel)
+
+def _image_capacity(channels, bits_per_channel):
+    """
+    Get the largest payload body that fits in an image.
+
+    Args:
+        channels: Number of color band samples in the image
+        bits_per_channel: Number of LSBs per channel holding the payload
+
+    Returns:
+        int: Maximum payload bytes after the header
+    """
+    return max(0, (channels - HEADER_SIZE * 8) * bits_per_channel // 8)
+
+def plan_bits_per_channel(payload_length, width, height, bands=3):
+    """
+    Pick the smallest bits-per-channel setting that fits a payload in an image.
+
+    Using as few LSBs as the payload allows keeps the embedding distortion
+    low; using more only when needed lets large payloads fit small carriers.
+
+    Args:
+        payload_length: Number of payload bytes after the header
+        width: Image width in pixels
+        height: Image height in pixels
+        bands: Number of color bands carrying the payload (3 for RGB, 1 for grayscale)
+
+    Returns:
+        int: Bits per channel, from 1 to MAX_BITS_PER_CHANNEL
+
+    Raises:
+        ValueError: If the payload does not fit even at MAX_BITS_PER_CHANNEL
+    """
+    channels = width * height * bands
+    for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1):
+        if _image_slots_needed(payload_length, bits_per_channel) <= channels:
+            return bits_per_channel
+
+    max_bytes = _image_capacity(channels, MAX_BITS_PER_CHANNEL)
+    raise ValueError(f"Message too large for this image. Max capacity: {max_bytes} bytes "
+                     f"at {MAX_BITS_PER_CHANNEL} bits per channel")
+
+def _image_slot_values(bits, bits_per_channel=1, header_bits=0):
+    """
+    Turn a bit array into the values written to each channel slot and their widths.
+
+    The first header_bits bits take one LSB per slot; the remaining bits are
+    grouped bits_per_channel at a time (most significant first) into the low
+    bits of the following slots.
+
+    Args:
+        bits: A uint8 array of 0/1 values
+        bits_per_channel: Number of LSBs per channel for the bits after the header
+        header_bits: Number of leading bits stored one per channel
+
+    Returns:
+        tuple: (uint8 values, uint8 number of low bits each value replaces)
+    """
+    header_bits = min(header_bits, len(bits))
+
+    # Group the body bits into bits_per_channel-bit values, zero-padding the last one
+    body = bits[header_bits:]
+    groups = np.zeros(-(-len(body) // bits_per_channel) * bits_per_channel, dtype=np.uint8)
+    groups[:len(body)] = body
+    weights = (1 << np.arange(bits_per_channel - 1, -1, -1)).astype(np.uint8)
+    body_values = (groups.reshape(-1, bits_per_channel) * weights).sum(axis=1, dtype=np.uint8)
+
+    values = np.concatenate([bits[:header_bits].astype(np.uint8), body_values])
+    widths = np.full(len(values), bits_per_channel, dtype=np.uint8)
+    widths[:header_bits] = 1
+    return values, widths
+
+def _channel_bits(values, bits_per_slot):
+    """Split the low bits_per_slot bits of each channel value into a bit array, most significant first."""
+    low = (values & ((1 << bits_per_slot) - 1)).astype(np.uint8)
+    return np.unpackbits(low[:, np.newaxis], axis=1)[:, 8 - bits_per_slot:].reshape(-1)
+
+def _embed_bits_in_image(img, bits, password=None, bits_per_channel=1, header_bits=0):
+    """
+    Write a bit array into the least significant bits of an image's color bands.
+
+    The image is used in its own band layout (see _LAYOUT_BANDS), so
+    grayscale and 16-bit carriers are not widened to RGB. Slot i of the
+    payload goes to offset permutation[i] of the row-major color bands,
+    where the permutation is keyed by the password (see _image_slot_values
+    for how bits map to slots). Only the positions the payload needs are
+    generated, and all slots are written with a single fancy-indexed
+    shift/or.
+
+    Args:
+        img: A PIL image in one of the _LAYOUT_BANDS modes
+        bits: A uint8 array of 0/1 values
+        password: Optional password used to key the channel order
+        bits_per_channel: Number of LSBs per channel for the bits after the header
+        header_bits: Number of leading bits stored one per channel
+
+    Returns:
+        Image: A new image of the same mode carrying the bits
     """
-    # Open and prepare the image
-    img = Image.open(image)
     width, height = img.size
-    img = img.convert("RGB")
-    pixels = img.load()
+    layout = img.mode
+    values, widths = _image_slot_values(bits, bits_per_channel, header_bits)
+    order = KeyedPermutation.from_password(width * height * _LAYOUT_BANDS[layout][0], password)
+    offsets = _layout_offsets(order.first(len(values)), layout)
+
+    # Clear the low bits and write the slot values in one pass
+    pixels = np.array(img)
+    flat = pixels.reshape(-1)
+    flat[offsets] = (flat[offsets] >> widths << widths) | values
+    return Image.fromarray(pixels, layout)
+
+def _strip_rows(width, strip_budget, layout='RGB'):
+    """Get the number of rows of a layout that fit in a strip budget (at least one)."""
+    return max(1, strip_budget // (width * _LAYOUT_BANDS[layout][1]))
+
+def _open_png_strips(image, strip_budget):
+    """
+    Get a strip reader for a carrier that should be streamed.
 
-    # Add null terminator for extraction
-    message = message + '\0'
-    message_bytes = message.encode()
+    Args:
+        image: Seekable binary file object with the carrier
+        strip_budget: Requested strip budget in bytes, or None to stream only large images
 
-    # Encrypt the message if password is provided
-    if password:
-        # Use the encryption module to encrypt the message with the password
-        print(f"DEBUG: Encrypting image message with password: {password}")
-        message_bytes = encrypt_message(message, password=password)
-        print(f"DEBUG: Encrypted image message length: {len(message_bytes)} bytes")
+    Returns:
+        PngStripReader: The reader, or None (with the file rewound) if the
+        carrier is not a streamable PNG or is small enough to load whole
+    """
+    start = image.tell()
+    try:
+        reader = PngStripReader(image)
+    except ValueError:
+        reader = None
+
+    if reader is None or (strip_budget is None and reader.width * reader.height * 3 <= STREAMING_THRESHOLD):
+        image.seek(start)
+        return None
+
+    return reader
+
+def _embed_bits_in_png_strips(reader, output, bits, password=None, bits_per_channel=1, header_bits=0,
+                              strip_budget=STRIP_BUDGET):
+    """
+    Stream a PNG carrier strip by strip, writing a bit array into its color band LSBs.
+
+    Produces the same raster as _embed_bits_in_image, but holds only one
+    strip of the carrier in memory. Slot offsets are sorted once, so each
+    strip only touches the slots that fall inside it, and strips with no
+    slots are re-encoded unchanged.
+
+    Args:
+        reader: PngStripReader for the carrier
+        output: Writable binary file object for the PNG
+        bits: A uint8 array of 0/1 values
+        password: Optional password used to key the channel order
+        bits_per_channel: Number of LSBs per channel for the bits after the header
+        header_bits: Number of leading bits stored one per channel
+        strip_budget: Approximate bytes of decoded raster per strip
+    """
+    width, height = reader.width, reader.height
+    layout = _image_layout(reader.mode)
+    color_bands, total_bands = _LAYOUT_BANDS[layout]
+    values, widths = _image_slot_values(bits, bits_per_channel, header_bits)
+    order = KeyedPermutation.from_password(width * height * color_bands, password)
+    offsets = _layout_offsets(order.first(len(values)), layout)
+
+    # Visit the slots in raster order
+    order = np.argsort(offsets)
+    offsets, values, widths = offsets[order], values[order], widths[order]
+
+    writer = PngStripWriter(output, width, height, layout)
+    for row, pixels in reader.strips(_strip_rows(width, strip_budget, layout), layout):
+        base = row * width * total_bands
+        lo, hi = np.searchsorted(offsets, [base, base + pixels.size])
+        if hi > lo:
+            flat = pixels.reshape(-1)
+            local = offsets[lo:hi] - base
+            flat[local] = (flat[local] >> widths[lo:hi] << widths[lo:hi]) | values[lo:hi]
+        writer.write(pixels)
+    writer.close()
+
+def _gather_png_channels(reader, offsets, strip_budget=STRIP_BUDGET):
+    """
+    Read the band values at flat offsets from a PNG, one strip at a time.
+
+    Args:
+        reader: PngStripReader for the carrier
+        offsets: int64 flat offsets into the row-major array of the carrier's layout
+        strip_budget: Approximate bytes of decoded raster per strip
 
-    # Convert to binary string
-    bin_message = ''.join(format(byte, '08b') for byte in message_bytes)
+    Returns:
+        ndarray: uint8 band values, in the order of offsets
+    """
+    width = reader.width
+    layout = _image_layout(reader.mode)
+    total_bands = _LAYOUT_BANDS[layout][1]
+    order = np.argsort(offsets)
+    sorted_offsets = offsets[order]
+    values = np.empty(len(offsets), dtype=np.uint8)
+
+    for row, pixels in reader.strips(_strip_rows(width, strip_budget, layout), layout):
+        base = row * width * total_bands
+        lo, hi = np.searchsorted(sorted_offsets, [base, base + pixels.size])
+        values[order[lo:hi]] = pixels.reshape(-1)[sorted_offsets[lo:hi] - base]
+        if hi == len(offsets):
+            break  # Every requested channel has been read
+
+    return values
+
+def _hide_payload_in_image(image, body, kdf_iterations, password=None, output=None, bits_per_channel=1,
+                           strip_budget=None):
+    """
+    Hide an already encoded payload body in an image.
+
+    Args:
+        image: Binary file object with the carrier
+        body: Payload bytes (ciphertext if kdf_iterations is set, otherwise UTF-8)
+        kdf_iterations: PBKDF2 iterations used for the ciphertext, or 0 if not encrypted
+        password: Optional password used to key the channel order
+        output: Optional writable binary file object for the PNG (a new buffer if None)
+        bits_per_channel: LSBs per color channel (1 to 4), or 'auto'
+        strip_budget: Optional bytes of decoded raster to hold at once when streaming
+
+    Returns:
+        file: The file object holding the PNG with hidden message
+    """
+    # Open and prepare the image in its own band layout, streaming large PNGs instead of loading them
+    reader = _open_png_strips(image, strip_budget)
+    if reader is not None:
+        width, height = reader.width, reader.height
+        layout = _image_layout(reader.mode)
+    else:
+        img = Image.open(image)
+        width, height = img.size
+        layout = _image_layout(img.mode)
+        if img.mode != layout:
+            img = img.convert(layout)
+    color_bands = _LAYOUT_BANDS[layout][0]
+
+    # Choose how many LSBs per channel carry the message
+    if bits_per_channel == 'auto':
+        bits_per_channel = plan_bits_per_channel(len(body), width, height, color_bands)
+    elif bits_per_channel not in range(1, MAX_BITS_PER_CHANNEL + 1):
+        raise ValueError(f"bits_per_channel must be between 1 and {MAX_BITS_PER_CHANNEL}, or 'auto'")
+
+    # Build the headed payload
+    payload = build_header(len(body), encrypted=bool(kdf_iterations), kdf_iterations=kdf_iterations,
+                           bits_per_channel=bits_per_channel, image_layout=layout) + body
+    logger.debug("Image payload length: %d bytes (encrypted: %s, bits per channel: %d, layout: %s)",
+                 len(payload), bool(password), bits_per_channel, layout)
 
     # Check if the image has enough capacity
-    max_bits = width * height * 3  # 3 color channels per pixel
-    if len(bin_message) > max_bits:
-        raise ValueError(f"Message too large for this image. Max capacity: {max_bits//8} bytes")
+    max_channels = width * height * color_bands
+    if _image_slots_needed(len(body), bits_per_channel) > max_channels:
+        max_bytes = _image_capacity(max_channels, bits_per_channel)
+        raise ValueError(f"Message too large for this image. Max capacity: {max_bytes} bytes "
+                         f"at {bits_per_channel} bits per channel")
 
-    # Generate a pseudo-random sequence of pixel coordinates
-    pixel_coords = []
-    for i in range(width):
-        for j in range(height):
-            pixel_coords.append((i, j))
+    # Unpack the payload into a flat array of bits (MSB first)
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
 
-    # Shuffle the coordinates using a seed derived from the password or a default seed
-    seed = int(hashlib.md5((password or "default").encode()).hexdigest(), 16) % 10000000
-    random.seed(seed)
-    random.shuffle(pixel_coords)
+    if reader is not None:
+        # Hide the binary data strip by strip, writing the PNG as it goes
+        return _write_output(output, lambda f: _embed_bits_in_png_strips(
+            reader, f, bits, password, bits_per_channel, HEADER_SIZE * 8, strip_budget or STRIP_BUDGET
+        ))
 
     # Hide the binary data in the image
-    data_index = 0
-    coord_index = 0
+    img = _embed_bits_in_image(img, bits, password, bits_per_channel, header_bits=HEADER_SIZE * 8)
 
-    while data_index < len(bin_message) and coord_index < len(pixel_coords):
-        i, j = pixel_coords[coord_index]
-        pixel = list(pixels[i, j])
+    # Write the image with hidden message
+    return _write_output(output, lambda f: img.save(f, format='PNG'))
 
-        # Modify the least significant bits of each color channel
-        for k in range(3):  # RGB channels
-            if data_index < len(bin_message):
-                # Clear the LSB and set it to the message bit
-                pixel[k] = (pixel[k] & ~1) | int(bin_message[data_index])
-                data_index += 1
+def hide_message_in_image(image, message, password=None, output=None, bits_per_channel=1, strip_budget=None):
+    """
+    Enhanced image steganography with encryption and pseudo-random pixel selection.
+
+    L, LA, RGB, RGBA and I;16 images are embedded in their own color bands
+    and written back in the same mode (alpha is never touched); other modes
+    are converted to RGB. The payload header records the band layout.
+
+    PNG carriers are processed in horizontal strips when strip_budget is
+    given, or when their RGB raster exceeds STREAMING_THRESHOLD bytes, so
+    peak memory is bounded by the strip budget rather than the image size.
+
+    Args:
+        image: The input image file (path or binary file object)
+        message: The message to hide
+        password: Optional password for additional security
+        output: Optional writable binary file object for the PNG (a new buffer if None)
+        bits_per_channel: LSBs per color channel used for the message (1 to 4),
+                          or 'auto' to pick the smallest setting that fits
+        strip_budget: Optional bytes of decoded raster to hold at once when streaming
 
-        pixels[i, j] = tuple(pixel)
-        coord_index += 1
+    Returns:
+        file: The file object holding the PNG with hidden message, rewound
+              to the start if it is an in-memory buffer
+    """
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, 'rb') as image_file:
+            return hide_message_in_image(image_file, message, password, output, bits_per_channel, strip_budget)
 
-    # Create directory if it doesn't exist
-    os.makedirs('static', exist_ok=True)
+    # Encrypt the message if password is provided
+    body, kdf_iterations = _encode_message(message, password)
 
-    # Save the image with hidden message
-    hidden_image_path = 'static/hidden_image.png'
-    img.save(hidden_image_path, format='PNG')
-    return hidden_image_path
+    return _hide_payload_in_image(image, body, kdf_iterations, password, output, bits_per_channel, strip_budget)
 
-def extract_message_from_image(image, password=None):
+def extract_message_from_image(image, password=None, strip_budget=None, legacy=False):
     """
     Extract a hidden message from an image.
 
+    Large PNG carriers are read in strips, as in hide_message_in_image.
+    Streamed carriers are only searched for a payload header: carriers
+    written before the header would need the whole image decoded at once.
+
+    Carriers written before the header are only read when legacy is set,
+    and only up to LEGACY_IMAGE_MAX_PIXELS: replaying their shuffle costs
+    time and memory in proportion to the image, for every wrong password.
+
     Args:
-        image: The image file with hidden message
+        image: The image file with hidden message (path or binary file object)
         password: Optional password used during hiding
+        strip_budget: Optional bytes of decoded raster to hold at once when streaming
+        legacy: Whether to fall back to the reader for carriers without a payload header
 
     Returns:
         str: The extracted message
     """
-    # Open and prepare the image
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, 'rb') as image_file:
+            return extract_message_from_image(image_file, password, strip_budget, legacy)
+
+    # Read large PNGs strip by strip: one pass for the header, one for the body
+    reader = _open_png_strips(image, strip_budget)
+    if reader is not None:
+        budget = strip_budget or STRIP_BUDGET
+        layout = _image_layout(reader.mode)
+        order = KeyedPermutation.from_password(reader.width * reader.height * _LAYOUT_BANDS[layout][0], password)
+
+        def gather(start, stop):
+            return _gather_png_channels(reader, _layout_offsets(order.take(start, stop), layout), budget)
+
+        header_values = gather(0, HEADER_SIZE * 8)
+
+        def read_bits(start, stop, bits_per_slot):
+            if bits_per_slot == 1 and stop <= len(header_values):
+                return _channel_bits(header_values[start:stop], 1)
+            return _channel_bits(gather(start, stop), bits_per_slot)
+
+        payload = _read_payload(read_bits, len(order), MAX_BITS_PER_CHANNEL)
+        if payload is not None:
+            logger.debug("Found payload header, payload length: %d bytes", payload[0].payload_length)
+            _check_layout(payload[0], layout)
+            return _open_payload(*payload, password=password)
+
+        # Carriers without a header need the whole image, which streaming is there to avoid
+        raise ValueError(_NO_IMAGE_PAYLOAD)
+
+    # Open and prepare the image in the band layout it was written in
     img = Image.open(image)
     width, height = img.size
-    img = img.convert("RGB")
-    pixels = img.load()
+    layout = _image_layout(img.mode)
+    if img.mode != layout:
+        img = img.convert(layout)
+
+    # Read the header and exactly the payload bits it declares
+    pixels = np.asarray(img).reshape(-1)
+    order = KeyedPermutation.from_password(width * height * _LAYOUT_BANDS[layout][0], password)
+
+    def read_bits(start, stop, bits_per_slot):
+        return _channel_bits(pixels[_layout_offsets(order.take(start, stop), layout)], bits_per_slot)
+
+    payload = _read_payload(read_bits, len(order), MAX_BITS_PER_CHANNEL)
+    if payload is not None:
+        logger.debug("Found payload header, payload length: %d bytes", payload[0].payload_length)
+        _check_layout(payload[0], layout)
+        return _open_payload(*payload, password=password)
+
+    # Carriers written before the payload header was introduced (always RGB), on request
+    if not legacy:
+        raise ValueError(_NO_IMAGE_PAYLOAD)
+    if width * height > LEGACY_IMAGE_MAX_PIXELS:
+        raise ValueError(f"Images over {LEGACY_IMAGE_MAX_PIXELS} pixels cannot be searched "
+                         "for messages hidden before the payload header.")
+    logger.debug("No payload header found, using legacy image extraction")
+    return _extract_legacy_message_from_image(img if layout == 'RGB' else img.convert("RGB"), password)
+
+def _extract_legacy_message_from_image(img, password=None):
+    """
+    Extract a message from an image without a payload header.
 
-    # Generate the same pseudo-random sequence of pixel coordinates
-    pixel_coords = []
-    for i in range(width):
-        for j in range(height):
-            pixel_coords.append((i, j))
+    Replays the password-seeded shuffle of every pixel coordinate that
+    carriers written before the header used, reads the whole bit plane in
+    that order at once and decodes it in one pass: up to the null
+    terminator, or with a single decryption when a password is given.
+
+    Args:
+        img: The RGB image with hidden message
+        password: Optional password used during hiding
 
-    # Use the same seed for shuffling
+    Returns:
+        str: The extracted message
+    """
+    # Shuffle the column-major pixel walk (x * height + y) like the original coordinate list
+    pixel_order = list(range(img.size[0] * img.size[1]))
     seed = int(hashlib.md5((password or "default").encode()).hexdigest(), 16) % 10000000
     random.seed(seed)
-    random.shuffle(pixel_coords)
-
-    # Extract the binary data
-    binary_data = ''
-    for i, j in pixel_coords:
-        pixel = pixels[i, j]
-        for k in range(3):  # RGB channels
-            binary_data += str(pixel[k] & 1)  # Extract LSB
-            # Stop if we have enough bits for a complete message with null terminator
-            if len(binary_data) % 8 == 0 and len(binary_data) >= 8:
-                # Check every 8 bits if we've reached the null terminator
-                if len(binary_data) % 8 == 0:
-                    # Convert binary to bytes
-                    byte_data = bytearray()
-                    for idx in range(0, len(binary_data), 8):
-                        if idx + 8 <= len(binary_data):
-                            byte = int(binary_data[idx:idx+8], 2)
-                            byte_data.append(byte)
-
-                    # Check if we've reached the null terminator
-                    try:
-                        if password:
-                            # Try to decrypt if password was provided
-                            try:
-                                # Check if we have enough data for a potential message
-                                if len(byte_data) >= 32:  # At least some minimal data to check
-                                    print(f"DEBUG: Checking extracted data, length: {len(byte_data)} bytes")
-
-                                    # Try to decrypt with the provided password
-                                    try:
-                                        # Pass the password to the decrypt_message function
-                                        decrypted = decrypt_message(bytes(byte_data), password=password)
-                                        print(f"DEBUG: Image decryption successful, result: {decrypted[:50] if len(decrypted) > 50 else decrypted}")
-
-                                        # If we successfully decrypted, return the result
-                                        if '\0' in decrypted:
-                                            return decrypted.split('\0')[0]
-                                        return decrypted  # Return even if no null terminator is found
-                                    except Exception as decrypt_error:
-                                        # If we get a specific error about password protection, raise it
-                                        if "password-protected" in str(decrypt_error).lower():
-                                            raise ValueError("This image contains an encrypted message. Please provide a password.")
-                                        elif "incorrect password" in str(decrypt_error).lower() and len(byte_data) >= 48:
-                                            # If we have enough data and get a password error, it's likely the wrong password
-                                            raise ValueError("Incorrect password. Please try again with the correct password.")
-                                        # Otherwise, continue extracting more data
-                                        print(f"DEBUG: Decryption attempt failed, continuing extraction: {str(decrypt_error)}")
-                                else:
-                                    # Continue extracting more data
-                                    print(f"DEBUG: Not enough data yet for decryption, continuing extraction")
-                            except Exception as e:
-                                print(f"DEBUG: Image decryption failed: {str(e)}")
-                                # If we have enough data but decryption fails, it's likely a wrong password
-                                if len(byte_data) >= 48:  # Reasonable size for an encrypted message
-                                    raise ValueError("Incorrect password. Please try again with the correct password.")
-                                # Otherwise continue extracting
-                        else:
-                            # Try to decode without decryption
-                            text = byte_data.decode('utf-8', errors='ignore')
-                            if '\0' in text:
-                                return text.split('\0')[0]
-                    except ValueError as e:
-                        # Re-raise password errors
-                        if "password" in str(e).lower():
-                            raise
-                        # Continue extracting for other errors
-                        pass
-
-    # If we've extracted all bits but found no terminator, try to decode the whole message
-    print(f"DEBUG: Attempting final extraction with {len(byte_data)} bytes of data")
+    random.shuffle(pixel_order)
+
+    # The RGB least significant bits of every pixel in that order
+    columns = (np.asarray(img)[:, :, :3] & 1).transpose(1, 0, 2).reshape(-1, 3)
+    bits = columns[np.array(pixel_order)].reshape(-1)
+    byte_data = np.packbits(bits[:len(bits) // 8 * 8]).tobytes()
+
+    if password:
+        return decrypt_terminated_message(byte_data, password)
+
+    # Without a terminator there is no message, only the carrier's own bit plane
+    end = byte_data.find(b'\0')
+    if end < 0:
+        raise ValueError(_NO_IMAGE_PAYLOAD)
+    return byte_data[:end].decode('utf-8', errors='ignore')
+
+# Batch image steganography (one encryption shared by many carriers, hidden in a process pool)
+def _batch_output_paths(paths, output_dir=None):
+    """
+    Choose an output PNG path for each carrier in a batch.
+
+    Args:
+        paths: Carrier file paths
+        output_dir: Directory for the outputs, or None to write next to each carrier
+
+    Returns:
+        list: Output paths named <stem>_hidden.png, numbered when two carriers share a stem
+    """
+    used = set()
+    outputs = []
+    for path in paths:
+        directory = output_dir if output_dir is not None else os.path.dirname(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        candidate = os.path.join(directory, f"{stem}_hidden.png")
+        suffix = 1
+        while candidate in used:
+            suffix += 1
+            candidate = os.path.join(directory, f"{stem}_hidden_{suffix}.png")
+        used.add(candidate)
+        outputs.append(candidate)
+    return outputs
+
+def _carrier_error(error, *paths):
+    """
+    Describe a carrier's failure without the directories of its files.
+
+    Args:
+        error: The exception the carrier raised
+        *paths: File paths the message may contain, as they are and as reprs
+
+    Returns:
+        str: The exception message with each path cut to its file name
+    """
+    message = str(error)
+    for path in paths:
+        name = os.path.basename(path)
+        message = message.replace(repr(path), repr(name)).replace(path, name)
+    return message
+
+def _hide_payload_in_image_file(job):
+    """
+    Hide an encoded payload in one carrier file (process pool worker).
+
+    Args:
+        job: Tuple (path, output_path, body, kdf_iterations, password, bits_per_channel, strip_budget)
+
+    Returns:
+        dict: {'path', 'output', 'error'}; output is None and error is set if the carrier failed
+    """
+    path, output_path, body, kdf_iterations, password, bits_per_channel, strip_budget = job
     try:
-        if password:
-            # Try to decrypt the entire message with the provided password
-            try:
-                print(f"DEBUG: Attempting final decryption with password")
-                decrypted = decrypt_message(bytes(byte_data), password=password)
-                print(f"DEBUG: Final decryption successful: {decrypted[:50] if len(decrypted) > 50 else decrypted}")
-                return decrypted.rstrip('\0')
-            except Exception as decrypt_error:
-                print(f"DEBUG: Final decryption failed: {str(decrypt_error)}")
-                # Check if it's a password-related error
-                if "password" in str(decrypt_error).lower():
-                    raise ValueError("Incorrect password. Please try again with the correct password.")
-                # If not a password error but we have enough data, it might be corrupted
-                if len(byte_data) >= 48:
-                    raise ValueError("The encrypted message appears to be corrupted or incomplete.")
-                # Otherwise, try to decode as plain text as a fallback
-                print("DEBUG: Trying to decode as plain text as fallback")
-
-        # Try to decode the entire message as plain text
-        text = byte_data.decode('utf-8', errors='ignore')
-        # Check if the decoded text looks meaningful
-        if any(c.isalpha() for c in text[:20]) and '\0' in text:
-            return text.split('\0')[0]
-        elif any(c.isalpha() for c in text[:20]):
-            return text.rstrip('\0')
-        else:
-            return "No readable message found in this image."
+        with open(path, 'rb') as image, open(output_path, 'wb') as output:
+            _hide_payload_in_image(image, body, kdf_iterations, password, output, bits_per_channel, strip_budget)
+        return {'path': path, 'output': output_path, 'error': None}
     except Exception as e:
-        print(f"DEBUG: Final extraction failed: {str(e)}")
-        if "password" in str(e).lower():
-            raise ValueError("Incorrect password. Please try again with the correct password.")
-        return "No valid message found"
+        # Do not leave a partial PNG behind
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return {'path': path, 'output': None, 'error': _carrier_error(e, path, output_path)}
 
-# Audio Steganography (using librosa and soundfile)
-def hide_message_in_audio(audio, message, password=None):
+def hide_message_in_images(paths, message, password=None, workers=None, output_dir=None, bits_per_channel=1,
+                           strip_budget=None, executor=None):
     """
-    Enhanced audio steganography with encryption and improved embedding.
+    Hide the same message in many images at once.
+
+    The message is encrypted once, so the password-derived key is computed
+    a single time for the whole batch, and the ciphertext is shipped to a
+    process pool that embeds and writes the carriers in parallel. Each
+    carrier keeps its own keyed channel order.
 
     Args:
-        audio: The input audio file
+        paths: Carrier file paths
         message: The message to hide
         password: Optional password for additional security
+        workers: Number of worker processes (default: CPU count; 1 runs in this process)
+        output_dir: Directory for the PNG outputs, or None to write next to each carrier
+        bits_per_channel: LSBs per color channel (1 to 4), or 'auto' to plan per carrier
+        strip_budget: Optional bytes of decoded raster to hold at once when streaming
+        executor: Optional running process pool to use instead of starting one (workers then only sizes the chunks)
 
     Returns:
-        str: Path to the audio with hidden message
+        list: One dict per carrier, in input order, with the carrier 'path',
+              the 'output' path (None on failure) and the 'error' message (None on
+              success), which names files without their directories
     """
-    # Load the audio file
-    y, sr = librosa.load(audio, sr=None)
+    paths = [os.fspath(path) for path in paths]
+    if not paths:
+        return []
+
+    # Encrypt the message if password is provided (once for the whole batch)
+    body, kdf_iterations = _encode_message(message, password)
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs = [
+        (path, output_path, body, kdf_iterations, password, bits_per_channel, strip_budget)
+        for path, output_path in zip(paths, _batch_output_paths(paths, output_dir))
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1 and executor is None:
+        return [_hide_payload_in_image_file(job) for job in jobs]
+
+    # Hand out jobs in chunks so small carriers do not pay one round-trip each
+    chunksize = max(1, len(jobs) // (workers * 4))
+    if executor is not None:
+        return list(executor.map(_hide_payload_in_image_file, jobs, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_hide_payload_in_image_file, jobs, chunksize=chunksize))
+
+# Audio Steganography (LSB of the integer PCM samples, using soundfile)
+# Integer PCM subtypes: subtype -> (dtype soundfile reads it as, bit of that dtype holding the sample LSB).
+# libsndfile left-aligns narrower samples, so 8-bit reads as int16 << 8 and 24-bit as int32 << 8.
+# Any other subtype (float, compressed) is read as 16-bit PCM and written back as PCM_16.
+_PCM_SUBTYPES = {
+    'PCM_U8': ('int16', 8),
+    'PCM_S8': ('int16', 8),
+    'PCM_16': ('int16', 0),
+    'PCM_24': ('int32', 8),
+    'PCM_32': ('int32', 0),
+}
+_WAV_SUBTYPES = {'PCM_S8': 'PCM_U8'}  # WAV stores 8-bit PCM unsigned
+# Decoders for formats libsndfile cannot read, by lower-case file extension (see register_audio_decoder)
+AUDIO_DECODERS = {}
+# Compressed subtypes whose decoded PCM is cached, since decoding them dominates a request
+_CACHED_SUBTYPES = {'VORBIS', 'OPUS', 'MPEG_LAYER_I', 'MPEG_LAYER_II', 'MPEG_LAYER_III'}
+AUDIO_BLOCK_FRAMES = 1 << 20  # Default frames per block when streaming
+_NO_KEYED_AUDIO_PAYLOAD = ("No hidden message was found for this password. "
+                           "Audio hidden with a password before the payload header cannot be read.")
+AUDIO_STREAMING_THRESHOLD = 256 * 1024 * 1024  # Carriers with more decoded PCM than this are always streamed
+
+def _audio_sample_indices(num_samples, password, start, stop):
+    """
+    Get the sample indices that carry bits start..stop.
 
-    # Add null terminator for extraction
-    message = message + '\0'
-    message_bytes = message.encode()
+    Args:
+        num_samples: Number of samples in the audio signal
+        password: Optional password used to key a pseudo-random order
+        start: Index of the first bit
+        stop: Index one past the last bit
 
-    # Encrypt the message if password is provided
-    if password:
-        # Use the encryption module to encrypt the message with the password
-        print(f"DEBUG: Encrypting audio message with password: {password}")
-        message_bytes = encrypt_message(message, password=password)
-        print(f"DEBUG: Encrypted audio message length: {len(message_bytes)} bytes")
+    Returns:
+        ndarray: Sample indices in embedding order
+    """
+    if not password:
+        # Use sequential indices
+        return np.arange(start, min(stop, num_samples))
 
-    # Convert message to binary
-    bin_message = ''.join(format(byte, '08b') for byte in message_bytes)
+    return KeyedPermutation.from_password(num_samples, password).take(start, stop)
 
-    # Check if the audio has enough capacity
-    if len(bin_message) > len(y):
-        raise ValueError(f"Message too large for this audio. Max capacity: {len(y)//8} bytes")
+def _pcm_format(subtype):
+    """
+    Get how a soundfile subtype is read and written by the integer engine.
 
-    # Create a copy of the audio signal
-    audio_signal = np.copy(y)
+    Args:
+        subtype: The soundfile subtype of the carrier
 
-    # Use a pseudo-random sequence for embedding if password is provided
-    if password:
-        # Generate indices based on password
-        seed = int(hashlib.md5(password.encode()).hexdigest(), 16) % 10000000
-        random.seed(seed)
-        indices = list(range(len(audio_signal)))
-        random.shuffle(indices)
-        indices = indices[:len(bin_message)]
-        indices.sort()  # Sort to maintain audio quality
+    Returns:
+        tuple: (dtype to read it as, bit of that dtype holding the sample LSB,
+                WAV subtype to write it back as)
+    """
+    if subtype not in _PCM_SUBTYPES:
+        return 'int16', 0, 'PCM_16'
+    return _PCM_SUBTYPES[subtype] + (_WAV_SUBTYPES.get(subtype, subtype),)
+
+def register_audio_decoder(extension, decoder):
+    """
+    Register a decoder for an audio format libsndfile cannot read.
+
+    Carriers are decoded with soundfile whenever libsndfile can open them
+    (WAV, FLAC, OGG, and MP3 from libsndfile 1.1 on); the decoder registered
+    for the file's extension is tried next, and librosa last.
+
+    Args:
+        extension: File extension without the dot (e.g. 'mp3')
+        decoder: Callable taking a path or binary file object and returning
+                 (float samples in [-1, 1] as frames or frames x channels, sample rate)
+    """
+    AUDIO_DECODERS[extension.lower()] = decoder
+
+def _decode_with_librosa(audio):
+    """Decode audio with librosa, which is imported on first use since it pulls in numba and scipy."""
+    import librosa
+
+    y, sr = librosa.load(audio, sr=None, mono=False)
+    return y.T, sr
+
+def _audio_decoder(audio):
+    """Get the fallback decoder for a carrier from its file name, if it has one."""
+    if isinstance(audio, (str, os.PathLike)):
+        name = audio
     else:
-        # Use sequential indices
-        indices = list(range(len(bin_message)))
+        # Uploads carry a filename, open files a name
+        name = getattr(audio, 'filename', None) or getattr(audio, 'name', None)
+    extension = os.path.splitext(str(name or ''))[1][1:].lower()
+    return AUDIO_DECODERS.get(extension, _decode_with_librosa)
+
+def _decode_to_pcm16(audio):
+    """Decode a compressed carrier libsndfile can read to 16-bit PCM."""
+    return sf.read(audio, dtype='int16', always_2d=True)
+
+def _quantize_decoded_audio(audio):
+    """Decode a carrier with its fallback decoder, as float samples quantized to 16-bit PCM."""
+    y, sr = _audio_decoder(audio)(audio)
+    y = np.asarray(y)
+    return np.clip(np.round(y.reshape(len(y), -1) * 32768), -32768, 32767).astype(np.int16), sr
+
+def _read_pcm_audio(audio):
+    """
+    Decode an audio file to integer PCM without resampling or mixing down.
+
+    Compressed carriers (and formats libsndfile cannot open) are decoded to
+    16-bit PCM once and then memory-mapped from the decoded-audio cache.
+
+    Args:
+        audio: The audio file (path or binary file object)
+
+    Returns:
+        tuple: (samples as a frames x channels int16/int32 array, sample rate,
+                WAV subtype to write it back as, bit holding the sample LSB)
+    """
+    start = audio.tell() if hasattr(audio, 'tell') else None
+    try:
+        with sf.SoundFile(audio) as f:
+            dtype, lsb, subtype = _pcm_format(f.subtype)
+            if f.subtype not in _CACHED_SUBTYPES:
+                return f.read(dtype=dtype, always_2d=True), f.samplerate, subtype, lsb
+        decode = _decode_to_pcm16
+    except sf.LibsndfileError:
+        decode = _quantize_decoded_audio
+    if start is not None:
+        audio.seek(start)
+
+    digest = audio_cache.digest(audio)
+    cached = audio_cache.get(digest)
+    if cached is not None:
+        samples, sr = cached
+    else:
+        samples, sr = decode(audio)
+        samples = audio_cache.put(digest, samples, sr)
+    return samples, sr, 'PCM_16', 0
+
+def _embed_bits_in_audio(samples, bits, password=None, lsb=0):
+    """
+    Write payload bits into the sample LSBs of every channel in place.
+
+    Samples are indexed in interleaved order (frame * channels + channel),
+    so the keyed order spreads the bits across all channels.
+
+    Args:
+        samples: Frames x channels integer PCM array
+        bits: Array of 0/1 values to embed
+        password: Optional password used to key a pseudo-random sample order
+        lsb: Bit of the sample dtype holding the sample LSB
+    """
+    flat = samples.reshape(-1)
+    indices = _audio_sample_indices(flat.size, password, 0, len(bits))
+    mask = np.array(1 << lsb, dtype=samples.dtype)
+    flat[indices] = (flat[indices] & ~mask) | (bits.astype(samples.dtype) << lsb)
+
+def _open_pcm_blocks(audio, block_frames):
+    """
+    Open a carrier for block streaming if it should be streamed.
+
+    Args:
+        audio: The audio file (path or binary file object)
+        block_frames: Requested frames per block, or None to stream only large carriers
+
+    Returns:
+        SoundFile: The open carrier, or None (with a file object rewound) if
+        libsndfile cannot seek in it or it is small enough to load whole
+    """
+    start = audio.tell() if hasattr(audio, 'tell') else None
+    try:
+        f = sf.SoundFile(audio)
+    except sf.LibsndfileError:
+        f = None
+
+    if f is not None and f.seekable():
+        pcm_bytes = f.frames * f.channels * np.dtype(_pcm_format(f.subtype)[0]).itemsize
+        if block_frames is not None or pcm_bytes > AUDIO_STREAMING_THRESHOLD:
+            return f
+
+    if f is not None:
+        f.close()
+    if start is not None:
+        audio.seek(start)
+    return None
+
+def _embed_bits_in_audio_blocks(f, output, bits, password=None, block_frames=AUDIO_BLOCK_FRAMES):
+    """
+    Stream a carrier block by block, writing a bit array into its sample LSBs.
+
+    Produces the same samples as _embed_bits_in_audio, but holds only one
+    block of the carrier in memory. Sample indices are sorted once, so each
+    block only touches the samples that fall inside it.
 
-    # Embed the message bits
-    for i, data_index in enumerate(indices):
-        if i < len(bin_message):
-            # Use phase encoding for better imperceptibility
-            # Modify the least significant bit of the sample
-            audio_signal[data_index] = (audio_signal[data_index] & ~0.001) | (float(int(bin_message[i])) * 0.001)
+    Args:
+        f: SoundFile open for reading on the carrier
+        output: Writable, seekable binary file object for the WAV
+        bits: Array of 0/1 values to embed
+        password: Optional password used to key a pseudo-random sample order
+        block_frames: Frames per block
+    """
+    dtype, lsb, subtype = _pcm_format(f.subtype)
+    indices = _audio_sample_indices(f.frames * f.channels, password, 0, len(bits))
+    mask = np.array(1 << lsb, dtype=dtype)
+
+    # Visit the samples in file order
+    order = np.argsort(indices)
+    indices, bits = indices[order], bits[order].astype(dtype) << lsb
+
+    with sf.SoundFile(output, 'w', f.samplerate, f.channels, subtype, format='WAV') as out:
+        start = 0
+        for block in f.blocks(block_frames, dtype=dtype, always_2d=True):
+            lo, hi = np.searchsorted(indices, [start, start + block.size])
+            if hi > lo:
+                flat = block.reshape(-1)
+                local = indices[lo:hi] - start
+                flat[local] = (flat[local] & ~mask) | bits[lo:hi]
+            out.write(block)
+            start += block.size
+
+def _gather_audio_samples(f, indices, block_frames=AUDIO_BLOCK_FRAMES):
+    """
+    Read samples at interleaved indices, reading only the blocks that hold them.
+
+    Args:
+        f: SoundFile open for reading on the carrier
+        indices: Interleaved sample indices (frame * channels + channel) to read
+        block_frames: Frames per block
+
+    Returns:
+        ndarray: The samples, in the order of indices
+    """
+    dtype = _pcm_format(f.subtype)[0]
+    block_samples = block_frames * f.channels
+    order = np.argsort(indices)
+    sorted_indices = indices[order]
+    values = np.empty(len(indices), dtype=dtype)
+
+    for block_start in np.unique(sorted_indices // block_samples) * block_samples:
+        lo, hi = np.searchsorted(sorted_indices, [block_start, block_start + block_samples])
+        f.seek(int(block_start // f.channels))
+        block = f.read(block_frames, dtype=dtype, always_2d=True).reshape(-1)
+        values[order[lo:hi]] = block[sorted_indices[lo:hi] - block_start]
+
+    return values
+
+def _signal_body_frames(method, count):
+    """Get the number of leading frames a signal-domain engine needs to hold count bits."""
+    if method == 'echo':
+        return echo_frames_needed(count)
+    return phase_frames_needed(count)
+
+def _signal_body_capacity(method, frames):
+    """Get the number of bits a signal-domain engine can hide in a carrier of the given length."""
+    if method == 'echo':
+        return echo_capacity(frames)
+    return phase_capacity(frames)
+
+def _embed_signal_body(samples, bits, method, password=None, lsb=0):
+    """
+    Hide bits with a signal-domain engine in the leading frames of integer PCM samples, in place.
+
+    The bits are read back from the rounded samples, and ValueError is
+    raised if any of them does not survive.
+
+    Args:
+        samples: Frames x channels integer PCM array (modified in place)
+        bits: Array of 0/1 values
+        method: 'echo' (keyed echoes) or 'phase' (keyed STFT phase band)
+        password: Optional password keying the engine
+        lsb: Bit position of the LSB within each sample (8 for left-aligned 8/24-bit PCM)
+    """
+    used = _signal_body_frames(method, len(bits))
+    info = np.iinfo(samples.dtype)
+    scale = float(info.max + 1)
+    step = 1 << lsb
+
+    signal = samples[:used] / scale
+    if method == 'echo':
+        coded = embed_echo_bits(signal, bits, echo_delays(password))
+    else:
+        # An eighth of a PCM step per bin keeps the phase well clear of rounding noise
+        coded = embed_phase_bits(signal, bits, phase_bins(password), min_magnitude=step / scale / 8)
+
+    # Back onto the sample grid of the source bit depth, clipping any overshoot
+    samples[:used] = np.clip(np.round(coded * (scale / step)) * step, info.min, info.max - step + 1)
+
+    # Tonal or near-silent carriers can defeat the engine, so read the bits back before handing out the file
+    signal = samples[:used] / scale
+    if method == 'echo':
+        decoded = detect_echo_bits(signal, len(bits), echo_delays(password))
+    else:
+        decoded = detect_phase_bits(signal, len(bits), phase_bins(password))
+    if not np.array_equal(decoded, bits):
+        raise ValueError(f"This audio cannot reliably carry the message with the {method} method. "
+                         "Try another method or a carrier with more broadband sound.")
+
+def _signal_body_reader(read_frames, password=None):
+    """
+    Build a _read_payload body reader for payloads hidden by a signal-domain engine.
+
+    Args:
+        read_frames: Callable (count) returning the first count frames as a
+                     float array, or None if the carrier is shorter than that
+        password: Optional password keying the engine
+
+    Returns:
+        callable: (header) -> body bytes, or None for an LSB payload
+    """
+    def read_body(header):
+        method = header.audio_method
+        if method == 'lsb':
+            return None
+        if method is None:
+            raise ValueError("The message was hidden with an audio method this version cannot read")
+
+        count = header.payload_length * 8
+        signal = read_frames(_signal_body_frames(method, count))
+        if signal is None:
+            raise ValueError("The payload header declares more data than this audio holds")
+
+        if method == 'echo':
+            bits = detect_echo_bits(signal, count, echo_delays(password))
+        else:
+            bits = detect_phase_bits(signal, count, phase_bins(password))
+        return np.packbits(bits).tobytes()
 
-    # Create directory if it doesn't exist
-    os.makedirs('static', exist_ok=True)
+    return read_body
+
+def hide_message_in_audio(audio, message, password=None, output=None, block_frames=None, method='lsb'):
+    """
+    Enhanced audio steganography with encryption and improved embedding.
 
-    # Save the audio with hidden message
-    hidden_audio_path = 'static/hidden_audio.wav'
-    sf.write(hidden_audio_path, audio_signal, sr)
-    return hidden_audio_path
+    With the 'lsb' method the message goes in the least significant bit of
+    the carrier's own integer samples, spread over every channel, so the
+    output is a WAV with the source sample rate, channel layout and PCM bit
+    depth; only one bit per chosen sample changes, and capacity grows with
+    the channel count. Long carriers (or any carrier when block_frames is
+    given) are streamed block by block, so memory stays flat however long
+    the recording is.
+
+    With the 'echo' method the payload body is hidden as keyed echoes, each
+    bit repeated over ECHO_REPEATS frames of ECHO_FRAME_LENGTH samples (see
+    app.audio_echo); with 'phase' it
+    is coded in the phase of a keyed band of STFT bins, PHASE_BITS_PER_FRAME
+    bits per PHASE_FRAME_LENGTH frames (see app.audio_phase). Only the header
+    goes in the LSBs then. The method is recorded in the header, so
+    extraction picks the right decoder. Echo and phase carriers are
+    processed in memory.
+
+    Args:
+        audio: The input audio file
+        message: The message to hide
+        password: Optional password for additional security
+        output: Optional writable binary file object for the WAV (a new buffer if None)
+        block_frames: Optional frames to hold at once when streaming
+        method: Embedding engine, one of AUDIO_METHODS
 
-def extract_message_from_audio(audio, password=None):
+    Returns:
+        file: The file object holding the WAV with hidden message, rewound
+              to the start if it is an in-memory buffer
+    """
+    if method not in AUDIO_METHODS:
+        raise ValueError(f"Unsupported audio method: {method}")
+
+    # Build the headed payload, encrypting the message if password is provided
+    payload = _build_payload(message, password, audio_method=method)
+    logger.debug("Audio payload length: %d bytes (encrypted: %s, method: %s)", len(payload), bool(password), method)
+
+    # Convert payload to bits
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+
+    # Stream long carriers block by block
+    f = _open_pcm_blocks(audio, block_frames) if method == 'lsb' else None
+    if f is not None:
+        with f:
+            if len(bits) > f.frames * f.channels:
+                raise ValueError(f"Message too large for this audio. Max capacity: {f.frames * f.channels//8} bytes")
+            return _write_output(output, lambda out: _embed_bits_in_audio_blocks(
+                f, out, bits, password, block_frames or AUDIO_BLOCK_FRAMES))
+
+    # Load the audio file
+    samples, sr, subtype, lsb = _read_pcm_audio(audio)
+
+    # Hide the body in the signal first; the header then goes in the LSBs as usual
+    if method != 'lsb':
+        header_bits, body_bits = bits[:HEADER_SIZE * 8], bits[HEADER_SIZE * 8:]
+        body_capacity = _signal_body_capacity(method, len(samples))
+        if len(body_bits) > body_capacity:
+            raise ValueError(f"Message too large for this audio. Max capacity: {body_capacity//8} bytes")
+        _embed_signal_body(samples, body_bits, method, password, lsb)
+        bits = header_bits
+
+    # Check if the audio has enough capacity
+    if len(bits) > samples.size:
+        raise ValueError(f"Message too large for this audio. Max capacity: {samples.size//8} bytes")
+
+    # Embed the message bits in one masked write over the chosen samples
+    _embed_bits_in_audio(samples, bits, password, lsb)
+
+    # Write the audio with hidden message
+    return _write_output(output, lambda f: sf.write(f, samples, sr, format='WAV', subtype=subtype))
+
+def extract_message_from_audio(audio, password=None, block_frames=None):
     """
     Extract a hidden message from an audio file.
 
+    Long carriers are read block by block, as in hide_message_in_audio, and
+    only the blocks holding the header and the payload it declares are read.
+
     Args:
         audio: The audio file with hidden message
         password: Optional password used during hiding
+        block_frames: Optional frames to hold at once when streaming
 
     Returns:
         str: The extracted message
     """
+    # Read long carriers block by block: one pass for the header, one for the body
+    position = audio.tell() if hasattr(audio, 'tell') else None
+    f = _open_pcm_blocks(audio, block_frames)
+    if f is not None:
+        with f:
+            lsb = _pcm_format(f.subtype)[1]
+
+            def read_block_bits(start, stop, bits_per_slot):
+                indices = _audio_sample_indices(f.frames * f.channels, password, start, stop)
+                samples = _gather_audio_samples(f, indices, block_frames or AUDIO_BLOCK_FRAMES)
+                return ((samples >> lsb) & 1).astype(np.uint8)
+
+            def read_block_frames(count):
+                if count > f.frames:
+                    return None
+                f.seek(0)
+                return f.read(count, dtype='float64', always_2d=True)
+
+            payload = _read_payload(read_block_bits, f.frames * f.channels,
+                                    read_body=_signal_body_reader(read_block_frames, password))
+        if payload is not None:
+            logger.debug("Found payload header, payload length: %d bytes", payload[0].payload_length)
+            return _open_payload(*payload, password=password)
+
+        # Carriers without a header need the whole file, and can only be read without a password
+        if password:
+            raise ValueError(_NO_KEYED_AUDIO_PAYLOAD)
+        if position is not None:
+            audio.seek(position)
+
     # Load the audio file
-    y, _ = librosa.load(audio, sr=None)  # Discard sample rate as we don't need it
+    samples, _, _, lsb = _read_pcm_audio(audio)
+    values = samples.reshape(-1)
+
+    def read_bits(start, stop, bits_per_slot):
+        return ((values[_audio_sample_indices(len(values), password, start, stop)] >> lsb) & 1).astype(np.uint8)
 
-    # Use the same pseudo-random sequence for extraction if password is provided
+    def read_frames(count):
+        if count > len(samples):
+            return None
+        return samples[:count] / float(np.iinfo(samples.dtype).max + 1)
+
+    # Read the header and exactly the payload bits it declares, from every channel (or the signal)
+    payload = _read_payload(read_bits, samples.size, read_body=_signal_body_reader(read_frames, password))
+    if payload is not None:
+        logger.debug("Found payload header, payload length: %d bytes", payload[0].payload_length)
+        return _open_payload(*payload, password=password)
+
+    # Carriers written before the payload header was introduced, read from the mono mix librosa loaded
     if password:
-        # Generate indices based on password
-        seed = int(hashlib.md5(password.encode()).hexdigest(), 16) % 10000000
-        random.seed(seed)
-        indices = list(range(len(y)))
-        random.shuffle(indices)
-        # We don't know the exact length, so use a reasonable number of samples
-        max_bits = min(len(y), 100000)  # Limit to prevent excessive processing
-        indices = indices[:max_bits]
-        indices.sort()  # Sort to maintain the correct order
-    else:
-        # Use sequential indices
-        indices = list(range(min(len(y), 100000)))
-
-    # Extract the binary data
-    binary_data = ''
-    for i in indices:
-        # Extract the least significant bit
-        bit = '1' if (y[i] % 0.002) > 0.001 else '0'
-        binary_data += bit
-
-        # Check for null terminator every 8 bits
-        if len(binary_data) % 8 == 0 and len(binary_data) >= 8:
-            # Convert binary to bytes
-            byte_data = bytearray()
-            for j in range(0, len(binary_data), 8):
-                if j + 8 <= len(binary_data):
-                    byte = int(binary_data[j:j+8], 2)
-                    byte_data.append(byte)
-
-            # Try to decode and check for null terminator
-            try:
-                if password:
-                    # Try to decrypt if password was provided
-                    try:
-                        # Pass the password to the decrypt_message function
-                        decrypted = decrypt_message(bytes(byte_data), password=password)
-                        print(f"DEBUG: Audio decryption successful, result: {decrypted[:50] if len(decrypted) > 50 else decrypted}")
-                        if '\0' in decrypted:
-                            return decrypted.split('\0')[0]
-                        return decrypted  # Return even if no null terminator is found
-                    except Exception as e:
-                        print(f"DEBUG: Audio decryption failed: {str(e)}")
-                        # If we have enough data but decryption fails, it's likely a wrong password
-                        if len(byte_data) > 32:  # Reasonable size for an encrypted message
-                            raise ValueError("Incorrect password. Please try again with the correct password.")
-                        # Otherwise continue extracting
-                else:
-                    # Try to decode without decryption
-                    text = byte_data.decode('utf-8', errors='ignore')
-                    if '\0' in text:
-                        return text.split('\0')[0]
-            except ValueError as e:
-                # Re-raise password errors
-                if "password" in str(e).lower():
-                    raise
-                # Continue extracting for other errors
-                pass
-
-    # If we've extracted all bits but found no terminator, try to decode the whole message
+        raise ValueError(_NO_KEYED_AUDIO_PAYLOAD)
+    logger.debug("No payload header found, using legacy audio extraction")
+    y = (samples / float(np.iinfo(samples.dtype).max + 1)).mean(axis=1).astype(np.float32)
+    return _extract_legacy_message_from_audio(y)
+
+def _extract_legacy_message_from_audio(y):
+    """
+    Extract a message from an audio signal without a payload header.
+
+    Carriers written without a password hold the message on the
+    quantization grid in sample order, so every sample is read in one pass
+    and the bytes are decoded up to the null terminator. The original
+    keyed writer used a password-dependent subset of samples whose size
+    depended on the message length, which the carrier does not record, so
+    keyed carriers from before the header are not supported.
+
+    Args:
+        y: The decoded audio signal
+
+    Returns:
+        str: The extracted message
+    """
+    # Extract the binary data from every sample at once (the upper half of each 0.002 grid step is a 1)
+    steps = y.astype(np.float64) / 0.002
+    bits = ((steps - np.floor(steps)) > 0.5).astype(np.uint8)
+    byte_data = np.packbits(bits[:len(bits) // 8 * 8]).tobytes()
+
+    # Decode up to the null terminator, or the whole signal if there is none
     try:
-        if password:
-            # Try to decrypt the entire message
-            decrypted = decrypt_message(bytes(byte_data), password=password)
-            return decrypted.rstrip('\0')
-        else:
-            # Try to decode the entire message
-            text = byte_data.decode('utf-8', errors='ignore')
-            return text.rstrip('\0')
+        return byte_data.split(b'\0')[0].decode('utf-8', errors='ignore')
     except Exception:
         return "No valid message found in audio"
 
+# Capacity estimation (reads only the carrier header: no decode, no key derivation)
+def _capacity_entry(max_bytes, **settings):
+    """Describe the capacity of one embedding setting, with and without a password."""
+    return dict(settings, max_bytes=max_bytes, max_bytes_encrypted=max_plaintext_length(max_bytes))
+
+def capacity(file, mode):
+    """
+    Estimate how large a message a carrier can hold, without decoding it.
+
+    Images are sized from the file header (dimensions and mode), audio from
+    the soundfile info block, so this takes milliseconds even for carriers
+    that would take seconds to hide a message in.
+
+    Args:
+        file: The carrier (path or binary file object)
+        mode: The carrier type, 'image' or 'audio'
+
+    Returns:
+        dict: Carrier properties and a 'capacity' list with one entry per
+              embedding setting, giving 'max_bytes' (UTF-8 message bytes
+              without a password) and 'max_bytes_encrypted' (with one)
+    """
+    if mode == 'image':
+        # Large PNGs are sized by the strip reader, which does not enforce PIL's pixel limit
+        start = file.tell() if hasattr(file, 'tell') else None
+        try:
+            reader = PngStripReader(file) if start is not None else None
+        except ValueError:
+            reader = None
+
+        if reader is not None:
+            width, height, image_mode = reader.width, reader.height, reader.mode
+        else:
+            if start is not None:
+                file.seek(start)
+            with Image.open(file) as img:
+                width, height, image_mode = img.width, img.height, img.mode
+
+        layout = _image_layout(image_mode)
+        channels = width * height * _LAYOUT_BANDS[layout][0]
+        return {
+            'type': 'image',
+            'width': width,
+            'height': height,
+            'layout': layout,
+            'capacity': [
+                _capacity_entry(_image_capacity(channels, bits_per_channel), bits_per_channel=bits_per_channel)
+                for bits_per_channel in range(1, MAX_BITS_PER_CHANNEL + 1)
+            ],
+        }
+
+    if mode == 'audio':
+        info = sf.info(file)
+        return {
+            'type': 'audio',
+            'samplerate': info.samplerate,
+            'channels': info.channels,
+            'frames': info.frames,
+            'subtype': info.subtype,
+            'capacity': [
+                # One bit per sample of every channel
+                _capacity_entry(max(0, (info.frames * info.channels - HEADER_SIZE * 8) // 8),
+                                method='lsb', bits_per_sample=1),
+                # One bit per frame block, with the header in the LSBs
+                _capacity_entry(echo_capacity(info.frames) // 8, method='echo', frame_length=ECHO_FRAME_LENGTH),
+                # A band of STFT bins per frame, with the header in the LSBs
+                _capacity_entry(phase_capacity(info.frames) // 8, method='phase', frame_length=PHASE_FRAME_LENGTH),
+            ],
+        }
+
+    raise ValueError(f"Unsupported carrier type: {mode}")
+
 # Text Steganography (using multiple invisible characters and encryption)
-def hide_message_in_text(message, password=None, cover_text=None):
+TEXT_CHUNK_SIZE = 1 << 20  # Default characters to hold at once when streaming
+_WORD_END = re.compile(r'(?<=\S)\s')  # Whitespace right after a word
+
+def _text_payload(message, password=None, alphabet_size=DEFAULT_ALPHABET_SIZE):
+    """
+    Encrypt a message if a password is given and encode it, headed, as invisible characters.
+
+    Args:
+        message: The message to hide
+        password: Optional password for encryption
+        alphabet_size: Number of invisible characters in the body's alphabet, one of TEXT_ALPHABETS
+
+    Returns:
+        str: The header in the 4-symbol alphabet followed by the body in alphabet_size symbols
+    """
+    if alphabet_size not in TEXT_ALPHABETS:
+        raise ValueError(f"Unsupported alphabet size: {alphabet_size}")
+
+    body, kdf_iterations = _encode_message(message, password)
+    header = build_header(len(body), encrypted=bool(kdf_iterations), kdf_iterations=kdf_iterations,
+                          binary_text=True, text_alphabet=alphabet_size)
+    return encode_zero_width(header) + encode_zero_width(body, alphabet_size)
+
+def hide_message_in_text(message, password=None, cover_text=None, alphabet_size=DEFAULT_ALPHABET_SIZE):
     """
     Enhanced text steganography with multiple invisible characters and encryption.
 
+    The payload body is encoded directly, ciphertext included, and the
+    header carries the binary text flag so extraction does not have to
+    guess the body's format. The header is always written with the
+    original 4-symbol alphabet; the body uses alphabet_size symbols
+    (8, 16 or 256 carry 3, 4 or 8 bits per character) and follows the
+    header in one unbroken run.
+
     Args:
         message: The message to hide
         password: Optional password for encryption
         cover_text: Optional custom cover text
+        alphabet_size: Number of invisible characters in the body's alphabet, one of TEXT_ALPHABETS
 
     Returns:
         str: Text with hidden message
     """
-    # Add null terminator for extraction
-    message = message + '\0'
-
     # Encrypt the message if password is provided
-    if password:
-        # Use the encryption module to encrypt the message with the password
-        print(f"DEBUG: Encrypting message with password: {password}")
-        encrypted_bytes = encrypt_message(message, password=password)
-        # Convert bytes to hex string for easier handling
-        message_to_hide = encrypted_bytes.hex()
-        print(f"DEBUG: Encrypted message (hex): {message_to_hide[:50]}...")
-    else:
-        message_to_hide = message
-
-    # Convert message to binary
-    binary_message = ''.join(format(ord(char), '08b') for char in message_to_hide)
-
-    # Use multiple invisible characters for better security
-    # Each character represents a different bit pattern
-    invisible_chars = {
-        '00': '\u200B',  # Zero-width space
-        '01': '\u200C',  # Zero-width non-joiner
-        '10': '\u200D',  # Zero-width joiner
-        '11': '\u2060'   # Word joiner
-    }
+    payload = _text_payload(message, password, alphabet_size)
 
     # Use provided cover text or default
     if not cover_text:
         cover_text = "This is a normal looking text. "
 
-    # Prepare the output text
-    output_text = cover_text[:len(cover_text)//2]
-
-    # Hide the binary message using invisible characters (2 bits at a time)
-    for i in range(0, len(binary_message), 2):
-        if i + 1 < len(binary_message):
-            bit_pair = binary_message[i:i+2]
-            output_text += invisible_chars[bit_pair]
-        else:
-            # Handle odd length
-            output_text += invisible_chars[binary_message[i] + '0']
-
-    # Add the second half of the cover text
-    output_text += cover_text[len(cover_text)//2:]
+    # Hide the headed payload as invisible characters in the middle of the cover text
+    middle = len(cover_text) // 2
+    output_text = ''.join((cover_text[:middle], payload, cover_text[middle:]))
 
     # Add a signature to identify this as a steganographic message
     if not output_text.endswith("."):
@@ -442,6 +1370,63 @@ def hide_message_in_text(message, password=None, cover_text=None):
 
     return output_text
 
+def _text_insertion_point(chunk):
+    """Find where a payload goes in a chunk of cover text: the end of the first paragraph, else of the first word."""
+    paragraph = chunk.find('\n\n')
+    if paragraph >= 0:
+        return paragraph
+
+    word_end = _WORD_END.search(chunk)
+    return word_end.start() if word_end else None
+
+def hide_message_in_text_file(source, output, message, password=None, alphabet_size=DEFAULT_ALPHABET_SIZE,
+                              chunk_size=None):
+    """
+    Hide a message in a text document while copying it from one file object to another.
+
+    The cover is read chunk_size characters at a time and each chunk is
+    written out as soon as it is read, so memory stays flat however large
+    the document is. The payload is the same as hide_message_in_text()'s;
+    it goes in at the end of the first paragraph if one ends in the first
+    chunk (a break split across the chunk boundary included), otherwise at
+    the end of the first word, or at the end of the document if it has no
+    word boundary at all. The closing period is added as in
+    hide_message_in_text().
+
+    Args:
+        source: Readable text file object holding the cover
+        output: Writable text file object for the result
+        message: The message to hide
+        password: Optional password for encryption
+        alphabet_size: Number of invisible characters in the body's alphabet, one of TEXT_ALPHABETS
+        chunk_size: Optional characters to read at once
+
+    Returns:
+        file: The output file object
+    """
+    payload = _text_payload(message, password, alphabet_size)
+    chunk_size = chunk_size or TEXT_CHUNK_SIZE
+
+    last_character = ''
+    for chunk in iter(lambda: source.read(chunk_size), ''):
+        if payload:
+            # Read one character ahead so a paragraph break split across chunks is found whole
+            if chunk.endswith('\n'):
+                chunk += source.read(1)
+            position = _text_insertion_point(chunk)
+            if position is not None:
+                chunk = ''.join((chunk[:position], payload, chunk[position:]))
+                payload = ''
+        output.write(chunk)
+        last_character = chunk[-1]
+
+    # A cover without a word boundary carries the payload at its end
+    output.write(payload)
+    if not (payload or last_character).endswith("."):
+        output.write(".")
+
+    return output
+
 def extract_message_from_text(hidden_message, password=None):
     """
     Extract a hidden message from text.
@@ -454,48 +1439,90 @@ def extract_message_from_text(hidden_message, password=None):
         str: The extracted message
     """
     # Add debug logging
-    print(f"DEBUG: Starting text extraction with password: {password}")
+    logger.debug("Starting text extraction (password given: %s)", bool(password))
 
-    # Check for invisible characters
-    has_invisible = any(c in hidden_message for c in ['\u200B', '\u200C', '\u200D', '\u2060'])
-    invisible_count = sum(1 for c in hidden_message if c in ['\u200B', '\u200C', '\u200D', '\u2060']) if has_invisible else 0
+    # Collect the invisible characters of the original alphabet in one pass
+    symbols = zero_width_symbols(hidden_message)
+    per_byte = ZERO_WIDTH_CODECS[DEFAULT_ALPHABET_SIZE].symbols_per_byte
 
-    print(f"DEBUG: Found {invisible_count} invisible characters")
+    # Add debug logging
+    logger.debug("Found %d invisible characters", len(symbols))
+
+    # Read the header, which is always in the original alphabet, and exactly the payload bytes it declares
+    header_data = decode_zero_width(symbols[:HEADER_SIZE * per_byte])
+    header = parse_header(header_data)
+    if header is not None:
+        header_size = header_size_from_prefix(header_data)
+        logger.debug("Found payload header, payload length: %d bytes", header.payload_length)
+
+        alphabet_size = header.text_alphabet
+        if alphabet_size is None:
+            raise ValueError("The message was hidden with an alphabet this version cannot read")
+        if alphabet_size == DEFAULT_ALPHABET_SIZE:
+            start = header_size * per_byte
+            body = decode_zero_width(symbols[start:start + header.payload_length * per_byte])
+        else:
+            # Wider alphabets follow the header in one unbroken run
+            codec = ZERO_WIDTH_CODECS[alphabet_size]
+            start = zero_width_offset(hidden_message, header_size * per_byte)
+            body = codec.decode(codec.run_at(hidden_message, start)[:codec.symbol_count(header.payload_length)])
+
+        if len(body) < header.payload_length:
+            raise ValueError("The hidden message appears to be truncated or corrupted.")
+        if header.encrypted and password and not header.binary_text:
+            # Encrypted text payloads written before the binary text flag are stored as hex
+            try:
+                body = bytes.fromhex(body.decode('ascii'))
+            except ValueError:
+                raise ValueError("Incorrect password or the message was not encrypted properly.")
+        return _open_payload(header, body, password=password)
 
-    # Don't force password validation here - we'll handle it later
+    # Carriers written before the payload header was introduced
+    logger.debug("No payload header found, using legacy text extraction")
+    return _extract_legacy_message_from_text(decode_zero_width(symbols), len(symbols), password)
 
-    # Define the invisible characters used for encoding
-    invisible_chars = {
-        '\u200B': '00',  # Zero-width space
-        '\u200C': '01',  # Zero-width non-joiner
-        '\u200D': '10',  # Zero-width joiner
-        '\u2060': '11'   # Word joiner
-    }
+def extract_message_from_text_file(source, password=None, chunk_size=None):
+    """
+    Extract a hidden message from a text document read from a file object.
 
-    # Extract the binary data
-    binary = ''
-    invisible_count = 0
-    for char in hidden_message:
-        if char in invisible_chars:
-            binary += invisible_chars[char]
-            invisible_count += 1
+    Only the runs of invisible characters are kept while the document is
+    read chunk_size characters at a time, so memory grows with the hidden
+    payload rather than with the cover.
 
-    # Add debug logging
-    print(f"DEBUG: Found {invisible_count} invisible characters")
-    print(f"DEBUG: Extracted binary data length: {len(binary)}")
+    Args:
+        source: Readable text file object holding the document
+        password: Optional password used during hiding
+        chunk_size: Optional characters to read at once
 
-    # Convert binary to text (8 bits per character)
-    extracted_text = ''
-    for i in range(0, len(binary), 8):
-        if i + 8 <= len(binary):
-            byte = binary[i:i+8]
-            extracted_text += chr(int(byte, 2))
+    Returns:
+        str: The extracted message
+    """
+    chunk_size = chunk_size or TEXT_CHUNK_SIZE
+    return extract_message_from_text(zero_width_runs(iter(lambda: source.read(chunk_size), '')), password)
+
+def _extract_legacy_message_from_text(byte_data, invisible_count, password=None):
+    """
+    Extract a message from invisible-character bytes without a payload header.
+
+    These are the only documents whose format is guessed (encrypted bodies
+    were stored as hex); headed payloads say so in their flags.
+
+    Args:
+        byte_data: The bytes decoded from the invisible characters
+        invisible_count: Number of invisible characters found
+        password: Optional password used during hiding
+
+    Returns:
+        str: The extracted message
+    """
+    # One character per byte (latin-1 maps each byte to the code point of the same value)
+    extracted_text = byte_data.decode('latin-1')
 
     # Add debug logging
     if extracted_text:
-        print(f"DEBUG: Converted to text (first 50 chars): {extracted_text[:50]}...")
+        logger.debug("Converted %d bytes to text", len(extracted_text))
     else:
-        print("DEBUG: No text was extracted from binary data")
+        logger.debug("No text was extracted from binary data")
 
     # Check if the text appears to be encrypted (has invisible characters and looks like hex)
     is_likely_encrypted = invisible_count > 20 and len(extracted_text) > 16
@@ -503,43 +1530,43 @@ def extract_message_from_text(hidden_message, password=None):
 
     if len(extracted_text) > 0:
         is_hex = all(c in '0123456789abcdefABCDEF' for c in extracted_text.strip())
-        print(f"DEBUG: Text looks like hex: {is_hex}")
+        logger.debug("Text looks like hex: %s", is_hex)
 
     # If we have invisible characters and hex-like text, it's probably encrypted
     if is_likely_encrypted and is_hex:
-        print("DEBUG: Message appears to be encrypted")
+        logger.debug("Message appears to be encrypted")
 
         # If no password was provided but message appears encrypted
         if not password:
-            print("DEBUG: No password provided for encrypted message")
+            logger.debug("No password provided for encrypted message")
             raise ValueError("This message appears to be encrypted. Please provide a password.")
 
         # Try to decrypt with the provided password
         try:
             # Convert from hex to bytes
             encrypted_bytes = bytes.fromhex(extracted_text)
-            print(f"DEBUG: Successfully converted to bytes, length: {len(encrypted_bytes)}")
+            logger.debug("Successfully converted to bytes, length: %d", len(encrypted_bytes))
 
             # Attempt to decrypt
             try:
                 # Pass the password to the decrypt_message function
                 decrypted = decrypt_message(encrypted_bytes, password=password)
-                print(f"DEBUG: Successfully decrypted: {decrypted[:50] if len(decrypted) > 50 else decrypted}")
+                logger.debug("Successfully decrypted legacy text payload")
 
                 # Remove null terminator if present
                 if '\0' in decrypted:
                     return decrypted.split('\0')[0]
                 return decrypted
             except Exception as e:
-                print(f"DEBUG: Decryption failed: {str(e)}")
+                logger.debug("Decryption failed: %s", e)
                 raise ValueError("Incorrect password. Please try again with the correct password.")
         except ValueError as e:
-            print(f"DEBUG: Hex conversion or decryption failed: {str(e)}")
+            logger.debug("Hex conversion or decryption failed: %s", e)
             raise ValueError("Incorrect password or the message was not encrypted properly.")
 
     # If password was provided but message doesn't look encrypted
     elif password and not (is_likely_encrypted and is_hex):
-        print("DEBUG: Password provided but message doesn't appear to be encrypted")
+        logger.debug("Password provided but message doesn't appear to be encrypted")
         # Just return the extracted text as is
         if '\0' in extracted_text:
             return extracted_text.split('\0')[0]
@@ -547,11 +1574,11 @@ def extract_message_from_text(hidden_message, password=None):
 
     # If no password and message doesn't look encrypted
     else:
-        print("DEBUG: No password provided and message doesn't appear encrypted")
+        logger.debug("No password provided and message doesn't appear encrypted")
         # Just return the extracted text as is
         if '\0' in extracted_text:
             result = extracted_text.split('\0')[0]
-            print(f"DEBUG: Returning unencrypted result: {result}")
+            logger.debug("Returning unencrypted result up to the terminator")
             return result
-        print(f"DEBUG: Returning full unencrypted text")
+        logger.debug("Returning full unencrypted text")
         return extracted_text
@@ -7,8 +7,15 @@ It handles user requests, processes form data, and returns responses.
 """
 
 import os
-from flask import Blueprint, render_template, request, jsonify
-from app.steganography import hide_message_in_image, extract_message_from_image, hide_message_in_audio, extract_message_from_audio, hide_message_in_text, extract_message_from_text
+import json
+import zipfile
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import Blueprint, render_template, request, jsonify, send_file
+from app.steganography import capacity, hide_message_in_image, hide_message_in_images, extract_message_from_image, hide_message_in_audio, extract_message_from_audio, hide_message_in_text, extract_message_from_text
+from app.file_manager import save_output_file, save_batch_uploads
+from app.payload import AUDIO_METHODS, TEXT_ALPHABETS
 
 # Create a Blueprint for the views
 views = Blueprint('views', __name__)
@@ -17,8 +24,29 @@ views = Blueprint('views', __name__)
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 ALLOWED_AUDIO_EXTENSIONS = {'wav', 'mp3', 'ogg'}
 
+# Worker processes for batch embedding, shared by all batch requests
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
 
 # Helper functions
+def batch_executor():
+    """
+    Get the process pool shared by every batch request, starting it on first use.
+
+    Concurrent requests queue their carriers on the same BATCH_WORKERS
+    processes instead of each starting a pool of their own.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool
+    """
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return _batch_executor
+
 def allowed_image_file(filename):
     """
     Check if the uploaded file is an allowed image type.
@@ -45,6 +73,31 @@ def allowed_audio_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_AUDIO_EXTENSIONS
 
 
+def wants_download():
+    """
+    Check if the client asked for the generated file itself instead of the result page.
+
+    Returns:
+        bool: True if the 'download' form field or query parameter is set
+    """
+    return request.values.get('download', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def bits_per_channel_arg():
+    """
+    Read the bits-per-channel setting from the form.
+
+    Returns:
+        int or str: 1 to 4, or 'auto'; None if the value is invalid
+    """
+    value = request.form.get('bits_per_channel', '1')
+    if value == 'auto':
+        return value
+    if value in ('1', '2', '3', '4'):
+        return int(value)
+    return None
+
+
 # Routes
 @views.route('/')
 def home():
@@ -64,7 +117,8 @@ def hide_image_message():
     Hide a message in an image.
 
     Returns:
-        JSON response with the path to the image with hidden message
+        The result page showing the image with hidden message, or the PNG
+        itself when a download is requested
     """
     try:
         # Check if the post request has the file part
@@ -75,6 +129,7 @@ def hide_image_message():
         image = request.files['image']
         message = request.form.get('message', '')
         password = request.form.get('password', None)
+        bits_per_channel = bits_per_channel_arg()
 
         # Validate input
         if image.filename == '':
@@ -86,13 +141,18 @@ def hide_image_message():
         if not allowed_image_file(image.filename):
             return jsonify({'error': 'File type not allowed'}), 400
 
-        # Create the static directory if it doesn't exist
-        os.makedirs('static', exist_ok=True)
+        if bits_per_channel is None:
+            return jsonify({'error': 'Bits per channel must be 1 to 4, or auto'}), 400
+
+        # Hide the message in the image (in memory)
+        hidden_image = hide_message_in_image(image, message, password, bits_per_channel=bits_per_channel)
 
-        # Hide the message in the image
-        hidden_image_path = hide_message_in_image(image, message, password)
+        # Stream the image straight back if requested
+        if wants_download():
+            return send_file(hidden_image, mimetype='image/png', as_attachment=True, download_name='hidden_image.png')
 
-        # Render the result template with the image
+        # Otherwise keep it under a unique name and render the result template with the image
+        hidden_image_path = save_output_file(hidden_image, 'image', 'png')
         return render_template('result.html', hidden_image=hidden_image_path)
     except Exception as e:
         # Log the error (in a production app)
@@ -102,6 +162,108 @@ def hide_image_message():
         return render_template('result.html', error=f"Failed to hide message in image: {str(e)}"), 500
 
 
+# Route for carrier capacity (How much a file can hide)
+@views.route('/capacity', methods=['POST'])
+def carrier_capacity():
+    """
+    Report how many message bytes a carrier can hold.
+
+    The carrier type comes from the 'type' form field ('image' or 'audio'),
+    or from the file extension when it is not given. Only the file header is
+    read, so this is cheap enough to call before every upload.
+
+    Returns:
+        JSON response with the carrier properties and the capacity for each
+        embedding setting
+    """
+    try:
+        # Check if the post request has the file part
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+
+        # Get form data
+        file = request.files['file']
+        mode = request.form.get('type', '')
+
+        # Validate input
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        if not mode:
+            if allowed_image_file(file.filename):
+                mode = 'image'
+            elif allowed_audio_file(file.filename):
+                mode = 'audio'
+            else:
+                return jsonify({'error': 'File type not allowed'}), 400
+
+        return jsonify(capacity(file, mode))
+    except Exception as e:
+        # Unreadable or unsupported files are a client error
+        return jsonify({'error': f"Failed to read carrier: {str(e)}"}), 400
+
+
+# Route for batch image steganography (Hide one message in many images)
+@views.route('/batch/hide_image', methods=['POST'])
+def batch_hide_image():
+    """
+    Hide the same message in a batch of images.
+
+    The images come as several 'images' files and/or 'archive' zip uploads.
+
+    Returns:
+        A zip with one PNG per image that succeeded and a results.json
+        manifest listing the output or error for every image
+    """
+    try:
+        # Get form data
+        files = request.files.getlist('images') + request.files.getlist('archive')
+        message = request.form.get('message', '')
+        password = request.form.get('password', None)
+        bits_per_channel = bits_per_channel_arg()
+
+        # Validate input
+        if not message:
+            return jsonify({'error': 'No message provided'}), 400
+
+        if bits_per_channel is None:
+            return jsonify({'error': 'Bits per channel must be 1 to 4, or auto'}), 400
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            uploads = save_batch_uploads(files, os.path.join(work_dir, 'uploads'))
+            if not uploads:
+                return jsonify({'error': 'No images provided'}), 400
+
+            # Hide the message in every image in parallel
+            results = hide_message_in_images(
+                [path for _, path in uploads], message, password, workers=BATCH_WORKERS,
+                output_dir=os.path.join(work_dir, 'output'), bits_per_channel=bits_per_channel,
+                executor=batch_executor()
+            )
+
+            # Pack the outputs (PNGs are already compressed) and the manifest into a zip
+            archive = tempfile.TemporaryFile()
+            manifest = []
+            with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+                for (name, path), result in zip(uploads, results):
+                    output_name = os.path.basename(result['output']) if result['output'] else None
+                    if output_name:
+                        zf.write(result['output'], output_name)
+                    # Errors name the saved copy; report the file as it was uploaded
+                    error = result['error'] and result['error'].replace(os.path.basename(path), name)
+                    manifest.append({'file': name, 'output': output_name, 'error': error})
+                zf.writestr('results.json', json.dumps(manifest, indent=2))
+
+        archive.seek(0)
+        return send_file(archive, mimetype='application/zip', as_attachment=True, download_name='hidden_images.zip')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        # Log the error (in a production app)
+        print(f"Batch image hiding error: {str(e)}")
+        return jsonify({'error': f"Failed to hide message in images: {str(e)}"}), 500
+
+
 @views.route('/extract_image_message', methods=['POST'])
 def extract_image_message():
     """
@@ -118,6 +280,8 @@ def extract_image_message():
         # Get form data
         image = request.files['image']
         password = request.form.get('password', None)
+        # Images hidden before the payload header are only searched on request
+        legacy = request.form.get('legacy', '').lower() in ('1', 'true', 'yes', 'on')
 
         # Validate input
         if image.filename == '':
@@ -128,7 +292,7 @@ def extract_image_message():
 
         # Extract the message from the image
         try:
-            hidden_message = extract_message_from_image(image, password)
+            hidden_message = extract_message_from_image(image, password, legacy=legacy)
 
             # Render the result template with the extracted message
             return render_template('result.html', hidden_message=hidden_message)
@@ -154,7 +318,8 @@ def hide_audio_message():
     Hide a message in an audio file.
 
     Returns:
-        JSON response with the path to the audio with hidden message
+        The result page with the audio with hidden message, or the WAV
+        itself when a download is requested
     """
     try:
         # Check if the post request has the file part
@@ -165,6 +330,7 @@ def hide_audio_message():
         audio = request.files['audio']
         message = request.form.get('message', '')
         password = request.form.get('password', None)
+        method = request.form.get('method', 'lsb')
 
         # Validate input
         if audio.filename == '':
@@ -176,13 +342,18 @@ def hide_audio_message():
         if not allowed_audio_file(audio.filename):
             return jsonify({'error': 'File type not allowed'}), 400
 
-        # Create the static directory if it doesn't exist
-        os.makedirs('static', exist_ok=True)
+        if method not in AUDIO_METHODS:
+            return jsonify({'error': f"Audio method must be one of: {', '.join(AUDIO_METHODS)}"}), 400
+
+        # Hide the message in the audio (in memory)
+        hidden_audio = hide_message_in_audio(audio, message, password, method=method)
 
-        # Hide the message in the audio
-        hidden_audio_path = hide_message_in_audio(audio, message, password)
+        # Stream the audio straight back if requested
+        if wants_download():
+            return send_file(hidden_audio, mimetype='audio/wav', as_attachment=True, download_name='hidden_audio.wav')
 
-        # Render the result template with the audio
+        # Otherwise keep it under a unique name and render the result template with the audio
+        hidden_audio_path = save_output_file(hidden_audio, 'audio', 'wav')
         return render_template('result.html', hidden_audio=hidden_audio_path)
     except Exception as e:
         # Log the error (in a production app)
@@ -251,13 +422,17 @@ def hide_text_message():
         message = request.form.get('message', '')
         cover_text = request.form.get('cover_text', None)
         password = request.form.get('password', None)
+        alphabet_size = request.form.get('alphabet', '4')
 
         # Validate input
         if not message:
             return jsonify({'error': 'No message provided'}), 400
 
+        if alphabet_size not in [str(size) for size in TEXT_ALPHABETS]:
+            return jsonify({'error': f"Alphabet size must be one of: {', '.join(map(str, TEXT_ALPHABETS))}"}), 400
+
         # Hide the message in text
-        hidden_text = hide_message_in_text(message, password, cover_text)
+        hidden_text = hide_message_in_text(message, password, cover_text, alphabet_size=int(alphabet_size))
 
         # Render the result template with the hidden text
         return render_template('result.html', hidden_text=hidden_text)
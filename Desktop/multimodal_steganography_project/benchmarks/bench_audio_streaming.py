@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# benchmarks/bench_audio_streaming.py
+"""
+Benchmark for block-streamed audio embedding.
+
+Writes a long 16-bit stereo WAV carrier to a temporary file a minute at a
+time, then hides and extracts a payload with the streaming engine,
+reporting wall time and peak resident memory. Run it once per duration:
+peak memory is per process.
+
+Usage:
+    python benchmarks/bench_audio_streaming.py [--minutes 60] [--payload 4096] [--block-frames 1048576]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.steganography import hide_message_in_audio, extract_message_from_audio
+
+SAMPLE_RATE = 48000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_carrier(path, minutes):
+    """Write a noisy stereo WAV of the requested duration without holding it in memory."""
+    rng = np.random.default_rng(minutes)
+    with sf.SoundFile(path, 'w', SAMPLE_RATE, 2, 'PCM_16', format='WAV') as f:
+        for _ in range(minutes):
+            f.write(rng.integers(-20000, 20000, (SAMPLE_RATE * 60, 2), dtype=np.int16))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--minutes', type=int, default=60, help='carrier duration in minutes')
+    parser.add_argument('--payload', type=int, default=4096, help='message size in characters')
+    parser.add_argument('--block-frames', type=int, default=1 << 20, help='frames per block')
+    parser.add_argument('--password', default='benchmark', help='password keying the sample order')
+    args = parser.parse_args()
+
+    message = 'x' * args.payload
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carrier = os.path.join(tmp, 'carrier.wav')
+        stego = os.path.join(tmp, 'stego.wav')
+        write_carrier(carrier, args.minutes)
+        print(f"carrier: {args.minutes} min stereo ({os.path.getsize(carrier) / 2**20:.0f} MiB WAV), "
+              f"baseline RSS {peak_rss_mb():.0f} MiB")
+
+        start = time.perf_counter()
+        with open(stego, 'wb') as out:
+            hide_message_in_audio(carrier, message, args.password, output=out, block_frames=args.block_frames)
+        print(f"hide:    {time.perf_counter() - start:7.2f} s, peak RSS {peak_rss_mb():.0f} MiB")
+
+        start = time.perf_counter()
+        assert extract_message_from_audio(stego, args.password, block_frames=args.block_frames) == message
+        print(f"extract: {time.perf_counter() - start:7.2f} s, peak RSS {peak_rss_mb():.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# benchmarks/bench_image_lsb.py
+"""
+Benchmark for the image LSB embedding engine.
+
+Compares the original per-pixel embedding loop (full coordinate list,
+seeded shuffle, tuple writes) with the vectorized engine used by
+hide_message_in_image (keyed permutation, one masked write).
+
+Usage:
+    python benchmarks/bench_image_lsb.py [--sizes 1 12 48] [--payload 4096] [--bits-per-channel 1]
+                                         [--no-legacy]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.steganography import _embed_bits_in_image
+
+
+def legacy_embed(img, message_bytes, password=None):
+    """The original tuple-list, per-pixel embedding loop (reference only)."""
+    width, height = img.size
+    img = img.copy()
+    pixels = img.load()
+
+    bin_message = ''.join(format(byte, '08b') for byte in message_bytes)
+
+    pixel_coords = []
+    for i in range(width):
+        for j in range(height):
+            pixel_coords.append((i, j))
+
+    seed = int(hashlib.md5((password or "default").encode()).hexdigest(), 16) % 10000000
+    random.seed(seed)
+    random.shuffle(pixel_coords)
+
+    data_index = 0
+    coord_index = 0
+    while data_index < len(bin_message) and coord_index < len(pixel_coords):
+        i, j = pixel_coords[coord_index]
+        pixel = list(pixels[i, j])
+        for k in range(3):
+            if data_index < len(bin_message):
+                pixel[k] = (pixel[k] & ~1) | int(bin_message[data_index])
+                data_index += 1
+        pixels[i, j] = tuple(pixel)
+        coord_index += 1
+
+    return img
+
+
+def make_carrier(megapixels):
+    """Create a random RGB image of roughly the requested size."""
+    side = int((megapixels * 1_000_000) ** 0.5)
+    rng = np.random.default_rng(megapixels)
+    return Image.fromarray(rng.integers(0, 256, (side, side, 3), dtype=np.uint8), "RGB")
+
+
+def timed(func, *args):
+    """Run func once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 12, 48], help='carrier sizes in megapixels')
+    parser.add_argument('--payload', type=int, default=4096, help='payload size in bytes')
+    parser.add_argument('--password', default='benchmark')
+    parser.add_argument('--bits-per-channel', type=int, default=1, choices=range(1, 5),
+                        help='LSBs per channel used by the vectorized engine')
+    parser.add_argument('--no-legacy', action='store_true', help='skip the original loop (it needs several GB at 48 MP)')
+    args = parser.parse_args()
+
+    payload = os.urandom(args.payload)
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+
+    print(f"{'MP':>4} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for megapixels in args.sizes:
+        img = make_carrier(megapixels)
+        _, fast_time = timed(_embed_bits_in_image, img, bits, args.password, args.bits_per_channel)
+
+        if args.no_legacy:
+            print(f"{megapixels:>4} {'-':>12} {fast_time:>15.3f} {'-':>9}")
+            continue
+
+        _, slow_time = timed(legacy_embed, img, payload, args.password)
+        print(f"{megapixels:>4} {slow_time:>12.3f} {fast_time:>15.3f} {slow_time / fast_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
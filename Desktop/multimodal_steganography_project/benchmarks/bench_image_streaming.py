@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# benchmarks/bench_image_streaming.py
+"""
+Benchmark for strip-streamed image embedding.
+
+Writes a large PNG carrier to a temporary file strip by strip, then hides
+and extracts a payload with the streaming engine, reporting wall time and
+peak resident memory. Run it once per size: peak memory is per process.
+
+Usage:
+    python benchmarks/bench_image_streaming.py [--megapixels 100] [--payload 4096] [--strip-budget 16]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.png_stream import PngStripWriter
+from app.steganography import hide_message_in_image, extract_message_from_image
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_carrier(path, megapixels, strip_rows=256):
+    """Write a noisy RGB PNG of roughly the requested size without holding it in memory."""
+    side = int((megapixels * 1_000_000) ** 0.5)
+    rng = np.random.default_rng(megapixels)
+    with open(path, 'wb') as f:
+        writer = PngStripWriter(f, side, side)
+        for row in range(0, side, strip_rows):
+            writer.write(rng.integers(0, 256, (min(strip_rows, side - row), side, 3), dtype=np.uint8))
+        writer.close()
+    return side
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megapixels', type=int, default=100, help='carrier size in megapixels')
+    parser.add_argument('--payload', type=int, default=4096, help='message size in characters')
+    parser.add_argument('--strip-budget', type=int, default=16, help='strip budget in MiB')
+    args = parser.parse_args()
+
+    message = 'x' * args.payload
+    budget = args.strip_budget * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        carrier = os.path.join(tmp, 'carrier.png')
+        stego = os.path.join(tmp, 'stego.png')
+        side = write_carrier(carrier, args.megapixels)
+        print(f"carrier: {side}x{side} ({os.path.getsize(carrier) / 2**20:.0f} MiB PNG), "
+              f"raster {side * side * 3 / 2**20:.0f} MiB, baseline RSS {peak_rss_mb():.0f} MiB")
+
+        start = time.perf_counter()
+        with open(stego, 'wb') as out:
+            hide_message_in_image(carrier, message, output=out, strip_budget=budget)
+        print(f"hide:    {time.perf_counter() - start:7.2f} s, peak RSS {peak_rss_mb():.0f} MiB")
+
+        start = time.perf_counter()
+        assert extract_message_from_image(stego, strip_budget=budget) == message
+        print(f"extract: {time.perf_counter() - start:7.2f} s, peak RSS {peak_rss_mb():.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# benchmarks/bench_text_codec.py
+"""
+Benchmark for the zero-width text codec.
+
+Compares the original per-bit encoder and per-character decoder (binary
+strings built with +=, one int() per byte) with the table-driven codec used
+by hide_message_in_text and extract_message_from_text, then times the
+codec and counts the inserted characters for each alphabet size.
+
+Usage:
+    python benchmarks/bench_text_codec.py [--sizes 1024 1048576 52428800] [--legacy-max 65536]
+                                          [--alphabets 4 8 16 256]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.text_codec import encode_zero_width, decode_zero_width, zero_width_symbols, ZERO_WIDTH_CODECS
+
+LEGACY_CHARS = {'00': '\u200B', '01': '\u200C', '10': '\u200D', '11': '\u2060'}
+LEGACY_BITS = {char: bits for bits, char in LEGACY_CHARS.items()}
+
+
+def legacy_encode(data, cover_text):
+    """The original bit-string encoder (reference only)."""
+    binary_message = ''.join(format(byte, '08b') for byte in data)
+    output_text = cover_text[:len(cover_text)//2]
+    for i in range(0, len(binary_message), 2):
+        output_text += LEGACY_CHARS[binary_message[i:i+2]]
+    return output_text + cover_text[len(cover_text)//2:]
+
+
+def legacy_decode(text):
+    """The original per-character decoder (reference only)."""
+    binary = ''
+    for char in text:
+        if char in LEGACY_BITS:
+            binary += LEGACY_BITS[char]
+    return bytes(int(binary[i:i+8], 2) for i in range(0, len(binary) - 7, 8))
+
+
+def codec_encode(data, cover_text):
+    """The table-driven encoder, placed in the cover text as hide_message_in_text does."""
+    middle = len(cover_text) // 2
+    return ''.join((cover_text[:middle], encode_zero_width(data), cover_text[middle:]))
+
+
+def codec_decode(text):
+    """The single-pass decoder."""
+    return decode_zero_width(zero_width_symbols(text))
+
+
+def timed(func, *args):
+    """Run func once and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 1 << 20, 50 << 20],
+                        help='payload sizes in bytes')
+    parser.add_argument('--legacy-max', type=int, default=1 << 16,
+                        help='largest payload to run the original loops on (the decoder is quadratic)')
+    parser.add_argument('--alphabets', type=int, nargs='+', default=[4, 8, 16, 256], choices=sorted(ZERO_WIDTH_CODECS),
+                        help='alphabet sizes to compare')
+    args = parser.parse_args()
+
+    cover_text = "This is a normal looking text. " * 4
+
+    print(f"{'bytes':>10} {'legacy enc (s)':>15} {'enc (s)':>9} {'legacy dec (s)':>15} {'dec (s)':>9}")
+    for size in args.sizes:
+        data = os.urandom(size)
+        text, encode_time = timed(codec_encode, data, cover_text)
+        decoded, decode_time = timed(codec_decode, text)
+        assert decoded == data
+
+        if size > args.legacy_max:
+            print(f"{size:>10} {'-':>15} {encode_time:>9.3f} {'-':>15} {decode_time:>9.3f}")
+            continue
+
+        legacy_text, legacy_encode_time = timed(legacy_encode, data, cover_text)
+        legacy_decoded, legacy_decode_time = timed(legacy_decode, text)
+        assert legacy_text == text and legacy_decoded == data
+        print(f"{size:>10} {legacy_encode_time:>15.3f} {encode_time:>9.3f} "
+              f"{legacy_decode_time:>15.3f} {decode_time:>9.3f}")
+
+    print(f"\n{'bytes':>10} {'alphabet':>9} {'characters':>12} {'enc (s)':>9} {'dec (s)':>9}")
+    for size in args.sizes:
+        data = os.urandom(size)
+        for alphabet_size in args.alphabets:
+            codec = ZERO_WIDTH_CODECS[alphabet_size]
+            symbols, encode_time = timed(codec.encode, data)
+            decoded, decode_time = timed(lambda text: codec.decode(codec.symbols(text)), symbols)
+            assert decoded == data
+            print(f"{size:>10} {alphabet_size:>9} {len(symbols):>12} {encode_time:>9.3f} {decode_time:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
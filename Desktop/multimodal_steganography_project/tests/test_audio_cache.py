@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# tests/test_audio_cache.py
+"""
+Test module for the decoded audio cache.
+
+This module contains tests for storing, memory-mapping and evicting decoded
+audio, and for the cache being used by compressed audio carriers.
+"""
+
+import unittest
+import os
+import sys
+import io
+import time
+import tempfile
+import threading
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import steganography
+from app.audio_cache import DecodedAudioCache
+
+class TestDecodedAudioCache(unittest.TestCase):
+    """Test cases for the decoded audio cache."""
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.rng = np.random.default_rng(0)
+
+    def samples(self, frames=1000):
+        """Make some 16-bit stereo samples."""
+        return self.rng.integers(-32768, 32767, (frames, 2), dtype=np.int16)
+
+    def test_round_trip_is_memory_mapped(self):
+        """Test that a stored entry comes back as a writable copy-on-write map."""
+        cache = DecodedAudioCache(self.directory.name)
+        samples = self.samples()
+        digest = cache.digest(io.BytesIO(b'encoded carrier'))
+
+        self.assertIsNone(cache.get(digest))
+        cache.put(digest, samples, 44100)
+        cached, samplerate = cache.get(digest)
+
+        self.assertIsInstance(cached, np.memmap)
+        self.assertEqual(44100, samplerate)
+        np.testing.assert_array_equal(samples, cached)
+        cached[0, 0] += 1  # Changes the mapping only
+        np.testing.assert_array_equal(samples, cache.get(digest)[0])
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
+
+    def test_least_recently_used_evicted(self):
+        """Test that entries over the size cap are evicted oldest first, counting hits as use."""
+        entry_size = self.samples().nbytes + 128  # .npy header
+        cache = DecodedAudioCache(self.directory.name, max_bytes=entry_size * 2)
+
+        cache.put('a', self.samples(), 8000)
+        cache.put('b', self.samples(), 8000)
+        past = time.time() - 60
+        for digest, age in [('a', 20), ('b', 10)]:
+            os.utime(os.path.join(self.directory.name, f"{digest}_8000.npy"), (past - age, past - age))
+        cache.get('a')  # 'b' is now the least recently used
+        cache.put('c', self.samples(), 8000)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_counters_shared_by_threads(self):
+        """Test that lookups from several threads are all counted."""
+        cache = DecodedAudioCache(self.directory.name)
+        cache.put('a', self.samples(), 8000)
+
+        def look_up():
+            for _ in range(200):
+                cache.get('a')
+                cache.get('missing')
+
+        threads = [threading.Thread(target=look_up) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual((800, 800), (cache.hits, cache.misses))
+
+    def test_compressed_carrier_decoded_once(self):
+        """Test that hiding in the same compressed cover twice decodes it only once."""
+        cache = DecodedAudioCache(self.directory.name)
+        original = steganography.audio_cache
+        steganography.audio_cache = cache
+        self.addCleanup(setattr, steganography, 'audio_cache', original)
+
+        carrier = io.BytesIO()
+        sf.write(carrier, self.rng.uniform(-0.3, 0.3, (8000, 2)), 8000, format='OGG', subtype='VORBIS')
+        for _ in range(2):
+            carrier.seek(0)
+            hidden_audio = steganography.hide_message_in_audio(carrier, "Cached cover")
+            self.assertEqual("Cached cover", steganography.extract_message_from_audio(hidden_audio))
+
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+if __name__ == '__main__':
+    unittest.main()
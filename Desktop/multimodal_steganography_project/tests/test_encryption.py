@@ -13,7 +13,10 @@ import sys
 # Add the parent directory to the path so we can import the app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.encryption import encrypt_message, decrypt_message, generate_key, save_key, load_key
+from app.encryption import (
+    encrypt_message, decrypt_message, generate_key, save_key, load_key,
+    derive_key_from_password, key_cache, DerivedKeyCache
+)
 
 class TestEncryption(unittest.TestCase):
     """Test cases for the encryption module."""
@@ -123,5 +126,64 @@ class TestEncryption(unittest.TestCase):
         with self.assertRaises(Exception):
             decrypt_message(encrypted, mode=AES.MODE_EAX)
 
+class TestDerivedKeyCache(unittest.TestCase):
+    """Test cases for the derived-key cache."""
+
+    def setUp(self):
+        """Start every test with an empty shared cache."""
+        key_cache.clear()
+
+    def tearDown(self):
+        """Leave the shared cache empty for other tests."""
+        key_cache.clear()
+
+    def test_repeat_derivation_hits_cache(self):
+        """Test that deriving the same key twice runs the KDF once."""
+        derived_key, salt = derive_key_from_password("test_password", iterations=1000)
+        again, _ = derive_key_from_password("test_password", salt, iterations=1000)
+        other, _ = derive_key_from_password("other_password", salt, iterations=1000)
+
+        self.assertEqual(derived_key, again)
+        self.assertNotEqual(derived_key, other)
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 2}, key_cache.stats())
+
+    def test_encrypt_decrypt_round_trip_reuses_key(self):
+        """Test that decrypting a freshly encrypted message skips the KDF."""
+        encrypted = encrypt_message("Cached message", password="test_password", iterations=1000)
+        decrypted = decrypt_message(encrypted, password="test_password", iterations=1000)
+
+        self.assertEqual("Cached message", decrypted)
+        self.assertEqual(1, key_cache.stats()['hits'])
+
+    def test_decryption_logs_no_contents(self):
+        """Test that decryption logs at debug level without the message or password."""
+        encrypted = encrypt_message("Logged message", password="test_password", iterations=1000)
+        with self.assertLogs('app.encryption', level='DEBUG') as logs:
+            decrypt_message(encrypted, password="test_password", iterations=1000)
+
+        output = '\n'.join(logs.output)
+        self.assertNotIn("Logged message", output)
+        self.assertNotIn("test_password", output)
+
+    def test_lru_eviction_zeroizes_keys(self):
+        """Test that the least recently used key is evicted and wiped."""
+        cache = DerivedKeyCache(max_size=2, ttl=60)
+        cache.put("a", b'salt', 1000, b'A' * 32)
+        stored = next(iter(cache._entries.values()))[0]
+        cache.put("b", b'salt', 1000, b'B' * 32)
+        cache.put("c", b'salt', 1000, b'C' * 32)
+
+        self.assertIsNone(cache.get("a", b'salt', 1000))
+        self.assertEqual(b'C' * 32, cache.get("c", b'salt', 1000))
+        self.assertEqual(bytes(32), bytes(stored))
+
+    def test_expired_keys_are_dropped(self):
+        """Test that keys older than the TTL are not served."""
+        cache = DerivedKeyCache(max_size=4, ttl=0)
+        cache.put("a", b'salt', 1000, b'A' * 32)
+
+        self.assertIsNone(cache.get("a", b'salt', 1000))
+        self.assertEqual({'hits': 0, 'misses': 1, 'size': 0}, cache.stats())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# tests/test_import_time.py
+"""
+Test module for application start-up cost.
+
+This module checks that importing the views, and serving image and text
+requests, stays within a cold-start budget and never loads librosa.
+"""
+
+import unittest
+import os
+import sys
+import subprocess
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Seconds a fresh interpreter may spend importing app.views (about 0.4 s on a laptop)
+IMPORT_TIME_BUDGET = 2.0
+
+# Heavy audio dependencies that only the librosa fallback decoder needs
+HEAVY_MODULES = ('librosa', 'numba', 'scipy', 'sklearn')
+
+def run_fresh(code):
+    """Run code in a fresh interpreter from the project directory and return its stdout lines."""
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.strip().splitlines()
+
+class TestImportTime(unittest.TestCase):
+    """Test cases for the cold-start import budget."""
+
+    def test_views_import_within_budget(self):
+        """Test that importing the views is fast and loads no heavy audio module."""
+        lines = run_fresh(
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import app.views\n"
+            "print(time.perf_counter() - start)\n"
+            f"print(sorted(set({HEAVY_MODULES!r}) & set(sys.modules)))\n"
+        )
+
+        self.assertLess(float(lines[-2]), IMPORT_TIME_BUDGET)
+        self.assertEqual('[]', lines[-1])
+
+    def test_image_and_text_never_import_librosa(self):
+        """Test that hiding and extracting in images and text leaves librosa unloaded."""
+        lines = run_fresh(
+            "import io, sys\n"
+            "from PIL import Image\n"
+            "from app.steganography import (hide_message_in_image, extract_message_from_image,\n"
+            "                               hide_message_in_text, extract_message_from_text)\n"
+            "carrier = io.BytesIO()\n"
+            "Image.new('RGB', (50, 50)).save(carrier, format='PNG')\n"
+            "carrier.seek(0)\n"
+            "assert extract_message_from_image(hide_message_in_image(carrier, 'image')) == 'image'\n"
+            "assert extract_message_from_text(hide_message_in_text('text')) == 'text'\n"
+            "print('librosa' in sys.modules)\n"
+        )
+
+        self.assertEqual('False', lines[-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# tests/test_payload.py
+"""
+Test module for the payload header.
+
+This module contains tests for building and parsing payload headers.
+"""
+
+import unittest
+import os
+import sys
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.payload import build_header, parse_header, header_size_from_prefix, HEADER_SIZE, HEADER_VERSION
+
+class TestPayloadHeader(unittest.TestCase):
+    """Test cases for the payload header."""
+
+    def test_header_round_trip(self):
+        """Test that a built header parses back to the same fields."""
+        data = build_header(1234, encrypted=True, kdf_iterations=1000000) + b'payload'
+
+        header = parse_header(data)
+
+        self.assertEqual(HEADER_SIZE, header_size_from_prefix(data))
+        self.assertEqual(HEADER_VERSION, header.version)
+        self.assertTrue(header.encrypted)
+        self.assertEqual(1234, header.payload_length)
+        self.assertEqual(1000000, header.kdf_iterations)
+
+    def test_unencrypted_header(self):
+        """Test that an unencrypted header has no KDF parameters."""
+        header = parse_header(build_header(5))
+
+        self.assertFalse(header.encrypted)
+        self.assertEqual(0, header.kdf_iterations)
+
+    def test_bits_per_channel(self):
+        """Test that the bits-per-channel setting is recorded, and defaults to 1."""
+        self.assertEqual(3, parse_header(build_header(5, bits_per_channel=3)).bits_per_channel)
+        self.assertEqual(1, parse_header(build_header(5)).bits_per_channel)
+
+    def test_image_layout(self):
+        """Test that the image band layout is recorded, and defaults to RGB."""
+        self.assertEqual('I;16', parse_header(build_header(5, image_layout='I;16')).image_layout)
+        self.assertEqual('RGB', parse_header(build_header(5)).image_layout)
+
+    def test_audio_method(self):
+        """Test that the audio engine is recorded, and defaults to LSB."""
+        self.assertEqual('echo', parse_header(build_header(5, audio_method='echo')).audio_method)
+        self.assertEqual('phase', parse_header(build_header(5, audio_method='phase')).audio_method)
+        self.assertEqual('lsb', parse_header(build_header(5)).audio_method)
+
+    def test_text_alphabet(self):
+        """Test that the text alphabet size is recorded, and defaults to 4 symbols."""
+        self.assertEqual(256, parse_header(build_header(5, text_alphabet=256)).text_alphabet)
+        self.assertEqual(4, parse_header(build_header(5)).text_alphabet)
+
+    def test_unknown_version(self):
+        """Test that a header with another version is not parsed."""
+        data = bytearray(build_header(5))
+        data[4] = 2
+        self.assertIsNone(parse_header(bytes(data)))
+        self.assertIsNone(header_size_from_prefix(bytes(data)))
+
+    def test_binary_text_flag(self):
+        """Test that the binary text flag is independent of the encrypted flag."""
+        header = parse_header(build_header(5, encrypted=True, kdf_iterations=10, binary_text=True))
+        self.assertTrue(header.encrypted)
+        self.assertTrue(header.binary_text)
+        self.assertFalse(parse_header(build_header(5, encrypted=True, kdf_iterations=10)).binary_text)
+
+    def test_data_without_header(self):
+        """Test that data without the magic is not mistaken for a header."""
+        self.assertIsNone(parse_header(b'This is a secret message\0'))
+        self.assertIsNone(parse_header(build_header(5)[:HEADER_SIZE - 1]))
+        self.assertIsNone(header_size_from_prefix(b'ST'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# tests/test_permutation.py
+"""
+Test module for the keyed permutation.
+
+This module contains tests for the lazy pseudo-random permutation used to pick carrier positions.
+"""
+
+import unittest
+import os
+import sys
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.permutation import KeyedPermutation
+
+class TestKeyedPermutation(unittest.TestCase):
+    """Test cases for the keyed permutation."""
+
+    def test_is_permutation(self):
+        """Test that every index appears exactly once for awkward domain sizes."""
+        for size in [1, 2, 3, 17, 100, 1000, 4097]:
+            indices = KeyedPermutation.from_password(size, "test_password").first(size)
+            self.assertEqual(list(range(size)), sorted(indices.tolist()))
+
+    def test_lazy_access_matches_batch(self):
+        """Test that single lookups and batches agree."""
+        permutation = KeyedPermutation.from_password(10 ** 9, "test_password")
+        batch = permutation.take(5, 15)
+
+        self.assertEqual([permutation[k] for k in range(5, 15)], batch.tolist())
+        self.assertTrue(all(0 <= index < 10 ** 9 for index in batch))
+
+    def test_key_selects_permutation(self):
+        """Test that the permutation is deterministic per key and differs between keys."""
+        first = KeyedPermutation.from_password(5000, "test_password").first(50)
+        again = KeyedPermutation.from_password(5000, "test_password").first(50)
+        other = KeyedPermutation.from_password(5000, "wrong_password").first(50)
+        default = KeyedPermutation.from_password(5000).first(50)
+
+        self.assertEqual(first.tolist(), again.tolist())
+        self.assertNotEqual(first.tolist(), other.tolist())
+        self.assertNotEqual(first.tolist(), default.tolist())
+
+    def test_out_of_range(self):
+        """Test that positions outside the domain are rejected or clipped."""
+        permutation = KeyedPermutation.from_password(10)
+
+        with self.assertRaises(IndexError):
+            permutation[10]
+        self.assertEqual(10, len(permutation.take(0, 50)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# tests/test_png_stream.py
+"""
+Test module for the streaming PNG reader and writer.
+
+This module contains tests for decoding and encoding PNG rasters one strip at a time.
+"""
+
+import unittest
+import os
+import sys
+import io
+import struct
+import zlib
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.png_stream import PngStripReader, PngStripWriter
+
+class TestPngStream(unittest.TestCase):
+    """Test cases for the streaming PNG reader and writer."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        # A gradient with noise, so the encoder picks a mix of row filters
+        y, x = np.mgrid[0:37, 0:53]
+        gradient = ((x * 3 + y * 5) % 256).astype(np.uint8)
+        noise = np.random.default_rng(0).integers(0, 256, gradient.shape, dtype=np.uint8)
+        rgb = np.dstack([gradient, gradient // 2, noise])
+
+        self.test_images = {
+            'RGB': Image.fromarray(rgb, 'RGB'),
+            'RGBA': Image.fromarray(np.dstack([rgb, gradient]), 'RGBA'),
+            'L': Image.fromarray(gradient, 'L'),
+            'LA': Image.fromarray(np.dstack([gradient, noise]), 'LA'),
+            'P': Image.fromarray(rgb, 'RGB').convert('P'),
+        }
+
+    def test_strips_match_full_decode(self):
+        """Test that strips of any height reassemble the RGB raster PIL decodes."""
+        for mode, image in self.test_images.items():
+            data = io.BytesIO()
+            image.save(data, format='PNG')
+            data.seek(0)
+            expected = np.array(image.convert('RGB'))
+
+            reader = PngStripReader(data)
+            for rows in [1, 4, 36, 100]:
+                strips = list(reader.strips(rows))
+                self.assertEqual(0, strips[0][0])
+                self.assertTrue(np.array_equal(expected, np.concatenate([strip for _, strip in strips])), mode)
+
+    def test_writer_round_trip(self):
+        """Test that strips written by the writer decode to the same raster."""
+        expected = np.array(self.test_images['RGB'])
+        output = io.BytesIO()
+
+        writer = PngStripWriter(output, 53, 37)
+        for row in range(0, 37, 5):
+            writer.write(expected[row:row + 5])
+        writer.close()
+
+        output.seek(0)
+        self.assertTrue(np.array_equal(expected, np.array(Image.open(output))))
+
+    def test_unsupported_png(self):
+        """Test that interlaced and non-PNG files are rejected."""
+        data = io.BytesIO()
+        self.test_images['RGB'].save(data, format='PNG')
+
+        # Set the IHDR interlace method (the last of its 13 bytes) and fix up the CRC
+        png = bytearray(data.getvalue())
+        png[28] = 1
+        png[29:33] = struct.pack('>I', zlib.crc32(bytes(png[12:29])))
+
+        with self.assertRaises(ValueError):
+            PngStripReader(io.BytesIO(bytes(png)))
+        with self.assertRaises(ValueError):
+            PngStripReader(io.BytesIO(b'GIF89a'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,28 +7,40 @@ This module contains tests for the steganography functions for different media t
 """
 
 import unittest
+from unittest import mock
 import os
 import sys
 import io
+import random
+import hashlib
+import tempfile
 import numpy as np
+import soundfile as sf
 from PIL import Image
 
 # Add the parent directory to the path so we can import the app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.steganography import (
-    hide_message_in_image, extract_message_from_image,
-    hide_message_in_text, extract_message_from_text
+    hide_message_in_image, hide_message_in_images, extract_message_from_image,
+    hide_message_in_audio, extract_message_from_audio, register_audio_decoder, AUDIO_DECODERS,
+    hide_message_in_text, extract_message_from_text, hide_message_in_text_file, extract_message_from_text_file,
+    capacity, plan_bits_per_channel, _embed_bits_in_image
 )
+from app.permutation import KeyedPermutation
+from app.audio_echo import echo_frames_needed
+from app.audio_phase import PHASE_FRAME_LENGTH
+from app.audio_cache import DecodedAudioCache
+from app.text_codec import encode_zero_width, decode_zero_width, zero_width_symbols
+from app.payload import build_header, parse_header, HEADER_SIZE
+from app.encryption import encrypt_message
+from app import steganography
 
 class TestImageSteganography(unittest.TestCase):
     """Test cases for image steganography."""
     
     def setUp(self):
         """Set up the test environment."""
-        # Create a test directory
-        os.makedirs('static', exist_ok=True)
-        
         # Create a test image
         self.test_image = Image.new('RGB', (100, 100), color='white')
         self.test_image_file = io.BytesIO()
@@ -45,13 +57,6 @@ class TestImageSteganography(unittest.TestCase):
         # Test password
         self.test_password = "test_password"
     
-    def tearDown(self):
-        """Clean up after the tests."""
-        # Remove test files
-        for file in os.listdir('static'):
-            if file.startswith('hidden_image'):
-                os.remove(os.path.join('static', file))
-    
     def test_image_steganography_without_password(self):
         """Test image steganography without password."""
         for message in self.test_messages:
@@ -59,14 +64,13 @@ class TestImageSteganography(unittest.TestCase):
             self.test_image_file.seek(0)
             
             # Hide the message in the image
-            hidden_image_path = hide_message_in_image(self.test_image_file, message)
+            hidden_image = hide_message_in_image(self.test_image_file, message)
             
-            # Check that the hidden image file exists
-            self.assertTrue(os.path.exists(hidden_image_path))
+            # Check that the hidden image is a PNG in memory
+            self.assertEqual(b'\x89PNG', hidden_image.getvalue()[:4])
             
             # Extract the message from the image
-            with open(hidden_image_path, 'rb') as f:
-                extracted_message = extract_message_from_image(f)
+            extracted_message = extract_message_from_image(hidden_image)
             
             # Check that the extracted message matches the original
             self.assertEqual(message, extracted_message)
@@ -78,24 +82,381 @@ class TestImageSteganography(unittest.TestCase):
             self.test_image_file.seek(0)
             
             # Hide the message in the image with a password
-            hidden_image_path = hide_message_in_image(self.test_image_file, message, self.test_password)
+            hidden_image = hide_message_in_image(self.test_image_file, message, self.test_password)
             
-            # Check that the hidden image file exists
-            self.assertTrue(os.path.exists(hidden_image_path))
+            # Check that the hidden image is a PNG in memory
+            self.assertEqual(b'\x89PNG', hidden_image.getvalue()[:4])
             
             # Extract the message from the image with the correct password
-            with open(hidden_image_path, 'rb') as f:
-                extracted_message = extract_message_from_image(f, self.test_password)
+            extracted_message = extract_message_from_image(io.BytesIO(hidden_image.getvalue()), self.test_password)
             
             # Check that the extracted message matches the original
             self.assertEqual(message, extracted_message)
             
-            # Try to extract the message with the wrong password
-            with open(hidden_image_path, 'rb') as f:
-                extracted_message = extract_message_from_image(f, "wrong_password")
-            
-            # Check that the extracted message does not match the original
-            self.assertNotEqual(message, extracted_message)
+            # Extracting with the wrong password is refused
+            with self.assertRaises(ValueError):
+                extract_message_from_image(io.BytesIO(hidden_image.getvalue()), "wrong_password")
+
+    def test_vectorized_embedding_matches_channel_loop(self):
+        """Test that the vectorized engine writes the same pixels as a per-channel loop."""
+        rng = np.random.default_rng(0)
+        image = Image.fromarray(rng.integers(0, 256, (17, 23, 3), dtype=np.uint8), 'RGB')
+        payload = b'vectorized'
+        bin_message = ''.join(format(byte, '08b') for byte in payload)
+
+        # Reference: walk the keyed channel order one bit at a time
+        expected = np.array(image).reshape(-1)
+        order = KeyedPermutation.from_password(expected.size, self.test_password)
+        for index, bit in enumerate(bin_message):
+            expected[order[index]] = (expected[order[index]] & ~1) | int(bit)
+
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+        result = _embed_bits_in_image(image, bits, self.test_password)
+
+        self.assertEqual(expected.tobytes(), result.tobytes())
+
+    def test_hide_writes_to_caller_file(self):
+        """Test that the stego image can be written to a caller-supplied file object."""
+        output = io.BytesIO()
+
+        result = hide_message_in_image(self.test_image_file, "A short message", output=output)
+
+        self.assertIs(output, result)
+        output.seek(0)
+        self.assertEqual("A short message", extract_message_from_image(output))
+
+    def test_legacy_image_without_header(self):
+        """Test that images written before the payload header still extract, with and without a password."""
+        def legacy_carrier(message_bytes, password=None):
+            # The original writer: a seeded shuffle of every (x, y), three channel LSBs per pixel
+            img = Image.new('RGB', (40, 30), color='white')
+            pixels = img.load()
+            coords = [(i, j) for i in range(40) for j in range(30)]
+            random.seed(int(hashlib.md5((password or "default").encode()).hexdigest(), 16) % 10000000)
+            random.shuffle(coords)
+            bits = ''.join(format(byte, '08b') for byte in message_bytes)
+            for index, (i, j) in enumerate(coords[:-(-len(bits) // 3)]):
+                pixel = list(pixels[i, j])
+                for k, bit in enumerate(bits[index * 3:index * 3 + 3]):
+                    pixel[k] = (pixel[k] & ~1) | int(bit)
+                pixels[i, j] = tuple(pixel)
+            carrier = io.BytesIO()
+            img.save(carrier, format='PNG')
+            carrier.seek(0)
+            return carrier
+
+        message = self.test_messages[1]
+        self.assertEqual(message, extract_message_from_image(legacy_carrier((message + '\0').encode()), legacy=True))
+
+        carrier = legacy_carrier(encrypt_message(message + '\0', password=self.test_password), self.test_password)
+        self.assertEqual(message, extract_message_from_image(carrier, self.test_password, legacy=True))
+        carrier.seek(0)
+        with self.assertRaises(ValueError):
+            extract_message_from_image(carrier, "wrong_password", legacy=True)
+
+        # The legacy reader is opt-in, capped by size, and needs a terminator without a password
+        carrier.seek(0)
+        with self.assertRaises(ValueError):
+            extract_message_from_image(carrier, self.test_password)
+        carrier.seek(0)
+        with mock.patch.object(steganography, 'LEGACY_IMAGE_MAX_PIXELS', 40 * 30 - 1), self.assertRaises(ValueError):
+            extract_message_from_image(carrier, self.test_password, legacy=True)
+        with self.assertRaises(ValueError):
+            extract_message_from_image(legacy_carrier(message.encode()), legacy=True)
+
+    def test_multi_bit_embedding(self):
+        """Test that every bits-per-channel setting round-trips and is read from the header."""
+        rng = np.random.default_rng(1)
+        carrier = io.BytesIO()
+        Image.fromarray(rng.integers(0, 256, (40, 40, 3), dtype=np.uint8), 'RGB').save(carrier, format='PNG')
+        message = "Multi-bit message " * 20
+
+        for bits_per_channel in range(1, 5):
+            carrier.seek(0)
+            hidden_image = hide_message_in_image(carrier, message, bits_per_channel=bits_per_channel)
+            self.assertEqual(message, extract_message_from_image(hidden_image))
+
+    def test_auto_bits_per_channel(self):
+        """Test that the planner picks the smallest setting that fits the payload."""
+        # 100x100 RGB holds 30000 channels, 144 of which carry the header
+        self.assertEqual(1, plan_bits_per_channel(3000, 100, 100))
+        self.assertEqual(2, plan_bits_per_channel(4000, 100, 100))
+        self.assertEqual(4, plan_bits_per_channel(14000, 100, 100))
+        with self.assertRaises(ValueError):
+            plan_bits_per_channel(15000, 100, 100)
+
+        # 'auto' picks 2 bits for a message that is too big for 1 bit per channel
+        hidden_image = hide_message_in_image(self.test_image_file, "x" * 4000, bits_per_channel='auto')
+        self.assertEqual("x" * 4000, extract_message_from_image(hidden_image))
+
+        with self.assertRaises(ValueError):
+            hide_message_in_image(self.test_image_file, "x" * 4000, bits_per_channel=1)
+
+    def test_strip_streaming_matches_in_memory(self):
+        """Test that strip-streamed embedding writes the same pixels and extracts."""
+        rng = np.random.default_rng(2)
+        carrier = io.BytesIO()
+        Image.fromarray(rng.integers(0, 256, (64, 48, 3), dtype=np.uint8), 'RGB').save(carrier, format='PNG')
+        message = "Streamed message " * 10
+
+        for bits_per_channel in [1, 3]:
+            carrier.seek(0)
+            in_memory = hide_message_in_image(carrier, message, bits_per_channel=bits_per_channel)
+            carrier.seek(0)
+            streamed = hide_message_in_image(carrier, message, bits_per_channel=bits_per_channel, strip_budget=1000)
+
+            self.assertEqual(np.array(Image.open(in_memory)).tobytes(), np.array(Image.open(streamed)).tobytes())
+            streamed.seek(0)
+            self.assertEqual(message, extract_message_from_image(streamed, strip_budget=1000))
+
+        # A streamed carrier without a header for the password is reported, not decoded whole
+        streamed.seek(0)
+        with mock.patch.object(steganography, '_extract_legacy_message_from_image', side_effect=AssertionError):
+            with self.assertRaisesRegex(ValueError, "password"):
+                extract_message_from_image(streamed, self.test_password, strip_budget=1000)
+
+    def test_native_band_layouts(self):
+        """Test that grayscale, alpha and 16-bit carriers keep their mode and alpha band."""
+        rng = np.random.default_rng(3)
+        carriers = {
+            'L': Image.fromarray(rng.integers(0, 256, (40, 30), dtype=np.uint8), 'L'),
+            'LA': Image.fromarray(rng.integers(0, 256, (40, 30, 2), dtype=np.uint8), 'LA'),
+            'RGBA': Image.fromarray(rng.integers(0, 256, (40, 30, 4), dtype=np.uint8), 'RGBA'),
+            'I;16': Image.fromarray(rng.integers(0, 65536, (40, 30), dtype=np.uint16)),
+        }
+        message = "Native layout message"
+
+        for mode, carrier in carriers.items():
+            carrier_file = io.BytesIO()
+            carrier.save(carrier_file, format='PNG')
+            carrier_file.seek(0)
+
+            hidden_image = hide_message_in_image(carrier_file, message, bits_per_channel=2)
+            stego = Image.open(io.BytesIO(hidden_image.getvalue()))
+
+            self.assertEqual(mode, stego.mode)
+            difference = np.abs(np.array(stego).astype(np.int64) - np.array(carrier).astype(np.int64))
+            self.assertLess(difference.max(), 4)
+            if mode in ('LA', 'RGBA'):
+                self.assertEqual(0, difference[..., -1].max())
+            self.assertEqual(message, extract_message_from_image(hidden_image))
+
+    def test_batch_hide_in_input_order(self):
+        """Test that a batch hides one message in every carrier and reports results in input order."""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for index in range(5):
+                path = os.path.join(directory, f"carrier_{index}.png")
+                self.test_image.save(path)
+                paths.append(path)
+
+            # A carrier that is not an image fails on its own without stopping the batch
+            broken = os.path.join(directory, "broken.png")
+            with open(broken, 'wb') as f:
+                f.write(b'not an image')
+            paths.insert(2, broken)
+
+            results = hide_message_in_images(paths, "Batch message", self.test_password, workers=2,
+                                             output_dir=os.path.join(directory, 'output'))
+
+            self.assertEqual(paths, [result['path'] for result in results])
+            self.assertIsNone(results[2]['output'])
+            self.assertTrue(results[2]['error'])
+            self.assertIn("broken.png", results[2]['error'])
+            self.assertNotIn(directory, results[2]['error'])
+            for result in results[:2] + results[3:]:
+                self.assertIsNone(result['error'])
+                self.assertEqual("Batch message", extract_message_from_image(result['output'], self.test_password))
+
+    def test_capacity_matches_embedding(self):
+        """Test that the reported capacity is exactly what the carrier accepts."""
+        report = capacity(self.test_image_file, 'image')
+        self.assertEqual((100, 100, 'RGB'), (report['width'], report['height'], report['layout']))
+
+        for entry in report['capacity']:
+            bits_per_channel = entry['bits_per_channel']
+            self.test_image_file.seek(0)
+            hide_message_in_image(self.test_image_file, "x" * entry['max_bytes'], bits_per_channel=bits_per_channel)
+            self.test_image_file.seek(0)
+            with self.assertRaises(ValueError):
+                hide_message_in_image(self.test_image_file, "x" * (entry['max_bytes'] + 1),
+                                      bits_per_channel=bits_per_channel)
+
+        # The encrypted capacity leaves room for the salt, IV and padding
+        entry = report['capacity'][0]
+        self.test_image_file.seek(0)
+        hidden_image = hide_message_in_image(self.test_image_file, "x" * entry['max_bytes_encrypted'], self.test_password)
+        self.assertEqual("x" * entry['max_bytes_encrypted'], extract_message_from_image(hidden_image, self.test_password))
+
+class TestAudioSteganography(unittest.TestCase):
+    """Test cases for audio steganography."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.rng = np.random.default_rng(0)
+        self.test_message = "This is a secret message"
+        self.test_password = "test_password"
+
+    def make_carrier(self, subtype, channels, frames=8000):
+        """Write a noisy WAV carrier to memory."""
+        carrier = io.BytesIO()
+        sf.write(carrier, self.rng.uniform(-0.5, 0.5, (frames, channels)), 8000, format='WAV', subtype=subtype)
+        carrier.seek(0)
+        return carrier
+
+    def test_integer_pcm_keeps_format(self):
+        """Test that integer PCM carriers keep their layout and change only sample LSBs."""
+        for subtype, channels, depth in [('PCM_U8', 1, 8), ('PCM_16', 2, 16), ('PCM_24', 1, 24), ('PCM_32', 2, 32)]:
+            carrier = self.make_carrier(subtype, channels)
+            original, _ = sf.read(io.BytesIO(carrier.getvalue()), dtype='int32', always_2d=True)
+
+            hidden_audio = hide_message_in_audio(carrier, self.test_message, self.test_password)
+            info = sf.info(io.BytesIO(hidden_audio.getvalue()))
+            stego, _ = sf.read(io.BytesIO(hidden_audio.getvalue()), dtype='int32', always_2d=True)
+
+            self.assertEqual((subtype, channels, 8000), (info.subtype, info.channels, info.samplerate))
+            # One step of the source bit depth, left-aligned in int32
+            self.assertLessEqual(np.abs(stego.astype(np.int64) - original).max(), 1 << (32 - depth))
+            self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio, self.test_password))
+
+    def test_float_carrier_written_as_pcm16(self):
+        """Test that a float carrier is quantized to 16-bit PCM before embedding."""
+        hidden_audio = hide_message_in_audio(self.make_carrier('FLOAT', 1), self.test_message)
+
+        self.assertEqual('PCM_16', sf.info(io.BytesIO(hidden_audio.getvalue())).subtype)
+        self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio))
+
+    def test_bits_spread_over_all_channels(self):
+        """Test that stereo carriers hold twice a mono carrier's payload, in both channels."""
+        carrier = self.make_carrier('PCM_16', 2)
+        original, _ = sf.read(io.BytesIO(carrier.getvalue()), dtype='int16')
+        message = "x" * 1500  # More than the 8000 samples of one channel can carry
+
+        hidden_audio = hide_message_in_audio(carrier, message, self.test_password)
+        stego, _ = sf.read(io.BytesIO(hidden_audio.getvalue()), dtype='int16')
+
+        self.assertTrue((original != stego).any(axis=0).all())
+        self.assertEqual(message, extract_message_from_audio(hidden_audio, self.test_password))
+
+    def test_block_streaming_matches_in_memory(self):
+        """Test that block-streamed embedding writes the same samples and extracts."""
+        carrier = self.make_carrier('PCM_16', 2)
+
+        in_memory = hide_message_in_audio(carrier, self.test_message)
+        carrier.seek(0)
+        streamed = hide_message_in_audio(carrier, self.test_message, block_frames=1000)
+
+        self.assertEqual(in_memory.getvalue(), streamed.getvalue())
+        self.assertEqual(self.test_message, extract_message_from_audio(streamed, block_frames=333))
+
+        carrier.seek(0)
+        streamed = hide_message_in_audio(carrier, self.test_message, self.test_password, block_frames=1000)
+        self.assertEqual(self.test_message, extract_message_from_audio(streamed, self.test_password, block_frames=333))
+
+    def test_legacy_audio_beyond_old_sample_cap(self):
+        """Test that a header-less carrier longer than the old 100k-sample scan still extracts."""
+        message = "Legacy audio message " * 700
+        bits = np.unpackbits(np.frombuffer(message.encode() + b'\0', dtype=np.uint8))
+        self.assertGreater(len(bits), 100000)
+
+        # Legacy carriers keep each bit in the half of a 0.002 quantization step it falls in
+        signal = self.rng.integers(-200, 200, len(bits)) * 0.002 + 0.0005 + bits * 0.001
+        carrier = io.BytesIO()
+        sf.write(carrier, np.round(signal * 32768).astype(np.int16), 8000, format='WAV')
+        carrier.seek(0)
+
+        self.assertEqual(message, extract_message_from_audio(carrier))
+
+        # Keyed carriers from before the header are not supported, and a password fails fast
+        carrier.seek(0)
+        with self.assertRaises(ValueError):
+            extract_message_from_audio(carrier, self.test_password)
+
+    def test_echo_method_round_trip(self):
+        """Test that echo-hidden payloads are found through the method recorded in the header."""
+        # An encrypted body of 64 bytes needs the frames of 512 echo bits
+        carrier = self.make_carrier('PCM_16', 2, frames=echo_frames_needed(512))
+
+        for password in (None, self.test_password):
+            carrier.seek(0)
+            hidden_audio = hide_message_in_audio(carrier, self.test_message, password, method='echo')
+            self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio, password))
+
+            # The streaming reader takes the echo body from the leading frames
+            hidden_audio.seek(0)
+            self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio, password, block_frames=4096))
+
+        with self.assertRaises(ValueError):
+            hide_message_in_audio(self.make_carrier('PCM_16', 1), self.test_message, method='echo')
+        with self.assertRaises(ValueError):
+            hide_message_in_audio(self.make_carrier('PCM_16', 1), self.test_message, method='spread')
+
+    def test_echo_method_on_tonal_and_silent_carriers(self):
+        """Test that echo hiding never hands out a carrier whose payload does not read back."""
+        samplerate = 44100
+        time = np.arange(40 * samplerate) / samplerate  # Room for the 64-byte encrypted body
+        noise = self.rng.uniform(-0.3, 0.3, len(time))
+        sine = 0.5 * np.sin(2 * np.pi * 440 * time)
+        chord = sum(0.2 * np.sin(2 * np.pi * frequency * time) for frequency in (261.63, 329.63, 392.0))
+        silent_start = np.concatenate((np.zeros(3 * samplerate), noise[3 * samplerate:]))
+
+        for name, signal in [('sine', sine), ('chord', chord), ('silent start', silent_start)]:
+            for password in (None, self.test_password):
+                carrier = io.BytesIO()
+                sf.write(carrier, signal, samplerate, format='WAV', subtype='PCM_16')
+                carrier.seek(0)
+                with self.subTest(carrier=name, password=password):
+                    try:
+                        hidden_audio = hide_message_in_audio(carrier, self.test_message, password, method='echo')
+                    except ValueError as error:
+                        # Refused at hide time; the repeated bits carry a silent start, so only tones may be refused
+                        self.assertNotEqual('silent start', name)
+                        self.assertIn("cannot reliably carry", str(error))
+                        continue
+                    self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio, password))
+
+    def test_phase_method_round_trip(self):
+        """Test that phase-coded payloads survive rounding to PCM and change only the coded frames."""
+        for subtype, channels in [('PCM_16', 2), ('PCM_U8', 1)]:
+            carrier = self.make_carrier(subtype, channels, frames=16 * PHASE_FRAME_LENGTH + 500)
+            original, _ = sf.read(io.BytesIO(carrier.getvalue()), dtype='int16', always_2d=True)
+
+            for password in (self.test_password, None):
+                carrier.seek(0)
+                hidden_audio = hide_message_in_audio(carrier, self.test_message, password, method='phase')
+                self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio, password))
+
+            # The plain 24-byte message needs 3 frames of 64 bins, after which only header LSBs change
+            stego, _ = sf.read(io.BytesIO(hidden_audio.getvalue()), dtype='int16', always_2d=True)
+            self.assertEqual(subtype, sf.info(io.BytesIO(hidden_audio.getvalue())).subtype)
+            self.assertLessEqual(np.abs(stego[3 * PHASE_FRAME_LENGTH:].astype(np.int32) -
+                                        original[3 * PHASE_FRAME_LENGTH:]).max(), 256 if subtype == 'PCM_U8' else 1)
+
+    def test_registered_decoder_for_unreadable_format(self):
+        """Test that a format libsndfile cannot open goes through the decoder registered for it."""
+        decoded = []
+
+        def decoder(audio):
+            decoded.append(audio.name)
+            return self.rng.uniform(-0.5, 0.5, (8000, 2)), 8000
+
+        register_audio_decoder('XYZ', decoder)
+        self.addCleanup(AUDIO_DECODERS.pop, 'xyz')
+
+        # A fresh decoded-audio cache, so an entry left by an earlier run cannot skip the decoder
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        original = steganography.audio_cache
+        steganography.audio_cache = DecodedAudioCache(directory.name)
+        self.addCleanup(setattr, steganography, 'audio_cache', original)
+
+        carrier = io.BytesIO(b'not a format libsndfile knows')
+        carrier.name = 'cover.xyz'
+        hidden_audio = hide_message_in_audio(carrier, self.test_message)
+
+        self.assertEqual(['cover.xyz'], decoded)
+        self.assertEqual(2, sf.info(io.BytesIO(hidden_audio.getvalue())).channels)
+        self.assertEqual(self.test_message, extract_message_from_audio(hidden_audio))
 
 class TestTextSteganography(unittest.TestCase):
     """Test cases for text steganography."""
@@ -166,5 +527,85 @@ class TestTextSteganography(unittest.TestCase):
             # Check that the extracted message matches the original
             self.assertEqual(message, extracted_message)
 
+    def test_encrypted_text_holds_raw_ciphertext(self):
+        """Test that encrypted text stores the ciphertext directly, and that hex bodies from older documents still open."""
+        message = self.test_messages[0]
+        hidden_text = hide_message_in_text(message, self.test_password)
+
+        # Four symbols per byte of header and ciphertext, with no hex doubling
+        header = parse_header(decode_zero_width(zero_width_symbols(hidden_text)))
+        self.assertTrue(header.encrypted and header.binary_text)
+        self.assertEqual((HEADER_SIZE + header.payload_length) * 4, len(zero_width_symbols(hidden_text)))
+
+        body = encrypt_message(message, password=self.test_password, iterations=1000).hex().encode('ascii')
+        old_text = "Cover " + encode_zero_width(build_header(len(body), encrypted=True, kdf_iterations=1000) + body) + "text."
+        self.assertEqual(message, extract_message_from_text(old_text, self.test_password))
+
+    def test_wider_alphabets(self):
+        """Test every alphabet size with and without a password, next to emoji that use variation selectors."""
+        cover_text = "Cover text \u2764\ufe0f with an emoji \u263a\ufe0f on both sides."
+        message = self.test_messages[1]
+        inserted = {}
+
+        for alphabet_size in (4, 8, 16, 256):
+            for password in (None, self.test_password):
+                hidden_text = hide_message_in_text(message, password, cover_text, alphabet_size=alphabet_size)
+                self.assertEqual(message, extract_message_from_text(hidden_text, password))
+            inserted[alphabet_size] = len(hidden_text) - len(cover_text)
+
+        # The body shrinks with the bits each character carries; the header stays in 4 symbols
+        body_length = inserted[4] // 4 - HEADER_SIZE
+        for alphabet_size, bits in ((8, 3), (16, 4), (256, 8)):
+            self.assertEqual(HEADER_SIZE * 4 + -(-body_length * 8 // bits), inserted[alphabet_size])
+
+        with self.assertRaises(ValueError):
+            hide_message_in_text(message, alphabet_size=32)
+
+    def test_text_file_streaming(self):
+        """Test hiding in and extracting from text streamed in chunks smaller than the payload."""
+        cover_text = "First paragraph of the cover.\n\nSecond paragraph \u263a\ufe0f, with an emoji."
+        message = self.test_messages[1]
+
+        for alphabet_size in (4, 8, 16, 256):
+            for password in (None, self.test_password):
+                output = hide_message_in_text_file(io.StringIO(cover_text), io.StringIO(), message, password,
+                                                   alphabet_size=alphabet_size, chunk_size=7)
+                hidden_text = output.getvalue()
+                self.assertEqual(message, extract_message_from_text_file(io.StringIO(hidden_text), password,
+                                                                         chunk_size=5))
+                self.assertEqual(message, extract_message_from_text(hidden_text, password))
+
+        # The payload goes at the end of the first paragraph, or of the first word when none ends in the first chunk
+        hidden_text = hide_message_in_text_file(io.StringIO(cover_text), io.StringIO(), message).getvalue()
+        self.assertTrue(hidden_text.startswith("First paragraph of the cover."))
+        self.assertTrue(hidden_text.endswith("\n\nSecond paragraph \u263a\ufe0f, with an emoji."))
+        hidden_text = hide_message_in_text_file(io.StringIO(cover_text), io.StringIO(), message,
+                                                chunk_size=16).getvalue()
+        self.assertEqual("First" + zero_width_symbols(hidden_text), hidden_text[:hidden_text.index(" ")])
+
+        # A paragraph break split across the first two chunks still takes the payload
+        paragraph_end = cover_text.index("\n\n")
+        hidden_text = hide_message_in_text_file(io.StringIO(cover_text), io.StringIO(), message,
+                                                chunk_size=paragraph_end + 1).getvalue()
+        self.assertEqual(cover_text[:paragraph_end] + zero_width_symbols(hidden_text),
+                         hidden_text[:hidden_text.index("\n")])
+        self.assertEqual(message, extract_message_from_text_file(io.StringIO(hidden_text),
+                                                                 chunk_size=paragraph_end + 1))
+
+        # A cover with no word boundary carries the payload at its end, before the closing period
+        hidden_text = hide_message_in_text_file(io.StringIO("Word"), io.StringIO(), message).getvalue()
+        self.assertTrue(hidden_text.startswith("Word") and hidden_text.endswith("."))
+        self.assertEqual(message, extract_message_from_text(hidden_text))
+
+    def test_legacy_text_without_header(self):
+        """Test that text hidden before the payload header still extracts."""
+        invisible_chars = ['\u200B', '\u200C', '\u200D', '\u2060']
+        binary_message = ''.join(format(ord(char), '08b') for char in "Legacy message\0")
+        hidden_text = "Cover " + ''.join(
+            invisible_chars[int(binary_message[i:i + 2], 2)] for i in range(0, len(binary_message), 2)
+        ) + "text."
+
+        self.assertEqual("Legacy message", extract_message_from_text(hidden_text))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# tests/test_text_codec.py
+"""
+Test module for the zero-width text codec.
+
+This module contains tests for encoding bytes as invisible characters and decoding them back.
+"""
+
+import unittest
+import os
+import sys
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.text_codec import (
+    encode_zero_width, decode_zero_width, zero_width_symbols, zero_width_offset, zero_width_runs, ZERO_WIDTH_ALPHABET,
+    ZERO_WIDTH_CODECS
+)
+
+class TestZeroWidthCodec(unittest.TestCase):
+    """Test cases for the zero-width text codec."""
+
+    def test_round_trip_every_byte(self):
+        """Test that every byte value survives encoding and decoding."""
+        data = bytes(range(256)) * 3
+
+        self.assertEqual(data, decode_zero_width(encode_zero_width(data)))
+
+    def test_every_alphabet(self):
+        """Test that each alphabet round-trips lengths that do and do not fill whole symbols."""
+        for alphabet_size, codec in ZERO_WIDTH_CODECS.items():
+            for data in (b'', b'\x00', b'ab', b'abc', bytes(range(256))):
+                symbols = encode_zero_width(data, alphabet_size)
+                self.assertEqual(codec.symbol_count(len(data)), len(symbols))
+                self.assertTrue(set(symbols) <= set(codec.alphabet))
+                self.assertEqual(data, decode_zero_width(codec.symbols("x" + symbols + "y"), alphabet_size))
+
+    def test_offset_and_run(self):
+        """Test finding where default-alphabet symbols end and reading the run that follows."""
+        codec = ZERO_WIDTH_CODECS[256]
+        text = "ab" + encode_zero_width(b'h')[:2] + "c" + encode_zero_width(b'h')[2:] + codec.encode(b'body') + "d"
+
+        start = zero_width_offset(text, 4)
+        self.assertEqual(b'body', codec.decode(codec.run_at(text, start)))
+        self.assertIsNone(zero_width_offset(text, 5))
+
+    def test_bit_pair_order(self):
+        """Test that bytes are written most significant bit pair first, as the original encoder did."""
+        binary = format(ord('A'), '08b')
+        expected = ''.join(ZERO_WIDTH_ALPHABET[int(binary[i:i + 2], 2)] for i in range(0, 8, 2))
+
+        self.assertEqual(expected, encode_zero_width(b'A'))
+
+    def test_visible_text_is_ignored(self):
+        """Test that cover text around and between the symbols does not affect decoding."""
+        symbols = encode_zero_width(b'secret')
+        text = "Cover " + symbols[:5] + "text \U0001F600 with" + symbols[5:] + " more."
+
+        self.assertEqual(symbols, zero_width_symbols(text))
+        self.assertEqual(b'secret', decode_zero_width(zero_width_symbols(text)))
+
+    def test_partial_byte_dropped(self):
+        """Test that trailing symbols short of a whole byte are ignored."""
+        self.assertEqual(b'ok', decode_zero_width(encode_zero_width(b'ok') + ZERO_WIDTH_ALPHABET[:3]))
+        self.assertEqual(b'', decode_zero_width(''))
+
+    def test_runs_across_chunks(self):
+        """Test that runs split by chunk boundaries are rejoined and separate runs stay apart."""
+        first, second = encode_zero_width(b'first', 256), encode_zero_width(b'second')
+        text = "Some " + first + "visible " + second + " text"
+
+        for size in (1, 3, 7, len(text)):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertEqual(first + ' ' + second, zero_width_runs(chunks))
+        self.assertEqual('', zero_width_runs(["No hidden ", "text"]))
+
+if __name__ == '__main__':
+    unittest.main()